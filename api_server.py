@@ -0,0 +1,370 @@
+"""HTTP JSON API поверх функций поиска (asyncio, только стандартная
+библиотека).
+
+Запросы к MySQL и MongoDB блокирующие, поэтому выполняются в
+ограниченном пуле потоков (`API_WORKERS`) на общем пуле соединений.
+Одновременно обрабатывается не больше `API_MAX_CONCURRENCY` запросов,
+остальные ждут; запрос, не уложившийся в `API_REQUEST_TIMEOUT` секунд
+(вместе с ожиданием), получает 504. Запрос, ответивший 504, занимает
+место в лимите, пока его поток не закончит работу.
+
+Запуск:
+    python api_server.py [--host 127.0.0.1] [--port 8080]
+
+Методы (только GET, ответы — JSON):
+    /search/keyword?q=love&genre_id=&year_min=&year_max=&age_rating=&limit=&page_token=
+    /search/genre?genre_id=5&year_min=&year_max=&age_rating=&limit=&page_token=
+    /actors/<actor_id>/films?offset=&limit=
+    /films/<film_id>/cast
+    /genres
+    /stats?limit=5
+    /health
+
+Поиск возвращает {"films", "total", "next_token"}: `next_token` передаётся
+как `page_token` для следующей страницы. Первая страница поиска
+записывается в лог запросов, как в консольном меню.
+"""
+
+import argparse
+import asyncio
+import functools
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+import pymysql
+from pymongo.errors import ConnectionFailure
+
+from config import (
+    API_HOST,
+    API_PORT,
+    API_WORKERS,
+    API_MAX_CONCURRENCY,
+    API_REQUEST_TIMEOUT,
+    LIMIT,
+)
+from exporters import json_default
+
+
+# Наибольший размер страницы, который можно запросить
+MAX_LIMIT = 100
+# Сколько секунд держать простаивающее keep-alive соединение
+KEEP_ALIVE_TIMEOUT = 15.0
+
+# Ошибки связи с базами посреди запроса (сервер недоступен, разрыв,
+# таймаут): отвечаем 503, чтобы клиент мог повторить запрос
+DB_UNAVAILABLE_ERRORS = (
+    pymysql.err.OperationalError,
+    pymysql.err.InterfaceError,
+    ConnectionFailure,
+)
+
+
+def _int_param(query, name, default=None, minimum=None, maximum=None):
+    """Читает целочисленный параметр строки запроса.
+
+    Исключения:
+        ValueError: если значение не число или вне допустимых границ
+    """
+    raw = query.get(name)
+    if raw is None or raw == "":
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        raise ValueError(f"Параметр {name} должен быть целым числом") from None
+    if minimum is not None and value < minimum:
+        raise ValueError(f"Параметр {name} должен быть не меньше {minimum}")
+    if maximum is not None and value > maximum:
+        raise ValueError(f"Параметр {name} должен быть не больше {maximum}")
+    return value
+
+
+def _search_filters(query):
+    """Общие фильтры поиска: жанр, годы (оба или ни одного), категория."""
+    year_min = _int_param(query, "year_min")
+    year_max = _int_param(query, "year_max")
+    if (year_min is None) != (year_max is None):
+        raise ValueError("Параметры year_min и year_max задаются вместе")
+    return {
+        "genre_id": _int_param(query, "genre_id", minimum=1),
+        "year_min": year_min,
+        "year_max": year_max,
+        "age_rating": query.get("age_rating") or None,
+    }
+
+
+def _log_params(filters, **extra):
+    """Параметры запроса для лога — в том же виде, что у консольного меню."""
+    params = dict(extra)
+    if filters["genre_id"] is not None:
+        params["genre_id"] = filters["genre_id"]
+    if filters["year_min"] is not None:
+        params.update(
+            {"year_min": filters["year_min"], "year_max": filters["year_max"]})
+    if filters["age_rating"]:
+        params["age_rating"] = filters["age_rating"]
+    return params
+
+
+def _search_keyword(query):
+    import mysql_connector as db
+    from log_stats import log_search
+
+    keyword = (query.get("q") or "").strip()
+    if not keyword:
+        raise ValueError("Не задано ключевое слово (q)")
+    filters = _search_filters(query)
+    limit = _int_param(query, "limit", LIMIT, minimum=1, maximum=MAX_LIMIT)
+    page_token = query.get("page_token")
+
+    if page_token:
+        films, next_token = db.search_by_keyword_page(
+            keyword, limit=limit, page_token=page_token, **filters)
+        total = db.get_keyword_count(keyword, **filters)
+    else:
+        films, total, next_token = db.search_by_keyword_with_total(
+            keyword, limit=limit, **filters)
+        log_search(
+            "keyword", _log_params(filters, keyword=keyword), int(total))
+    return {"films": films, "total": total, "next_token": next_token}
+
+
+def _search_genre(query):
+    import mysql_connector as db
+    from log_stats import log_search
+
+    filters = _search_filters(query)
+    if filters["genre_id"] is None and filters["year_min"] is None:
+        raise ValueError("Задайте genre_id и/или year_min и year_max")
+    limit = _int_param(query, "limit", LIMIT, minimum=1, maximum=MAX_LIMIT)
+    page_token = query.get("page_token")
+
+    if page_token:
+        films, next_token = db.search_by_genre_and_year_page(
+            limit=limit, page_token=page_token, **filters)
+        total = db.get_genre_year_count(**filters)
+    else:
+        films, total, next_token = db.search_by_genre_and_year_with_total(
+            limit=limit, **filters)
+        log_search("genre_year", _log_params(filters), int(total))
+    return {"films": films, "total": total, "next_token": next_token}
+
+
+def _actor_films(query, actor_id):
+    import mysql_connector as db
+
+    offset = _int_param(query, "offset", 0, minimum=0)
+    limit = _int_param(query, "limit", LIMIT, minimum=1, maximum=MAX_LIMIT)
+    return {
+        "films": db.get_films_by_actor(int(actor_id), offset=offset, limit=limit),
+        "total": db.get_films_by_actor_count(int(actor_id)),
+    }
+
+
+def _film_cast(query, film_id):
+    import mysql_connector as db
+
+    return {"actors": db.get_actors_by_film(int(film_id))}
+
+
+def _genres(query):
+    from reference_data import get_genres
+
+    return {"genres": get_genres()}
+
+
+def _stats(query):
+    from log_stats import get_last_queries, get_top_queries
+
+    limit = _int_param(query, "limit", 5, minimum=1, maximum=MAX_LIMIT)
+    return {"top": get_top_queries(limit), "last": get_last_queries(limit)}
+
+
+ROUTES = [
+    (re.compile(r"/search/keyword"), _search_keyword),
+    (re.compile(r"/search/genre"), _search_genre),
+    (re.compile(r"/actors/(?P<actor_id>\d+)/films"), _actor_films),
+    (re.compile(r"/films/(?P<film_id>\d+)/cast"), _film_cast),
+    (re.compile(r"/genres"), _genres),
+    (re.compile(r"/stats"), _stats),
+]
+
+
+class ApiServer:
+    """HTTP/1.1-сервер (keep-alive, только GET) с ограничением нагрузки.
+
+    Параметры:
+        workers: Число потоков для блокирующих запросов к базам
+        max_concurrency: Максимум одновременно обрабатываемых запросов
+        request_timeout: Предельное время ответа на запрос (сек)
+    """
+
+    def __init__(self, workers=API_WORKERS, max_concurrency=API_MAX_CONCURRENCY,
+                 request_timeout=API_REQUEST_TIMEOUT):
+        self.request_timeout = request_timeout
+        self._executor = ThreadPoolExecutor(
+            max(1, workers), thread_name_prefix="api")
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def _call(self, handler, query, groups):
+        """Выполняет обработчик в пуле потоков с учётом лимита.
+
+        Место в лимите освобождается только когда поток закончит работу:
+        таймаут (`dispatch`) ограничивает ожидание клиента, но не
+        прерывает уже начатые запросы к базам, и они продолжают
+        учитываться в `API_MAX_CONCURRENCY`.
+        """
+        await self._semaphore.acquire()
+        loop = asyncio.get_running_loop()
+        try:
+            future = loop.run_in_executor(
+                self._executor, functools.partial(handler, query, **groups))
+        except BaseException:
+            self._semaphore.release()
+            raise
+        future.add_done_callback(self._release)
+        return await asyncio.shield(future)
+
+    def _release(self, future):
+        """Освобождает место в лимите после завершения обработчика."""
+        self._semaphore.release()
+        if not future.cancelled():
+            # Ответ мог уже уйти по таймауту: помечаем ошибку прочитанной
+            future.exception()
+
+    async def dispatch(self, method, target):
+        """Обрабатывает запрос.
+
+        Возвращает:
+            tuple: (HTTP-статус, тело ответа в виде dict)
+        """
+        if method != "GET":
+            return HTTPStatus.METHOD_NOT_ALLOWED, {"error": "Поддерживается только GET"}
+        url = urlsplit(target)
+        if url.path == "/health":
+            return HTTPStatus.OK, {"status": "ok"}
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+
+        for pattern, handler in ROUTES:
+            match = pattern.fullmatch(url.path.rstrip("/"))
+            if match:
+                break
+        else:
+            return HTTPStatus.NOT_FOUND, {"error": f"Неизвестный адрес: {url.path}"}
+
+        try:
+            payload = await asyncio.wait_for(
+                self._call(handler, query, match.groupdict()),
+                self.request_timeout)
+        except asyncio.TimeoutError:
+            return HTTPStatus.GATEWAY_TIMEOUT, {"error": "Превышено время ожидания"}
+        except ValueError as e:
+            return HTTPStatus.BAD_REQUEST, {"error": str(e)}
+        except RuntimeError as e:
+            # Нет подключения к MySQL или свободного соединения в пуле
+            return HTTPStatus.SERVICE_UNAVAILABLE, {"error": str(e)}
+        except DB_UNAVAILABLE_ERRORS as e:
+            return HTTPStatus.SERVICE_UNAVAILABLE, {
+                "error": f"База данных недоступна: {e}"}
+        except Exception as e:
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {
+                "error": f"{type(e).__name__}: {e}"}
+        return HTTPStatus.OK, payload
+
+    async def handle_connection(self, reader, writer):
+        """Обслуживает соединение: запросы читаются один за другим."""
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(
+                        reader.readuntil(b"\r\n\r\n"), KEEP_ALIVE_TIMEOUT)
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError,
+                        asyncio.TimeoutError, ConnectionError):
+                    break
+
+                request_line, *header_lines = head.decode("latin-1").split("\r\n")
+                parts = request_line.split()
+                if len(parts) != 3:
+                    await self._send(writer, HTTPStatus.BAD_REQUEST,
+                                     {"error": "Некорректный запрос"}, False)
+                    break
+                method, target, version = parts
+                headers = {}
+                for line in header_lines:
+                    name, _, value = line.partition(":")
+                    if name:
+                        headers[name.strip().lower()] = value.strip()
+
+                # Тело запроса не используется, но его нужно дочитать
+                length = headers.get("content-length", "0")
+                if length.isdigit() and int(length):
+                    await reader.readexactly(int(length))
+
+                status, payload = await self.dispatch(method, target)
+                keep_alive = (
+                    version == "HTTP/1.1"
+                    and headers.get("connection", "").lower() != "close"
+                )
+                await self._send(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+            with suppress(ConnectionError):
+                await writer.wait_closed()
+
+    @staticmethod
+    async def _send(writer, status, payload, keep_alive):
+        """Отправляет JSON-ответ."""
+        body = json.dumps(
+            payload, ensure_ascii=False, default=json_default).encode("utf-8")
+        head = (
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+            "\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+    async def serve(self, host=API_HOST, port=API_PORT):
+        """Запускает сервер и обслуживает запросы до остановки."""
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        print(f"API слушает http://{host}:{port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def main(argv=None):
+    """Разбирает аргументы командной строки и запускает сервер."""
+    parser = argparse.ArgumentParser(description="HTTP JSON API поиска фильмов")
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--port", type=int, default=API_PORT)
+    args = parser.parse_args(argv)
+
+    from mongo_client import connect_in_background
+    from reference_data import warm_up
+
+    # Справочники и подключение к MongoDB — в фоне, как в консольном меню
+    warm_up()  # reference_data.py
+    connect_in_background()  # mongo_client.py
+
+    try:
+        asyncio.run(ApiServer().serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
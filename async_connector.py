@@ -0,0 +1,488 @@
+"""Асинхронный доступ к данным: те же функции, что в `mysql_connector.py`
+и `log_stats.py`, но в виде корутин.
+
+MySQL — через пул `aiomysql`, MongoDB — через `pymongo.AsyncMongoClient`
+(PyMongo 4.10+) или `motor`, если он установлен вместо него. Оба пакета
+необязательны: без них модуль импортируется, а ошибка возникает при
+первом обращении к базе.
+
+Части SQL-запросов строятся общими функциями `mysql_connector`, кэш
+результатов поиска тоже общий. Запросы не занимают поток на время
+ожидания, поэтому счётчик и страницу можно выполнять одновременно:
+
+    films, total = await asyncio.gather(
+        search_by_keyword("love"), get_keyword_count("love"))
+
+Пул и клиент MongoDB привязаны к циклу событий, в котором созданы;
+перед завершением цикла вызывайте `await close()`.
+
+При `CATALOG_MODE = "memory"` поиск и запросы по актёрам отвечаются из
+того же снимка каталога, что и в `mysql_connector` (`catalog.py`);
+загрузка снимка выполняется в отдельном потоке.
+
+Движок поиска по ключевому слову общий с `mysql_connector` и
+обращается к базе через его синхронный пул: `fulltext` при выборе
+проверяет наличие индекса, `trigram` при первом поиске строит индекс
+названий. Поэтому выбор движка и условие по ключевому слову для всех
+движков, кроме `like`, вычисляются в отдельном потоке
+(`asyncio.to_thread`), не блокируя цикл событий.
+"""
+
+import asyncio
+import time
+from zoneinfo import ZoneInfo
+
+import pymysql
+
+try:
+    import aiomysql
+except ImportError:  # необязательная зависимость
+    aiomysql = None
+
+try:
+    from pymongo import AsyncMongoClient
+except ImportError:
+    try:
+        from motor.motor_asyncio import AsyncIOMotorClient as AsyncMongoClient
+    except ImportError:  # необязательная зависимость
+        AsyncMongoClient = None
+
+from config import (
+    MYSQL_HOST,
+    MYSQL_USER,
+    MYSQL_PASS,
+    MYSQL_DB,
+    MYSQL_POOL_SIZE,
+    MYSQL_POOL_MAX_IDLE,
+    MYSQL_POOL_TIMEOUT,
+    MONGO_URI_PREFIX,
+    MONGO_URI_SUFFIX,
+    MONGO_USER,
+    MONGO_PASS,
+    MONGO_DB,
+    MONGO_COLL,
+    MONGO_ROLLUP_COLL,
+    MONGO_RETRY_COOLDOWN,
+    TIMEZONE,
+    LIMIT,
+    CATALOG_MODE,
+)
+import mysql_connector
+from mysql_connector import (
+    _ACTORS_BY_FILM_SQL,
+    _FILMS_BY_ACTOR_COUNT_SQL,
+    _FILMS_BY_ACTOR_SQL,
+    _build_genre_year_query_parts,
+    _build_keyword_query_parts,
+    _cache_key,
+    _catalog_page,
+    _copy_result,
+    _count_sql,
+    _films_page_sql,
+    _next_page_token,
+    _search_cache,
+    get_search_backend,
+)
+from mysql_pool import PoolTimeoutError
+from query_builder import FilterSpec
+
+
+_pool = None
+_pool_lock = None
+
+_mongo_uri = (
+    f"{MONGO_URI_PREFIX}{MONGO_USER}:{MONGO_PASS}{MONGO_URI_SUFFIX}"
+    if MONGO_URI_PREFIX else None
+)
+_mongo_client = None
+# После ошибки MongoDB не обращаемся к ней до этого момента (time.monotonic)
+_mongo_retry_at = 0.0
+
+
+async def _get_pool():
+    """Возвращает пул соединений aiomysql, создавая его при первом вызове."""
+    global _pool, _pool_lock
+    if _pool is not None:
+        return _pool
+    if aiomysql is None:
+        raise RuntimeError(
+            "Для асинхронного доступа к MySQL нужен пакет aiomysql "
+            "(pip install aiomysql)")
+    if _pool_lock is None:
+        _pool_lock = asyncio.Lock()
+    async with _pool_lock:
+        if _pool is None:
+            try:
+                _pool = await aiomysql.create_pool(
+                    host=MYSQL_HOST,
+                    user=MYSQL_USER,
+                    password=MYSQL_PASS,
+                    db=MYSQL_DB,
+                    minsize=1,
+                    maxsize=MYSQL_POOL_SIZE,
+                    pool_recycle=int(MYSQL_POOL_MAX_IDLE),
+                    autocommit=True,
+                    cursorclass=aiomysql.DictCursor,
+                )
+            except pymysql.err.OperationalError as exc:
+                msg = (
+                    f"Не удалось подключиться к MySQL ({exc}).\n"
+                    "Проверьте наличие сервера MySQL или правильность "
+                    "параметров в .env"
+                )
+                raise RuntimeError(msg) from exc
+    return _pool
+
+
+async def _fetch(query, params=(), one=False):
+    """Выполняет запрос на соединении из пула.
+
+    Исключения:
+        PoolTimeoutError: если свободного соединения нет дольше
+                          `MYSQL_POOL_TIMEOUT` секунд
+    """
+    pool = await _get_pool()
+    try:
+        conn = await asyncio.wait_for(pool.acquire(), MYSQL_POOL_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise PoolTimeoutError(
+            f"Нет свободного соединения MySQL за {MYSQL_POOL_TIMEOUT} сек"
+        ) from None
+    try:
+        async with conn.cursor() as cursor:
+            await cursor.execute(query, tuple(params))
+            if one:
+                return await cursor.fetchone()
+            return await cursor.fetchall()
+    finally:
+        pool.release(conn)
+
+
+async def _fetch_films_page(
+        search_type, sql_join, where_sql, params, offset=0, limit=LIMIT,
+        page_token=None):
+    """Страница фильмов по готовым частям запроса (с учётом общего кэша).
+
+    Возвращает:
+        tuple: (films, next_token)
+    """
+    position = ("token", page_token) if page_token else ("offset", int(offset))
+    key = _cache_key(search_type, "page", sql_join, where_sql, params,
+                     position, int(limit))
+    hit, cached = _search_cache.get(key)
+    if hit:
+        return _copy_result(cached)
+
+    query, query_params = _films_page_sql(
+        sql_join, where_sql, params, offset, limit, page_token)
+    films = list(await _fetch(query, query_params))
+    result = (films, _next_page_token(films, limit))
+    _search_cache.set(key, result)
+    return _copy_result(result)
+
+
+async def _count_films(search_type, sql_join, where_sql, params):
+    """Число фильмов по готовым частям запроса (с учётом общего кэша)."""
+    key = _cache_key(search_type, "count", sql_join, where_sql, params)
+    hit, cached = _search_cache.get(key)
+    if hit:
+        return cached
+
+    row = await _fetch(_count_sql(sql_join, where_sql), params, one=True)
+    total = int(row.get("cnt", 0))
+    _search_cache.set(key, total)
+    return total
+
+
+async def _catalog(keyword=False):
+    """Снимок каталога в памяти или None (см. `mysql_connector._catalog`,
+    для поиска по ключевому слову — `_keyword_catalog`). Загруженный
+    снимок возвращается сразу; первая загрузка выполняет синхронные
+    запросы, поэтому — в потоке.
+    """
+    if CATALOG_MODE != "memory":
+        return None
+    if keyword and not mysql_connector._catalog_handles_keywords():
+        return None
+    import catalog  # catalog.py
+
+    snapshot = catalog.loaded_catalog()
+    if snapshot is None:
+        snapshot = await asyncio.to_thread(catalog.get_catalog)
+    return snapshot
+
+
+async def _build_keyword_parts(
+        keyword, genre_id=None, year_min=None, year_max=None,
+        age_rating=None):
+    """`_build_keyword_query_parts` без блокировки цикла событий.
+
+    Движок выбирается (и для `fulltext` проверяется) в отдельном потоке
+    один раз; условие строится в потоке для всех движков, кроме `like`,
+    так как `trigram` при первом поиске читает названия из базы.
+    """
+    if not keyword:
+        return _build_keyword_query_parts(
+            keyword, genre_id, year_min, year_max, age_rating)
+    backend = mysql_connector._search_backend
+    if backend is None:
+        backend = await asyncio.to_thread(get_search_backend)
+    if backend.name == "like":
+        return _build_keyword_query_parts(
+            keyword, genre_id, year_min, year_max, age_rating)
+    return await asyncio.to_thread(
+        _build_keyword_query_parts,
+        keyword, genre_id, year_min, year_max, age_rating)
+
+
+async def search_by_keyword(
+        keyword, offset=0, limit=LIMIT, genre_id=None, year_min=None,
+        year_max=None, age_rating=None, page_token=None):
+    """Асинхронный `mysql_connector.search_by_keyword`."""
+    films, _ = await search_by_keyword_page(
+        keyword, offset, limit, genre_id, year_min, year_max, age_rating,
+        page_token)
+    return films
+
+
+async def search_by_keyword_page(
+        keyword, offset=0, limit=LIMIT, genre_id=None, year_min=None,
+        year_max=None, age_rating=None, page_token=None):
+    """Асинхронный `mysql_connector.search_by_keyword_page`.
+
+    Возвращает:
+        tuple: (films, next_token)
+    """
+    snapshot = await _catalog(keyword=True)
+    if snapshot is not None:
+        spec = FilterSpec(keyword, genre_id, year_min, year_max, age_rating)
+        return _catalog_page(snapshot, spec, offset, limit, page_token)
+    sql_join, where_sql, params = await _build_keyword_parts(
+        keyword, genre_id, year_min, year_max, age_rating)
+    return await _fetch_films_page(
+        "keyword", sql_join, where_sql, params, offset, limit, page_token)
+
+
+async def get_keyword_count(
+        keyword, genre_id=None, year_min=None, year_max=None, age_rating=None):
+    """Асинхронный `mysql_connector.get_keyword_count`."""
+    snapshot = await _catalog(keyword=True)
+    if snapshot is not None:
+        return snapshot.count(
+            FilterSpec(keyword, genre_id, year_min, year_max, age_rating))
+    sql_join, where_sql, params = await _build_keyword_parts(
+        keyword, genre_id, year_min, year_max, age_rating)
+    return await _count_films("keyword", sql_join, where_sql, params)
+
+
+async def search_by_keyword_with_total(
+        keyword, limit=LIMIT, genre_id=None, year_min=None, year_max=None,
+        age_rating=None):
+    """Первая страница и общее число совпадений — двумя запросами,
+    выполняемыми одновременно на разных соединениях.
+
+    Возвращает:
+        tuple: (films, total, next_token)
+    """
+    snapshot = await _catalog(keyword=True)
+    if snapshot is not None:
+        spec = FilterSpec(keyword, genre_id, year_min, year_max, age_rating)
+        films, next_token = _catalog_page(snapshot, spec, 0, limit, None)
+        return films, snapshot.count(spec), next_token
+    sql_join, where_sql, params = await _build_keyword_parts(
+        keyword, genre_id, year_min, year_max, age_rating)
+    (films, next_token), total = await asyncio.gather(
+        _fetch_films_page("keyword", sql_join, where_sql, params, 0, limit),
+        _count_films("keyword", sql_join, where_sql, params),
+    )
+    return films, total, next_token
+
+
+async def search_by_genre_and_year(
+        genre_id=None, year_min=None, year_max=None, offset=0, limit=LIMIT,
+        age_rating=None, page_token=None):
+    """Асинхронный `mysql_connector.search_by_genre_and_year`."""
+    films, _ = await search_by_genre_and_year_page(
+        genre_id, year_min, year_max, offset, limit, age_rating, page_token)
+    return films
+
+
+async def search_by_genre_and_year_page(
+        genre_id=None, year_min=None, year_max=None, offset=0, limit=LIMIT,
+        age_rating=None, page_token=None):
+    """Асинхронный `mysql_connector.search_by_genre_and_year_page`.
+
+    Возвращает:
+        tuple: (films, next_token)
+    """
+    snapshot = await _catalog()
+    if snapshot is not None:
+        spec = FilterSpec(None, genre_id, year_min, year_max, age_rating)
+        return _catalog_page(snapshot, spec, offset, limit, page_token)
+    sql_join, where_sql, params = _build_genre_year_query_parts(
+        genre_id, year_min, year_max, age_rating)
+    return await _fetch_films_page(
+        "genre_year", sql_join, where_sql, params, offset, limit, page_token)
+
+
+async def get_genre_year_count(
+        genre_id=None, year_min=None, year_max=None, age_rating=None):
+    """Асинхронный `mysql_connector.get_genre_year_count`."""
+    snapshot = await _catalog()
+    if snapshot is not None:
+        return snapshot.count(
+            FilterSpec(None, genre_id, year_min, year_max, age_rating))
+    sql_join, where_sql, params = _build_genre_year_query_parts(
+        genre_id, year_min, year_max, age_rating)
+    return await _count_films("genre_year", sql_join, where_sql, params)
+
+
+async def search_by_genre_and_year_with_total(
+        genre_id=None, year_min=None, year_max=None, limit=LIMIT,
+        age_rating=None):
+    """Первая страница и общее число совпадений по жанру и/или годам —
+    одновременно.
+
+    Возвращает:
+        tuple: (films, total, next_token)
+    """
+    snapshot = await _catalog()
+    if snapshot is not None:
+        spec = FilterSpec(None, genre_id, year_min, year_max, age_rating)
+        films, next_token = _catalog_page(snapshot, spec, 0, limit, None)
+        return films, snapshot.count(spec), next_token
+    sql_join, where_sql, params = _build_genre_year_query_parts(
+        genre_id, year_min, year_max, age_rating)
+    (films, next_token), total = await asyncio.gather(
+        _fetch_films_page("genre_year", sql_join, where_sql, params, 0, limit),
+        _count_films("genre_year", sql_join, where_sql, params),
+    )
+    return films, total, next_token
+
+
+async def get_actors_by_film(film_id):
+    """Асинхронный `mysql_connector.get_actors_by_film`."""
+    snapshot = await _catalog()
+    if snapshot is not None:
+        return snapshot.actors_by_film(int(film_id))
+    return list(await _fetch(_ACTORS_BY_FILM_SQL, (int(film_id),)))
+
+
+async def get_films_by_actor(actor_id, offset=0, limit=LIMIT):
+    """Асинхронный `mysql_connector.get_films_by_actor`."""
+    snapshot = await _catalog()
+    if snapshot is not None:
+        return snapshot.films_by_actor(int(actor_id), int(offset), int(limit))
+    return list(await _fetch(
+        _FILMS_BY_ACTOR_SQL, (int(actor_id), int(limit), int(offset))))
+
+
+async def get_films_by_actor_count(actor_id):
+    """Асинхронный `mysql_connector.get_films_by_actor_count`."""
+    snapshot = await _catalog()
+    if snapshot is not None:
+        return snapshot.films_by_actor_count(int(actor_id))
+    row = await _fetch(_FILMS_BY_ACTOR_COUNT_SQL, (int(actor_id),), one=True)
+    return int(row.get("cnt", 0))
+
+
+def _mongo_db():
+    """Возвращает базу MongoDB или None, если она не настроена или
+    недавно была недоступна.
+    """
+    global _mongo_client
+    if _mongo_uri is None or time.monotonic() < _mongo_retry_at:
+        return None
+    if AsyncMongoClient is None:
+        raise RuntimeError(
+            "Для асинхронного доступа к MongoDB нужен PyMongo 4.10+ или motor")
+    if _mongo_client is None:
+        _mongo_client = AsyncMongoClient(
+            _mongo_uri,
+            serverSelectionTimeoutMS=3000,
+            tz_aware=True,
+            tzinfo=ZoneInfo(TIMEZONE),
+        )
+    return _mongo_client[MONGO_DB]
+
+
+def _mongo_failed():
+    """Ошибка MongoDB: пауза перед следующими обращениями."""
+    global _mongo_retry_at
+    _mongo_retry_at = time.monotonic() + MONGO_RETRY_COOLDOWN
+
+
+async def log_search(search_type, params, results_count):
+    """Асинхронный `log_stats.log_search`: документ записывается сразу,
+    вместе с обновлением агрегатов. Если MongoDB недоступна, документ
+    сохраняется в локальный журнал (см. `log_spool.py`).
+    """
+    from log_stats import _make_log_doc, _on_write_failure, _rollup_ops
+
+    if _mongo_uri is None:
+        return
+    doc = _make_log_doc(search_type, params, results_count)
+    db = _mongo_db()
+    if db is None:
+        await asyncio.to_thread(_on_write_failure, [doc], None)
+        return
+    try:
+        await db[MONGO_COLL].insert_one(doc)
+    except Exception as exc:
+        _mongo_failed()
+        await asyncio.to_thread(_on_write_failure, [doc], exc)
+        return
+    try:
+        await db[MONGO_ROLLUP_COLL].bulk_write(_rollup_ops([doc]), ordered=False)
+    except Exception:
+        # Агрегаты можно пересобрать (maintenance.py backfill-rollup)
+        pass
+
+
+async def _read_rollup(sort, limit):
+    """Читает агрегаты запросов; пустой список, если MongoDB недоступна."""
+    db = _mongo_db()
+    if db is None:
+        return []
+    try:
+        cursor = db[MONGO_ROLLUP_COLL].find().sort(sort).limit(limit)
+        return await cursor.to_list(length=limit)
+    except Exception:
+        _mongo_failed()
+        return []
+
+
+async def get_top_queries(limit=5):
+    """Асинхронный `log_stats.get_top_queries`."""
+    from log_stats import _top_query_item
+
+    docs = await _read_rollup([("count", -1), ("last", -1)], limit)
+    return [_top_query_item(d) for d in docs]
+
+
+async def get_last_queries(limit=5):
+    """Асинхронный `log_stats.get_last_queries`."""
+    from log_stats import _last_query_item
+
+    docs = await _read_rollup([("last", -1)], limit)
+    return [_last_query_item(d) for d in docs]
+
+
+async def close():
+    """Закрывает пул MySQL и клиент MongoDB.
+
+    Блокировка пула привязана к текущему циклу событий и тоже
+    сбрасывается, чтобы модулем можно было пользоваться из нового цикла.
+    """
+    global _pool, _pool_lock, _mongo_client
+    if _pool is not None:
+        _pool.close()
+        await _pool.wait_closed()
+        _pool = None
+    _pool_lock = None
+    if _mongo_client is not None:
+        result = _mongo_client.close()
+        # У AsyncMongoClient close() — корутина, у motor — обычный метод
+        if asyncio.iscoroutine(result):
+            await result
+        _mongo_client = None
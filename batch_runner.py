@@ -0,0 +1,190 @@
+"""Пакетное выполнение поисковых запросов.
+
+Запросы читаются из JSON Lines, по одному объекту на строку:
+
+    {"type": "keyword", "keyword": "love", "year_min": 2005, "year_max": 2006}
+    {"type": "genre_year", "genre_id": 5, "age_rating": "PG", "limit": 20}
+
+Необязательные поля: `id` (переносится в результат как есть) и `limit`
+(размер выдачи, по умолчанию `LIMIT`). Запросы выполняются параллельно в
+пуле потоков, которые делят общий пул соединений MySQL. Результаты
+пишутся в JSON Lines по мере готовности (в порядке завершения, номер
+строки входного файла — в поле `line`) вместе с временем выполнения.
+Логи всех запросов записываются в MongoDB в конце одним `insert_many`.
+
+Запуск: `python cli.py batch specs.jsonl [--workers N]`.
+"""
+
+import json
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from config import BATCH_WORKERS, LIMIT, LOG_BATCH_SIZE
+from exporters import write_jsonl
+
+
+SPEC_TYPES = ("keyword", "genre_year")
+
+
+def parse_spec(spec):
+    """Проверяет спецификацию запроса и выделяет параметры поиска.
+
+    Возвращает:
+        tuple: (search_type, params, limit)
+    Исключения:
+        ValueError: если спецификация неполная или неверная
+    """
+    if not isinstance(spec, dict):
+        raise ValueError("ожидался JSON-объект")
+    search_type = spec.get("type")
+    if search_type not in SPEC_TYPES:
+        raise ValueError(
+            f"неизвестный тип запроса {search_type!r} "
+            f"(допустимо: {', '.join(SPEC_TYPES)})"
+        )
+
+    params = {}
+    if search_type == "keyword":
+        keyword = spec.get("keyword")
+        if not keyword or not isinstance(keyword, str):
+            raise ValueError("не задано ключевое слово (keyword)")
+        params["keyword"] = keyword
+    if spec.get("genre_id") is not None:
+        params["genre_id"] = int(spec["genre_id"])
+    if spec.get("year_min") is not None and spec.get("year_max") is not None:
+        params["year_min"] = int(spec["year_min"])
+        params["year_max"] = int(spec["year_max"])
+    if spec.get("age_rating"):
+        params["age_rating"] = str(spec["age_rating"])
+    if search_type == "genre_year" and not params:
+        raise ValueError("не задан жанр (genre_id) или годы (year_min/year_max)")
+
+    limit = int(spec.get("limit") or LIMIT)
+    if limit <= 0:
+        raise ValueError("limit должен быть положительным")
+    return search_type, params, limit
+
+
+def run_search(search_type, params, limit):
+    """Выполняет один запрос: первая страница и общее число совпадений.
+
+    Возвращает:
+        tuple: (films, total)
+    """
+    import mysql_connector as db
+
+    if search_type == "keyword":
+        films, total, _ = db.search_by_keyword_with_total(  # mysql_connector.py
+            params["keyword"], limit=limit,
+            genre_id=params.get("genre_id"),
+            year_min=params.get("year_min"),
+            year_max=params.get("year_max"),
+            age_rating=params.get("age_rating"))
+    else:
+        films, total, _ = db.search_by_genre_and_year_with_total(  # mysql_connector.py
+            genre_id=params.get("genre_id"),
+            year_min=params.get("year_min"),
+            year_max=params.get("year_max"),
+            limit=limit,
+            age_rating=params.get("age_rating"))
+    return films, total
+
+
+def _run_line(line_no, spec):
+    """Выполняет запрос строки `line_no` и возвращает запись результата."""
+    result = {"line": line_no}
+    if isinstance(spec, dict) and "id" in spec:
+        result["id"] = spec["id"]
+    start = time.perf_counter()
+    try:
+        search_type, params, limit = parse_spec(spec)
+        result.update(search_type=search_type, params=params)
+        films, total = run_search(search_type, params, limit)
+        result.update(total=total, films=films)
+    except Exception as exc:
+        result["error"] = str(exc)
+    result["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 2)
+    return result
+
+
+def _read_specs(lines):
+    """Разбирает строки входного файла; пустые строки пропускаются.
+
+    Возвращает:
+        Генератор (номер строки, спецификация или исключение разбора)
+    """
+    for line_no, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield line_no, json.loads(line)
+        except json.JSONDecodeError as exc:
+            yield line_no, ValueError(f"неверный JSON: {exc}")
+
+
+def run_batch(lines, out, workers=BATCH_WORKERS, log=True):
+    """Выполняет запросы из строк JSON Lines и пишет результаты в `out`.
+
+    Одновременно в работе не больше `2 * workers` запросов, поэтому
+    входной файл читается постепенно и может быть любого размера.
+
+    Параметры:
+        lines: Итерируемые строки входного файла
+        out: Текстовый поток для результатов (JSON Lines)
+        workers: Число параллельных запросов
+        log: Записать запросы в лог MongoDB (пакетами по `LOG_BATCH_SIZE`
+             через `insert_many`)
+    Возвращает:
+        dict: Сводка: queries, failed, logged, elapsed (сек)
+    """
+    workers = max(1, workers)
+    started = time.perf_counter()
+    queries = failed = logged = 0
+    log_entries = []
+
+    def flush_log():
+        nonlocal logged
+        if log_entries:
+            from log_stats import log_searches
+
+            logged += log_searches(log_entries)  # log_stats.py
+            log_entries.clear()
+
+    def emit(result):
+        nonlocal queries, failed
+        queries += 1
+        if "error" in result:
+            failed += 1
+        elif log:
+            log_entries.append(
+                (result["search_type"], result["params"], int(result["total"] or 0)))
+            if len(log_entries) >= LOG_BATCH_SIZE:
+                flush_log()
+        write_jsonl([result], out)  # exporters.py
+        out.flush()
+
+    with ThreadPoolExecutor(workers, thread_name_prefix="batch") as executor:
+        pending = set()
+        for line_no, spec in _read_specs(lines):
+            if isinstance(spec, Exception):
+                emit({"line": line_no, "error": str(spec), "elapsed_ms": 0.0})
+                continue
+            pending.add(executor.submit(_run_line, line_no, spec))
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    emit(future.result())
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                emit(future.result())
+
+    flush_log()
+
+    return {
+        "queries": queries,
+        "failed": failed,
+        "logged": logged,
+        "elapsed": round(time.perf_counter() - started, 3),
+    }
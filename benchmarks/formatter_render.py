@@ -0,0 +1,104 @@
+"""Сравнение вывода таблицы фильмов: построчный `print` и одна запись.
+
+Печатает таблицу из синтетических фильмов в небуферизованный поток
+(каждая запись — отдельный системный вызов, как у терминала или
+конвейера) и выводит число строк таблицы в секунду для старого способа
+(`print` на каждую строку) и для `formatter.print_movies_table`.
+
+Запуск из корня проекта (база данных не нужна):
+    python -m benchmarks.formatter_render [--rows N] [--repeat N] [--output ФАЙЛ]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import time
+
+from config import AGE_RATING_DESCRIPTIONS
+from favorites import favorite_ids_among
+from formatter import print_movies_table
+
+
+RATINGS = ["G", "PG", "PG-13", "R", "NC-17"]
+
+
+def _make_films(count):
+    """Синтетические фильмы в формате результатов поиска."""
+    return [
+        {
+            "film_id": i,
+            "title": f"FILM TITLE {i}",
+            "release_year": 2006,
+            "rental_rate": "2.99",
+            "replacement_cost": "19.99",
+            "rating": RATINGS[i % len(RATINGS)],
+            "description": "A Epic Drama of a Feminist And a Mad Scientist " * 5,
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def _legacy_print_movies_table(films, offset=0):
+    """Прежний вывод: отдельный `print` на каждую строку таблицы."""
+    favorite_ids = favorite_ids_among(f["film_id"] for f in films)
+    print(f"{' РЕЗУЛЬТАТЫ ПОИСКА':^100}")
+    for i, film in enumerate(films, start=offset + 1):
+        title = film.get("title", "Без названия")
+        year = film.get("release_year", "N/A")
+        ren_raw = film.get("rental_rate")
+        rep_raw = film.get("replacement_cost")
+        try:
+            ren = f"{float(ren_raw):.2f}" if ren_raw is not None else "N/A"
+        except Exception:
+            ren = str(ren_raw) if ren_raw is not None else "N/A"
+        try:
+            rep = f"{float(rep_raw):.2f}" if rep_raw is not None else "N/A"
+        except Exception:
+            rep = str(rep_raw) if rep_raw is not None else "N/A"
+        rating = film.get("rating", "N/A")
+        rating_desc = AGE_RATING_DESCRIPTIONS.get(rating, rating)
+        desc = film.get("description") or ""
+        film_id = film.get("film_id")
+        fav_marker = " " * 10 + "❤" if film_id in favorite_ids else ""
+        print(f"\n  {i}.   {title} ({year}){fav_marker}")
+        print(f"   Аренда: ${ren} | Покупка: ${rep} | Возрастной рейтинг: {rating_desc}")
+        if desc:
+            desc_lines = desc[:200] + "..." if len(desc) > 200 else desc
+            print(f"       {desc_lines}")
+
+
+def _measure(render, films, repeat, stream):
+    """Возвращает число фильмов, выведенных в секунду."""
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(stream):
+        for _ in range(repeat):
+            render(films)
+    elapsed = time.perf_counter() - start
+    return len(films) * repeat / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--output", default=os.devnull,
+                        help="куда писать таблицу (по умолчанию — в никуда)")
+    args = parser.parse_args()
+
+    films = _make_films(args.rows)
+    with open(args.output, "wb", buffering=0) as raw:
+        # write_through: каждая запись сразу уходит в файл, без буфера
+        stream = io.TextIOWrapper(raw, encoding="utf-8", write_through=True)
+        before = _measure(_legacy_print_movies_table, films, args.repeat, stream)
+        after = _measure(print_movies_table, films, args.repeat, stream)
+        stream.detach()
+
+    print(f"{'вывод':<22}{'строк/сек':>14}")
+    print(f"{'print на строку':<22}{before:>14.0f}")
+    print(f"{'одна запись':<22}{after:>14.0f}")
+    print(f"ускорение: x{after / before:.1f}")
+
+
+if __name__ == "__main__":
+    main()
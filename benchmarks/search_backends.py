@@ -0,0 +1,55 @@
+"""Сравнение движков поиска по ключевому слову.
+
+Для каждого движка выполняет набор запросов (счётчик + первая страница)
+с отключённым кэшем и печатает среднее время и расхождения с `like`.
+
+Запуск из корня проекта (нужна база Sakila, параметры в .env):
+    python -m benchmarks.search_backends [--repeat N] [слово ...]
+"""
+
+import argparse
+import time
+
+import mysql_connector
+from search_backends import SEARCH_BACKENDS
+
+
+DEFAULT_KEYWORDS = ["love", "ACADEMY", "dino", "man", "sun", "zz", "a"]
+
+
+def _run_queries(keywords, repeat):
+    """Выполняет запросы и возвращает (среднее время в мс, результаты)."""
+    results = {}
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for kw in keywords:
+            mysql_connector.invalidate_search_cache()
+            total = mysql_connector.get_keyword_count(kw)
+            films = mysql_connector.search_by_keyword(kw, limit=50)
+            results[kw] = (total, [f["film_id"] for f in films])
+    elapsed = time.perf_counter() - start
+    return elapsed * 1000 / (repeat * len(keywords)), results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("keywords", nargs="*", default=DEFAULT_KEYWORDS)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    baseline = None
+    print(f"{'движок':<10}{'мс/запрос':>12}  расхождения с like")
+    for name in SEARCH_BACKENDS:
+        actual = mysql_connector.set_search_backend(name)
+        # Прогрев: построение индекса не входит в замер
+        mysql_connector.get_keyword_count(args.keywords[0])
+        avg_ms, results = _run_queries(args.keywords, args.repeat)
+        if baseline is None:
+            baseline = results
+        diff = [kw for kw in args.keywords if results[kw] != baseline[kw]]
+        label = name if actual == name else f"{name}->{actual}"
+        print(f"{label:<10}{avg_ms:>12.2f}  {', '.join(diff) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""Каталог фильмов в памяти для развёртываний только для чтения.
+
+При `CATALOG_MODE = "memory"` таблицы `film`, `film_category`,
+`film_actor`, `actor` и `category` загружаются одним снимком и функции
+поиска `mysql_connector` отвечают из памяти, не обращаясь к MySQL.
+Снимок перечитывается в фоне каждые `CATALOG_REFRESH_INTERVAL` секунд
+(см. `ReferenceDataCache` в `reference_data.py`).
+
+Устройство снимка:
+- фильмы хранятся по колонкам в порядке `(title, film_id)` — в том же,
+  что и `ORDER BY f.title, f.film_id` в SQL; номер фильма в этом порядке
+  (позиция) — номер бита в битовых масках;
+- для каждого жанра, года и возрастной категории — битовая маска фильмов
+  (целое число Python), фильтры — пересечение масок;
+- ключевое слово ищется по триграммному индексу названий (`TrigramIndex`),
+  то есть как подстрока названия без учёта регистра — так же, как в
+  движке `trigram` (и в `like`, кроме сравнения букв с диакритикой). При движке `fulltext` (название и описание)
+  поиск по ключевому слову идёт в MySQL (см. `mysql_connector`).
+
+Справочники (жанры, возрастные категории, границы лет) тоже отдаются из
+снимка.
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import islice
+
+from config import CATALOG_REFRESH_INTERVAL
+from mysql_connector import _order_ratings, get_connection
+from reference_data import ReferenceDataCache
+from search_backends import TrigramIndex
+
+
+# Колонки фильма в результатах поиска (как в SELECT mysql_connector)
+FILM_COLUMNS = (
+    "film_id",
+    "title",
+    "description",
+    "release_year",
+    "rating",
+    "rental_rate",
+    "replacement_cost",
+)
+
+
+def _iter_positions(bits):
+    """Номера установленных битов маски по возрастанию."""
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+def _title_key(title, film_id):
+    """Ключ сортировки фильма: название без учёта регистра, затем id."""
+    return (title or "").casefold(), film_id
+
+
+class CatalogSnapshot:
+    """Неизменяемый снимок каталога с индексами.
+
+    Параметры:
+        films: Строки `film` (словари с колонками `FILM_COLUMNS`)
+        film_categories: Пары (film_id, category_id)
+        film_actors: Пары (film_id, actor_id)
+        actors: Строки `actor` (actor_id, first_name, last_name)
+        categories: Строки `category` (category_id, name)
+    """
+
+    def __init__(self, films, film_categories, film_actors, actors, categories):
+        films = sorted(films, key=lambda f: _title_key(f["title"], f["film_id"]))
+        self._size = len(films)
+        self._all = (1 << self._size) - 1
+
+        # Колонки и сортированный индекс названий
+        self._columns = {
+            name: [f[name] for f in films] for name in FILM_COLUMNS
+        }
+        self._film_ids = array("q", self._columns["film_id"])
+        self._positions = {
+            film_id: pos for pos, film_id in enumerate(self._film_ids)}
+        self._title_keys = [
+            _title_key(f["title"], f["film_id"]) for f in films]
+        self._titles = TrigramIndex(
+            (pos, f["title"]) for pos, f in enumerate(films))
+
+        # Битовые маски по годам и возрастным категориям
+        self._year_bits = {}
+        self._rating_bits = {}
+        for pos, f in enumerate(films):
+            bit = 1 << pos
+            year = f["release_year"]
+            if year is not None:
+                self._year_bits[year] = self._year_bits.get(year, 0) | bit
+            rating = f["rating"]
+            if rating is not None:
+                self._rating_bits[rating] = self._rating_bits.get(rating, 0) | bit
+        self._years = sorted(self._year_bits)
+
+        # Маски по жанрам
+        self._genre_bits = {}
+        for film_id, category_id in film_categories:
+            pos = self._positions.get(film_id)
+            if pos is not None:
+                self._genre_bits[category_id] = (
+                    self._genre_bits.get(category_id, 0) | (1 << pos))
+
+        # Актёры: состав фильма (в порядке фамилия, имя) и фильмы актёра
+        self._actors = {a["actor_id"]: dict(a) for a in actors}
+        cast = {}
+        self._actor_films = {}
+        for film_id, actor_id in film_actors:
+            pos = self._positions.get(film_id)
+            if pos is None or actor_id not in self._actors:
+                continue
+            cast.setdefault(film_id, []).append(actor_id)
+            self._actor_films[actor_id] = (
+                self._actor_films.get(actor_id, 0) | (1 << pos))
+
+        def actor_key(actor_id):
+            a = self._actors[actor_id]
+            return ((a["last_name"] or "").casefold(),
+                    (a["first_name"] or "").casefold(), actor_id)
+
+        self._cast = {
+            film_id: tuple(sorted(set(ids), key=actor_key))
+            for film_id, ids in cast.items()
+        }
+        self.categories = [dict(c) for c in categories]
+
+    def __len__(self):
+        return self._size
+
+    def reference_data(self):
+        """Справочники в том же виде, что `mysql_connector.get_reference_data`."""
+        year_bounds = (
+            (self._years[0], self._years[-1]) if self._years else (None, None))
+        return {
+            "genres": [dict(c) for c in self.categories],
+            "age_ratings": _order_ratings(list(self._rating_bits)),
+            "year_bounds": year_bounds,
+        }
+
+    def _film(self, pos):
+        """Строка фильма по позиции (новый словарь)."""
+        return {name: column[pos] for name, column in self._columns.items()}
+
+    def _keyword_bits(self, keyword):
+        bits = 0
+        for pos in self._titles.search(keyword):
+            bits |= 1 << pos
+        return bits
+
+    def _years_bits(self, year_min, year_max):
+        bits = 0
+        lo = bisect_left(self._years, year_min)
+        hi = bisect_right(self._years, year_max)
+        for year in self._years[lo:hi]:
+            bits |= self._year_bits[year]
+        return bits
+
+    def match(self, spec):
+        """Маска фильмов, подходящих под фильтры `FilterSpec`."""
+        bits = self._all
+        if spec.keyword:
+            bits &= self._keyword_bits(spec.keyword)
+        if spec.genre_id is not None:
+            bits &= self._genre_bits.get(spec.genre_id, 0)
+        if spec.year_min is not None:
+            bits &= self._years_bits(spec.year_min, spec.year_max)
+        if spec.ratings:
+            allowed = 0
+            for rating in spec.ratings:
+                allowed |= self._rating_bits.get(rating, 0)
+            bits &= allowed
+        return bits
+
+    def count(self, spec):
+        """Число фильмов, подходящих под фильтры."""
+        return self.match(spec).bit_count()
+
+    def films(self, spec, offset=0, limit=None, after=None):
+        """Фильмы, подходящие под фильтры, в порядке `(title, film_id)`.
+
+        Параметры:
+            offset: Сколько фильмов пропустить
+            limit: Сколько вернуть (None — все)
+            after: Позиция `(title, film_id)`: вернуть фильмы строго после
+                   неё (keyset-пагинация; `offset` тогда не учитывается)
+        """
+        bits = self.match(spec)
+        if after is not None:
+            start = bisect_right(self._title_keys, _title_key(*after))
+            bits &= ~((1 << start) - 1)
+            offset = 0
+        stop = None if limit is None else offset + int(limit)
+        return [self._film(pos)
+                for pos in islice(_iter_positions(bits), offset, stop)]
+
+    def iter_films(self, spec):
+        """Все подходящие фильмы по одному."""
+        for pos in _iter_positions(self.match(spec)):
+            yield self._film(pos)
+
+    def actors_by_film(self, film_id):
+        """Актёры фильма (actor_id, first_name, last_name)."""
+        return [dict(self._actors[a]) for a in self._cast.get(film_id, ())]
+
+    def films_by_actor(self, actor_id, offset=0, limit=None):
+        """Фильмы актёра в порядке названия."""
+        bits = self._actor_films.get(actor_id, 0)
+        stop = None if limit is None else offset + int(limit)
+        return [self._film(pos)
+                for pos in islice(_iter_positions(bits), offset, stop)]
+
+    def films_by_actor_count(self, actor_id):
+        """Число фильмов актёра."""
+        return self._actor_films.get(actor_id, 0).bit_count()
+
+
+def load_catalog():
+    """Читает таблицы каталога из MySQL (в одной транзакции, чтобы снимок
+    был согласованным) и строит `CatalogSnapshot`.
+    """
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("START TRANSACTION WITH CONSISTENT SNAPSHOT")
+            try:
+                cursor.execute(
+                    "SELECT film_id, title, description, release_year, rating, "
+                    "rental_rate, replacement_cost FROM film")
+                films = cursor.fetchall()
+                cursor.execute("SELECT film_id, category_id FROM film_category")
+                film_categories = [
+                    (r["film_id"], r["category_id"]) for r in cursor.fetchall()]
+                cursor.execute("SELECT film_id, actor_id FROM film_actor")
+                film_actors = [
+                    (r["film_id"], r["actor_id"]) for r in cursor.fetchall()]
+                cursor.execute(
+                    "SELECT actor_id, first_name, last_name FROM actor")
+                actors = cursor.fetchall()
+                cursor.execute(
+                    "SELECT category_id, name FROM category ORDER BY name")
+                categories = cursor.fetchall()
+            finally:
+                cursor.execute("COMMIT")
+    return CatalogSnapshot(films, film_categories, film_actors, actors, categories)
+
+
+_cache = ReferenceDataCache(load_catalog, CATALOG_REFRESH_INTERVAL)
+
+
+def get_catalog():
+    """Возвращает текущий снимок каталога (загружает при первом вызове)."""
+    return _cache.get()
+
+
+def loaded_catalog():
+    """Возвращает снимок, если он уже загружен, иначе None (без загрузки)."""
+    return _cache.peek()
+
+
+def refresh():
+    """Принудительно перечитывает каталог.
+
+    Возвращает:
+        bool: True если снимок обновлён
+    """
+    return _cache.refresh()
@@ -0,0 +1,375 @@
+"""Неинтерактивный интерфейс командной строки для скриптов и cron/CI.
+
+Вызывает функции `mysql_connector`, `log_stats` и `favorites` напрямую,
+без меню и вопросов. Интерактивные модули (`main`, `searches`,
+`input_utils`) не импортируются, а остальные загружаются только нужной
+командой, поэтому запуск быстрый.
+
+Запуск:
+    python cli.py keyword love --years 2005 2006 --rating PG
+    python cli.py genre 5 --all --format csv > films.csv
+    python cli.py genre --list
+    python cli.py actor 1 --format jsonl
+    python cli.py stats --limit 10
+    python cli.py favorites
+    python cli.py batch specs.jsonl --workers 8 > results.jsonl
+
+Форматы вывода (`--format`): text (по умолчанию), jsonl, csv.
+Ошибка подключения к MySQL — код возврата 2.
+"""
+
+import argparse
+import json
+import sys
+
+
+OUTPUT_FORMATS = ("text", "jsonl", "csv")
+
+# Колонки CSV для статистики запросов и избранного
+STATS_FIELDS = (
+    "kind", "search_type", "params", "count", "last", "results_count",
+)
+FAVORITE_FIELDS = ("film_id", "title", "year", "age_rating", "added")
+
+
+def _output(args):
+    """Поток вывода; для CSV — без преобразования концов строк."""
+    if args.format == "csv" and hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(newline="")
+    return sys.stdout
+
+
+def _chunks(rows, size):
+    """Разбивает поток строк на списки по `size`."""
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _write_films(args, films, offset=0, total=None):
+    """Выводит фильмы в выбранном формате.
+
+    Возвращает:
+        int: Число выведенных фильмов
+    """
+    out = _output(args)
+    if args.format != "text":
+        from exporters import export_films
+
+        return export_films(films, out, args.format)
+
+    from formatter import render_movies_table
+
+    # Текстовая таблица строится страницами, чтобы поток (--all) не
+    # собирался в памяти целиком
+    count = 0
+    for chunk in _chunks(films, args.limit):
+        out.write(render_movies_table(
+            chunk, offset=offset + count, total=total, show_header=not count))
+        count += len(chunk)
+    if not count:
+        out.write(render_movies_table([]))
+    return count
+
+
+def _search(args, search_type, params, fetch_all, fetch_first, fetch_page,
+            count):
+    """Общая часть команд `keyword` и `genre`: страница или вся выборка,
+    вывод и запись запроса в лог.
+    """
+    if args.all:
+        total = None
+        written = _write_films(args, fetch_all())
+        results_count = written
+    else:
+        if args.offset == 0:
+            films, total, _ = fetch_first()
+        else:
+            films = fetch_page()
+            total = count()
+        _write_films(args, films, offset=args.offset, total=total)
+        results_count = total
+
+    if not args.no_log:
+        from log_stats import log_search
+
+        log_search(search_type, params, int(results_count or 0))
+    return 0
+
+
+def _filter_params(genre_id, years, age_rating):
+    """Фильтры запроса в виде словаря — как их логирует интерактивный поиск."""
+    params = {}
+    if genre_id is not None:
+        params["genre_id"] = genre_id
+    if years:
+        params.update({"year_min": years[0], "year_max": years[1]})
+    if age_rating:
+        params["age_rating"] = age_rating
+    return params
+
+
+def _keyword(args):
+    import mysql_connector as db
+
+    year_min, year_max = args.years or (None, None)
+    filters = dict(
+        genre_id=args.genre, year_min=year_min, year_max=year_max,
+        age_rating=args.rating)
+    params = {"keyword": args.keyword}
+    params.update(_filter_params(args.genre, args.years, args.rating))
+    return _search(
+        args, "keyword", params,
+        fetch_all=lambda: db.iter_search_by_keyword(args.keyword, **filters),
+        fetch_first=lambda: db.search_by_keyword_with_total(
+            args.keyword, limit=args.limit, **filters),
+        fetch_page=lambda: db.search_by_keyword(
+            args.keyword, offset=args.offset, limit=args.limit, **filters),
+        count=lambda: db.get_keyword_count(args.keyword, **filters),
+    )
+
+
+def _genre(args):
+    import mysql_connector as db
+
+    if args.list:
+        return _list_genres(args, db.get_genres())
+    if args.genre_id is None and not args.years:
+        print("Укажите жанр и/или --years.", file=sys.stderr)
+        return 1
+
+    year_min, year_max = args.years or (None, None)
+    filters = dict(
+        genre_id=args.genre_id, year_min=year_min, year_max=year_max,
+        age_rating=args.rating)
+    params = _filter_params(args.genre_id, args.years, args.rating)
+    return _search(
+        args, "genre_year", params,
+        fetch_all=lambda: db.iter_search_by_genre_and_year(**filters),
+        fetch_first=lambda: db.search_by_genre_and_year_with_total(
+            limit=args.limit, **filters),
+        fetch_page=lambda: db.search_by_genre_and_year(
+            offset=args.offset, limit=args.limit, **filters),
+        count=lambda: db.get_genre_year_count(**filters),
+    )
+
+
+def _list_genres(args, genres):
+    out = _output(args)
+    if args.format == "text":
+        from formatter import render_genres
+
+        out.write(render_genres(genres))
+        return 0
+
+    from exporters import write_csv, write_jsonl
+
+    rows = [{"category_id": g["category_id"], "name": g["name"]}
+            for g in genres]
+    if args.format == "jsonl":
+        write_jsonl(rows, out)
+    else:
+        write_csv(rows, out, fields=("category_id", "name"))
+    return 0
+
+
+def _actor(args):
+    import mysql_connector as db
+
+    if args.all:
+        _write_films(args, db.iter_films_by_actor(args.actor_id))
+        return 0
+    films = db.get_films_by_actor(
+        args.actor_id, offset=args.offset, limit=args.limit)
+    total = db.get_films_by_actor_count(args.actor_id)
+    _write_films(args, films, offset=args.offset, total=total)
+    return 0
+
+
+def _stats(args):
+    from log_stats import get_last_queries, get_top_queries
+
+    top_queries = get_top_queries(args.limit)
+    last_queries = get_last_queries(args.limit)
+    out = _output(args)
+    if args.format == "text":
+        from formatter import render_stats
+
+        out.write(render_stats(top_queries, last_queries))
+        return 0
+
+    from exporters import write_csv, write_jsonl
+
+    rows = [
+        {
+            "kind": "top",
+            "search_type": item["_id"].get("type"),
+            "params": item["_id"].get("params"),
+            "count": item.get("count"),
+            "last": item.get("last"),
+        }
+        for item in top_queries
+    ] + [
+        {
+            "kind": "last",
+            "search_type": q.get("search_type"),
+            "params": q.get("params"),
+            "last": q.get("timestamp"),
+            "results_count": q.get("results_count"),
+        }
+        for q in last_queries
+    ]
+    if args.format == "jsonl":
+        write_jsonl(rows, out)
+    else:
+        for row in rows:
+            row["params"] = json.dumps(row["params"], ensure_ascii=False)
+        write_csv(rows, out, fields=STATS_FIELDS)
+    return 0
+
+
+def _favorites(args):
+    from favorites import STORE_ERRORS, count_favorites, get_favorites_page
+
+    offset = 0 if args.all else args.offset
+    try:
+        limit = count_favorites() if args.all else args.limit
+        favorites = get_favorites_page(offset, limit)
+    except STORE_ERRORS as e:
+        print(f"Избранное недоступно: {e}", file=sys.stderr)
+        return 2
+    out = _output(args)
+    if args.format == "jsonl":
+        from exporters import write_jsonl
+
+        write_jsonl(favorites, out)
+    elif args.format == "csv":
+        from exporters import write_csv
+
+        write_csv(favorites, out, fields=FAVORITE_FIELDS)
+    elif not favorites:
+        out.write("  Список избранного пуст.\n")
+    else:
+        out.write("".join(
+            f"  {i}. {fav['title']} ({fav.get('year', 'N/A')})"
+            f" — добавлено {fav.get('added', '?')}\n"
+            for i, fav in enumerate(favorites, start=offset + 1)
+        ))
+    return 0
+
+
+def _batch(args):
+    from batch_runner import run_batch
+
+    if args.file == "-":
+        summary = run_batch(
+            sys.stdin, sys.stdout, workers=args.workers, log=not args.no_log)
+    else:
+        with open(args.file, "r", encoding="utf-8") as f:
+            summary = run_batch(
+                f, sys.stdout, workers=args.workers, log=not args.no_log)
+    print(
+        f"Запросов: {summary['queries']}, ошибок: {summary['failed']}, "
+        f"записано в лог: {summary['logged']}, время: {summary['elapsed']} с",
+        file=sys.stderr)
+    return 1 if summary["failed"] else 0
+
+
+def _add_paging(parser, stream=True):
+    """Добавляет параметры страницы (--limit, --offset, --all)."""
+    from config import LIMIT
+
+    parser.add_argument(
+        "--limit", type=int, default=LIMIT, help=f"размер страницы ({LIMIT})")
+    parser.add_argument(
+        "--offset", type=int, default=0, help="сколько результатов пропустить")
+    parser.add_argument(
+        "--all", action="store_true",
+        help="вывести все результаты" + (" (потоком)" if stream else ""))
+
+
+def _add_filters(parser):
+    """Добавляет фильтры поиска (--years, --rating)."""
+    parser.add_argument(
+        "--years", type=int, nargs=2, metavar=("MIN", "MAX"),
+        help="диапазон годов выпуска")
+    parser.add_argument(
+        "--rating", help="возрастная категория (включая более мягкие)")
+    parser.add_argument(
+        "--no-log", action="store_true", help="не записывать запрос в лог")
+
+
+def main(argv=None):
+    """Разбирает аргументы командной строки и выполняет команду."""
+    from config import BATCH_WORKERS
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument(
+        "--format", choices=OUTPUT_FORMATS, default="text",
+        help="формат вывода (по умолчанию text)")
+
+    parser = argparse.ArgumentParser(
+        description="Поиск фильмов Sakila без интерактивного меню")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    keyword = commands.add_parser(
+        "keyword", parents=[common], help="поиск по ключевому слову")
+    keyword.add_argument("keyword", help="ключевое слово")
+    keyword.add_argument("--genre", type=int, help="ID жанра")
+    _add_filters(keyword)
+    _add_paging(keyword)
+    keyword.set_defaults(handler=_keyword)
+
+    genre = commands.add_parser(
+        "genre", parents=[common], help="поиск по жанру и/или годам")
+    genre.add_argument("genre_id", type=int, nargs="?", help="ID жанра")
+    genre.add_argument(
+        "--list", action="store_true", help="показать список жанров")
+    _add_filters(genre)
+    _add_paging(genre)
+    genre.set_defaults(handler=_genre)
+
+    actor = commands.add_parser(
+        "actor", parents=[common], help="фильмы с участием актёра")
+    actor.add_argument("actor_id", type=int, help="ID актёра")
+    _add_paging(actor)
+    actor.set_defaults(handler=_actor)
+
+    stats = commands.add_parser(
+        "stats", parents=[common], help="статистика запросов")
+    stats.add_argument(
+        "--limit", type=int, default=5, help="число запросов в списках (5)")
+    stats.set_defaults(handler=_stats)
+
+    favorites = commands.add_parser(
+        "favorites", parents=[common], help="список избранного")
+    _add_paging(favorites, stream=False)
+    favorites.set_defaults(handler=_favorites)
+
+    batch = commands.add_parser(
+        "batch",
+        help="выполнить запросы из файла JSON Lines (результаты — в JSON Lines)")
+    batch.add_argument("file", help="файл с запросами ('-' — stdin)")
+    batch.add_argument(
+        "--workers", type=int, default=BATCH_WORKERS,
+        help=f"число параллельных запросов ({BATCH_WORKERS})")
+    batch.add_argument(
+        "--no-log", action="store_true", help="не записывать запросы в лог")
+    batch.set_defaults(handler=_batch)
+
+    args = parser.parse_args(argv)
+    try:
+        return args.handler(args)
+    except RuntimeError as e:
+        # Ошибка подключения к MySQL (см. mysql_connector._open_connection)
+        print(e, file=sys.stderr)
+        return 2
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -17,6 +17,12 @@ MYSQL_USER = os.getenv("MYSQL_USER")
 MYSQL_PASS = os.getenv("MYSQL_PASS")
 MYSQL_DB = os.getenv("MYSQL_DB")
 
+# Пул соединений MySQL: максимальный размер, время простоя соединения
+# в пуле (сек) и время ожидания свободного соединения (сек).
+MYSQL_POOL_SIZE = int(os.getenv("MYSQL_POOL_SIZE", "5"))
+MYSQL_POOL_MAX_IDLE = float(os.getenv("MYSQL_POOL_MAX_IDLE", "300"))
+MYSQL_POOL_TIMEOUT = float(os.getenv("MYSQL_POOL_TIMEOUT", "10"))
+
 # Части для формирования строки подключения к MongoDB.
 MONGO_URI_PREFIX = os.getenv("MONGO_URI_PREFIX")
 MONGO_URI_SUFFIX = os.getenv("MONGO_URI_SUFFIX")
@@ -24,6 +30,88 @@ MONGO_USER = os.getenv("MONGO_USER")
 MONGO_PASS = os.getenv("MONGO_PASS")
 MONGO_DB = os.getenv("MONGO_DB")
 MONGO_COLL = os.getenv("MONGO_COLL")
+# Коллекция с агрегатами статистики запросов (по умолчанию <MONGO_COLL>_rollup)
+MONGO_ROLLUP_COLL = os.getenv("MONGO_ROLLUP_COLL") or f"{MONGO_COLL}_rollup"
+# Пауза (сек) между попытками подключения к MongoDB после ошибки.
+MONGO_RETRY_COOLDOWN = float(os.getenv("MONGO_RETRY_COOLDOWN", "30"))
+# Срок хранения логов поиска в днях (TTL-индекс); 0 — хранить бессрочно.
+LOG_RETENTION_DAYS = float(os.getenv("LOG_RETENTION_DAYS", "0"))
+# Часовой пояс для отметок времени в логах.
+TIMEZONE = os.getenv("TIMEZONE", "Europe/Berlin")
+# Кэш страниц результатов поиска: максимальное число записей
+# (0 — кэш отключён) и время жизни записи в секундах.
+SEARCH_CACHE_SIZE = int(os.getenv("SEARCH_CACHE_SIZE", "256"))
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", "300"))
+
+# Движок поиска по ключевому слову: "like" (LIKE '%kw%'), "fulltext"
+# (FULLTEXT-индекс film_text по названию и описанию; слова короче трёх
+# символов ищутся подстрокой через LIKE там же; без индекса — "trigram")
+# или "trigram" (триграммный индекс названий в памяти, перестраивается
+# каждые REFERENCE_REFRESH_INTERVAL секунд).
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "like").lower()
+
+# Интервал фонового обновления справочников (жанры, возрастные категории,
+# границы лет) и индекса движка "trigram" в секундах; 0 — загружать один
+# раз и не обновлять.
+REFERENCE_REFRESH_INTERVAL = float(
+    os.getenv("REFERENCE_REFRESH_INTERVAL", "3600"))
+
+# Каталог в памяти для развёртываний только для чтения: "memory" — поиск,
+# актёры и фильмы актёра отвечаются из снимка таблиц каталога (catalog.py),
+# "off" — из MySQL. Поиск по ключевому слову при SEARCH_BACKEND=fulltext
+# всё равно идёт в MySQL. Снимок перечитывается каждые
+# CATALOG_REFRESH_INTERVAL секунд (0 — не обновлять).
+CATALOG_MODE = os.getenv("CATALOG_MODE", "off").lower()
+CATALOG_REFRESH_INTERVAL = float(
+    os.getenv("CATALOG_REFRESH_INTERVAL", "3600"))
+
+# Первая страница поиска вместе с общим числом: "combined" — один запрос
+# (COUNT(*) OVER() или SQL_CALC_FOUND_ROWS); "parallel" — два запроса
+# (страница и COUNT) одновременно на разных соединениях пула: быстрее
+# отвечает на медленных фильтрах, но занимает два соединения на поиск.
+FIRST_PAGE_STRATEGY = os.getenv("FIRST_PAGE_STRATEGY", "combined").lower()
+
+# Сколько соединений пула может занимать один поиск одновременно
+CONNECTIONS_PER_SEARCH = 2 if FIRST_PAGE_STRATEGY == "parallel" else 1
+
+# Число фоновых потоков для упреждающей загрузки (актёры страницы и т.п.)
+PREFETCH_WORKERS = int(os.getenv("PREFETCH_WORKERS", "2"))
+
+# Число параллельных запросов в пакетном режиме (batch_runner.py). Больше
+# MYSQL_POOL_SIZE / CONNECTIONS_PER_SEARCH ставить нет смысла: лишние
+# потоки будут ждать соединения (до MYSQL_POOL_TIMEOUT).
+BATCH_WORKERS = int(os.getenv(
+    "BATCH_WORKERS", str(max(1, MYSQL_POOL_SIZE // CONNECTIONS_PER_SEARCH))))
+
+# HTTP API (api_server.py): адрес, число потоков для запросов к базе,
+# максимум одновременно обрабатываемых запросов и таймаут запроса (сек).
+API_HOST = os.getenv("API_HOST", "127.0.0.1")
+API_PORT = int(os.getenv("API_PORT", "8080"))
+API_WORKERS = int(os.getenv(
+    "API_WORKERS", str(max(1, MYSQL_POOL_SIZE // CONNECTIONS_PER_SEARCH))))
+API_MAX_CONCURRENCY = int(os.getenv("API_MAX_CONCURRENCY", "64"))
+API_REQUEST_TIMEOUT = float(os.getenv("API_REQUEST_TIMEOUT", "10"))
+
+# Фоновая запись логов поиска в MongoDB: длина очереди, размер пакета
+# insert_many, интервал сброса неполного пакета (сек) и политика при
+# переполнении очереди ("drop_oldest" или "block").
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "1000"))
+LOG_BATCH_SIZE = int(os.getenv("LOG_BATCH_SIZE", "50"))
+LOG_FLUSH_INTERVAL = float(os.getenv("LOG_FLUSH_INTERVAL", "2"))
+LOG_QUEUE_POLICY = os.getenv("LOG_QUEUE_POLICY", "drop_oldest")
+
+# Локальный журнал логов на время недоступности MongoDB (JSON Lines)
+# и размер пакета при его выгрузке.
+LOG_SPOOL_FILE = os.getenv(
+    "LOG_SPOOL_FILE", str(BASE_DIR / "search_log_spool.jsonl"))
+LOG_SPOOL_CHUNK = int(os.getenv("LOG_SPOOL_CHUNK", "500"))
+
+# Хранилище избранного: "json" (favorites.json) или "sqlite".
+FAVORITES_BACKEND = os.getenv("FAVORITES_BACKEND", "json")
+FAVORITES_DB = os.getenv("FAVORITES_DB", "favorites.db")
+# Отложенная запись избранного в файл (сек); 0 — сохранять сразу.
+FAVORITES_WRITE_DELAY = float(os.getenv("FAVORITES_WRITE_DELAY", "0"))
+
 # Лимит результатов на одной странице по умолчанию для поисковых запросов.
 LIMIT = 9
 
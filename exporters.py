@@ -0,0 +1,90 @@
+"""Машиночитаемый вывод результатов поиска: JSON Lines и CSV.
+
+Строки записываются по мере поступления, поэтому вместе с функциями
+`iter_*` из `mysql_connector.py` выгрузка любого объёма выполняется в
+постоянной памяти:
+
+    with open("films.csv", "w", newline="", encoding="utf-8") as out:
+        export_films(iter_search_by_genre_and_year(genre_id=1), out, "csv")
+"""
+
+import csv
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+
+EXPORT_FORMATS = ("jsonl", "csv")
+
+# Поля фильма в порядке колонок CSV
+FILM_FIELDS = (
+    "film_id",
+    "title",
+    "description",
+    "release_year",
+    "rating",
+    "rental_rate",
+    "replacement_cost",
+)
+
+
+def json_default(value):
+    """Сериализует значения MySQL, которых нет в JSON."""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def write_jsonl(rows, out):
+    """Пишет строки в `out` в формате JSON Lines (объект на строку).
+
+    Возвращает:
+        int: Число записанных строк
+    """
+    count = 0
+    for row in rows:
+        out.write(json.dumps(row, ensure_ascii=False, default=json_default))
+        out.write("\n")
+        count += 1
+    return count
+
+
+def write_csv(rows, out, fields=FILM_FIELDS):
+    """Пишет строки в `out` в формате CSV с заголовком.
+
+    Поля, которых нет в `fields`, пропускаются. Файл нужно открывать с
+    `newline=""`.
+
+    Возвращает:
+        int: Число записанных строк
+    """
+    writer = csv.DictWriter(
+        out, fieldnames=list(fields), extrasaction="ignore")
+    writer.writeheader()
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+    return count
+
+
+def export_films(films, out, fmt="jsonl"):
+    """Пишет фильмы в `out` в формате `fmt`.
+
+    Параметры:
+        films: Итерируемые словари фильмов (список или генератор `iter_*`)
+        out: Текстовый поток для записи
+        fmt: Одно из `EXPORT_FORMATS`
+    Возвращает:
+        int: Число записанных фильмов
+    """
+    if fmt == "jsonl":
+        return write_jsonl(films, out)
+    if fmt == "csv":
+        return write_csv(films, out)
+    raise ValueError(
+        f"Неизвестный формат вывода: {fmt!r} "
+        f"(допустимо: {', '.join(EXPORT_FORMATS)})"
+    )
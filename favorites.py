@@ -1,30 +1,71 @@
 """Модуль для управления избранными фильмами.
-Хранит избранные фильмы в локальном JSON файле.
+Хранит избранные фильмы в локальном JSON файле или базе SQLite
+(см. `favorites_store.py`, настройка `FAVORITES_BACKEND`).
 Содержит функции для работы с данными и обработчики для меню.
 """
 
-import json
-import os
+import threading
 from datetime import datetime
 
+from config import (
+    FAVORITES_BACKEND,
+    FAVORITES_DB,
+    FAVORITES_WRITE_DELAY,
+    LIMIT,
+)
+from favorites_store import create_store
+
 
 FAVORITES_FILE = 'favorites.json'
 
+# Ошибки хранилища: неизвестный FAVORITES_BACKEND, недоступный файл/база
+STORE_ERRORS = (IOError, ValueError)
+
+# Хранилище создаётся при первом обращении, чтобы ошибка настройки или
+# недоступная база не мешали запуску приложения
+_store = None
+_store_lock = threading.Lock()
+
+
+def _get_store():
+    """Возвращает хранилище избранного, создавая его при первом вызове.
+
+    Исключения:
+        IOError, ValueError: если хранилище не удалось открыть
+                             (повторная попытка — при следующем вызове)
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = create_store(
+                    FAVORITES_BACKEND, FAVORITES_FILE, FAVORITES_DB,
+                    write_delay=FAVORITES_WRITE_DELAY)
+    return _store
+
 
 def load_favorites():
-    """Загружает избранные фильмы из JSON файла.
+    """Возвращает избранные фильмы.
     Возвращает:
         dict: Словарь с ключом 'films' содержащий список избранных фильмов
     """
-    if not os.path.exists(FAVORITES_FILE):
-        return {"films": []}
+    return {"films": _get_store().films()}
 
-    try:
-        with open(FAVORITES_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except (json.JSONDecodeError, IOError): # перехватываетсразу двеошибки,
-        # если файл повреждён или недоступен
-        return {"films": []}
+
+def count_favorites():
+    """Возвращает число фильмов в избранном."""
+    return _get_store().count()
+
+
+def get_favorites_page(offset=0, limit=LIMIT):
+    """Возвращает страницу избранного в порядке добавления.
+    Параметры:
+        offset: Сколько фильмов пропустить
+        limit: Размер страницы
+    Возвращает:
+        list: Записи избранного (film_id, title, added, ...)
+    """
+    return _get_store().page(offset, limit)
 
 
 def add_to_favorites(film_id, title, year=None, age_rating=None):
@@ -37,12 +78,6 @@ def add_to_favorites(film_id, title, year=None, age_rating=None):
     Возвращает:
         bool: True если фильм добавлен, False если уже в избранном
     """
-    # Проверяем, нет ли уже такого фильма
-    if is_favorite(film_id):
-        return False
-    
-    data = load_favorites()
-
     film_data = {
         'film_id': film_id,
         'title': title,
@@ -54,17 +89,12 @@ def add_to_favorites(film_id, title, year=None, age_rating=None):
     if age_rating:
         film_data['age_rating'] = age_rating
 
-    data['films'].append(film_data)
-    
-    # Сохраняем в файл
+    # Хранилище само проверяет, нет ли уже такого фильма, и сохраняет его
     try:
-        with open(FAVORITES_FILE, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-    except IOError as e:
+        return _get_store().add(film_data)
+    except STORE_ERRORS as e:
         print(f"Ошибка сохранения избранного: {e}")
         return False
-    
-    return True
 
 
 def is_favorite(film_id):
@@ -72,10 +102,26 @@ def is_favorite(film_id):
     Параметры:
         film_id: ID фильма для проверки
     Возвращает:
-        bool: True если фильм в избранном
+        bool: True если фильм в избранном (False, если хранилище недоступно)
+    """
+    try:
+        return _get_store().contains(film_id)
+    except STORE_ERRORS:
+        return False
+
+
+def favorite_ids_among(film_ids):
+    """Проверяет сразу несколько фильмов (одним обращением к хранилищу).
+    Параметры:
+        film_ids: ID фильмов для проверки
+    Возвращает:
+        set: ID тех фильмов, что находятся в избранном (пустое, если
+             хранилище недоступно)
     """
-    data = load_favorites()
-    return any(f['film_id'] == film_id for f in data['films'])
+    try:
+        return _get_store().ids_among(film_ids)
+    except STORE_ERRORS:
+        return set()
 
 
 def clear_favorites():
@@ -84,9 +130,13 @@ def clear_favorites():
         int: Количество удалённых фильмов
     """
     from input_utils import process_yes_no_input
-    
-    data = load_favorites()
-    count = len(data['films'])
+
+    try:
+        store = _get_store()
+        count = store.count()
+    except STORE_ERRORS as e:
+        print(f"\n  Избранное недоступно: {e}\n")
+        return
 
     if count == 0:
         print("\n  Список избранного уже пуст.\n")
@@ -97,38 +147,15 @@ def clear_favorites():
         print("\n  Операция отменена.\n")
         return
     
-    data['films'] = []
-    
-    # Сохраняем в файл
     try:
-        with open(FAVORITES_FILE, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        count = store.clear()
         print(f"\n  Удалено фильмов из избранного: {count}\n")
     except IOError as e:
         print(f"Ошибка сохранения избранного: {e}")
 
 
-def view_favorites():
-    """Показывает все избранные фильмы с возможностью просмотра актёров."""
-    from formatter import print_movies_table, print_actors, SEPARATOR, SEPARATOR_EQUAL, SEPARATOR_MINUS
-    from mysql_connector import get_actors_by_film
-    from input_utils import process_input
-    
-    print("\n" + SEPARATOR_EQUAL)
-    print(f"{' МОИ ИЗБРАННЫЕ ФИЛЬМЫ':^70}")
-    print(SEPARATOR_EQUAL + "\n")
-
-    data = load_favorites() 
-    favorites = data['films'] 
-
-    if not favorites:
-        print("  Список избранного пуст.\n")
-        print("  Добавляйте фильмы в избранное во время поиска (нажмите 'f').\n")
-        return
-
-    print(f" Всего в избранном: {len(favorites)} фильм(ов)\n")
-
-    # Преобразуем в формат для print_movies_table
+def _favorites_for_display(favorites):
+    """Преобразует записи избранного в формат для print_movies_table."""
     films_for_display = []
     for fav in favorites:
         film = {
@@ -141,24 +168,72 @@ def view_favorites():
             'description': f"Добавлено: {fav['added']}"
         }
         films_for_display.append(film)
+    return films_for_display
+
 
-    print_movies_table(films_for_display, show_header=False)  # formatter.py
-    print(SEPARATOR)
+def view_favorites():
+    """Показывает избранные фильмы постранично с возможностью просмотра
+    актёров.
+    """
+    from formatter import print_movies_table, print_actors, SEPARATOR, SEPARATOR_EQUAL, SEPARATOR_MINUS
+    from searches import prefetch_cast, get_cast
+    from input_utils import process_input
     
-    # Интерактивное взаимодействие
+    print("\n" + SEPARATOR_EQUAL)
+    print(f"{' МОИ ИЗБРАННЫЕ ФИЛЬМЫ':^70}")
+    print(SEPARATOR_EQUAL + "\n")
+
+    try:
+        store = _get_store()
+        total = store.count()
+    except STORE_ERRORS as e:
+        print(f"  Избранное недоступно: {e}\n")
+        return
+
+    if not total:
+        print("  Список избранного пуст.\n")
+        print("  Добавляйте фильмы в избранное во время поиска (нажмите 'f').\n")
+        return
+
+    print(f" Всего в избранном: {total} фильм(ов)\n")
+
+    offset = 0
+    show_page = True
     while True:
-        choice = process_input(  # input_utils.py
-            "\n Введите номер фильма для просмотра актёров или 'q' для выхода: "
-        )
+        if show_page:
+            films_for_display = _favorites_for_display(
+                store.page(offset, LIMIT))
+            if not films_for_display:
+                break
+            print_movies_table(  # formatter.py
+                films_for_display, offset=offset, total=total, show_header=False)
+            print(SEPARATOR)
+            # Актёров фильмов страницы загружаем в фоне одним запросом
+            cast_future = prefetch_cast(films_for_display)  # searches.py
+            show_page = False
+
+        start = offset + 1
+        end = offset + len(films_for_display)
+        has_next = end < total
+        if has_next:
+            prompt = (f"\n {start}–{end} из {total}. Введите номер фильма для "
+                      "просмотра актёров, Enter — следующая страница, 'q' — выход: ")
+        else:
+            prompt = "\n Введите номер фильма для просмотра актёров или 'q' для выхода: "
+        choice = process_input(prompt)  # input_utils.py
         
-        if choice.lower() == 'q' or not choice:
+        if choice.lower() == 'q' or (not choice and not has_next):
             break
+        if not choice:
+            offset += LIMIT
+            show_page = True
+            continue
         
         try:
             idx = int(choice)
-            if 1 <= idx <= len(films_for_display):
-                film = films_for_display[idx - 1]
-                actors = get_actors_by_film(film.get("film_id"))  # mysql_connector.py
+            if start <= idx <= end:
+                film = films_for_display[idx - start]
+                actors = get_cast(film.get("film_id"), cast_future)  # searches.py
                 print_actors(actors, film_title=film.get("title"))  # formatter.py
 
                 # Выбор актёра для просмотра его фильмов
@@ -180,12 +255,14 @@ def view_favorites():
                                 actor_name = f"{fn} {ln}"
                                 show_actor_films(actor_id, actor_name)  # searches.py
                                 
-                                # Повторный вывод списка избранного
+                                # Повторный вывод текущей страницы избранного
                                 print("\n" + SEPARATOR_EQUAL)
                                 print(f"{' МОИ ИЗБРАННЫЕ ФИЛЬМЫ':^70}")
                                 print(SEPARATOR_EQUAL + "\n")
-                                print(f" Всего в избранном: {len(favorites)} фильм(ов)\n")
-                                print_movies_table(films_for_display, show_header=False)  # formatter.py
+                                print(f" Всего в избранном: {total} фильм(ов)\n")
+                                print_movies_table(  # formatter.py
+                                    films_for_display, offset=offset,
+                                    total=total, show_header=False)
                                 print(SEPARATOR)
                                 break
                             else:
@@ -193,7 +270,6 @@ def view_favorites():
                         except ValueError:
                             print(" Ожидался номер актёра.")
             else:
-                print(f"Неверный номер — введите число от 1 до {len(films_for_display)}")
+                print(f"Неверный номер — введите число от {start} до {end}")
         except ValueError:
             print("Ожидался номер фильма.")
-
@@ -0,0 +1,406 @@
+"""Хранилища избранных фильмов.
+
+`JsonFavoritesStore` держит избранное в памяти и сохраняет его в JSON-файл:
+файл читается один раз и повторно — только если он изменился извне (по
+времени изменения и размеру). Поиск по `film_id` выполняется по словарю в
+памяти. Запись атомарная: во временный файл и `os.replace`.
+
+`SqliteFavoritesStore` хранит избранное в SQLite (режим WAL, уникальный
+индекс по `film_id`): добавление не переписывает весь список, а несколько
+процессов могут работать с одной базой.
+
+У обоих хранилищ одинаковый интерфейс; нужное создаёт `create_store`.
+"""
+
+import atexit
+import json
+import os
+import secrets
+import sqlite3
+import stat
+import threading
+
+
+FAVORITES_BACKENDS = ("json", "sqlite")
+
+
+class JsonFavoritesStore:
+    """Избранное в памяти с записью в JSON-файл формата {"films": [...]}.
+
+    Параметры:
+        path: Путь к JSON-файлу
+        write_delay: Задержка отложенной записи в секундах. 0 — писать
+                     сразу; иначе несколько изменений подряд сохраняются
+                     одной записью (и обязательно — при выходе)
+    """
+
+    def __init__(self, path, write_delay=0.0):
+        self.path = str(path)
+        self.write_delay = write_delay
+        self._films = {}
+        self._signature = None
+        self._loaded = False
+        self._dirty = False
+        self._timer = None
+        self._lock = threading.RLock()
+        if write_delay > 0:
+            atexit.register(self.flush)
+
+    def _file_signature(self):
+        """Время изменения и размер файла (None, если файла нет)."""
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _sync(self):
+        """Перечитывает файл, если он изменился с момента последнего
+        чтения/записи. Несохранённые изменения в памяти важнее файла.
+        """
+        if self._dirty:
+            return
+        signature = self._file_signature()
+        if self._loaded and signature == self._signature:
+            return
+        films = {}
+        if signature is not None:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                for film in data.get('films', []):
+                    films[film['film_id']] = film
+            except (json.JSONDecodeError, IOError, KeyError, AttributeError):
+                # Файл повреждён или недоступен — считаем избранное пустым
+                films = {}
+        self._films = films
+        self._signature = signature
+        self._loaded = True
+
+    def contains(self, film_id):
+        """Проверяет, есть ли фильм в избранном."""
+        with self._lock:
+            self._sync()
+            return film_id in self._films
+
+    def ids_among(self, film_ids):
+        """Возвращает множество тех `film_ids`, что есть в избранном."""
+        with self._lock:
+            self._sync()
+            return {i for i in film_ids if i in self._films}
+
+    def films(self):
+        """Возвращает список избранных фильмов в порядке добавления."""
+        with self._lock:
+            self._sync()
+            return [dict(f) for f in self._films.values()]
+
+    def count(self):
+        """Возвращает число избранных фильмов."""
+        with self._lock:
+            self._sync()
+            return len(self._films)
+
+    def page(self, offset, limit):
+        """Возвращает `limit` фильмов, начиная с `offset`, в порядке
+        добавления.
+        """
+        with self._lock:
+            self._sync()
+            films = list(self._films.values())[offset:offset + limit]
+            return [dict(f) for f in films]
+
+    def add(self, film_data):
+        """Добавляет фильм (словарь с ключом `film_id`).
+
+        Возвращает:
+            bool: False если фильм уже в избранном
+        Исключения:
+            IOError: если немедленная запись в файл не удалась
+                     (изменение при этом откатывается)
+        """
+        film_id = film_data['film_id']
+        with self._lock:
+            self._sync()
+            if film_id in self._films:
+                return False
+            self._films[film_id] = dict(film_data)
+            try:
+                self._changed()
+            except IOError:
+                # Откатываем и изменение, и признак несохранённых данных,
+                # иначе `_sync` перестанет замечать изменения файла
+                del self._films[film_id]
+                self._dirty = False
+                raise
+            return True
+
+    def clear(self):
+        """Удаляет все фильмы из избранного.
+
+        Возвращает:
+            int: Число удалённых фильмов
+        """
+        with self._lock:
+            self._sync()
+            previous = self._films
+            self._films = {}
+            try:
+                self._changed()
+            except IOError:
+                self._films = previous
+                self._dirty = False
+                raise
+            return len(previous)
+
+    def _changed(self):
+        """Сохраняет изменения сразу или планирует отложенную запись."""
+        self._dirty = True
+        if self.write_delay <= 0:
+            self.flush()
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(self.write_delay, self._flush_quietly)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _flush_quietly(self):
+        try:
+            self.flush()
+        except IOError as e:
+            print(f"Ошибка сохранения избранного: {e}")
+
+    def flush(self):
+        """Записывает несохранённые изменения в файл (атомарно)."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return
+            data = {"films": list(self._films.values())}
+            directory = os.path.dirname(os.path.abspath(self.path))
+            mode = _file_mode(self.path)
+            fd, tmp_path = _create_temp_file(directory)
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, ensure_ascii=False, indent=2)
+                if mode is not None:
+                    # Права существующего файла сохраняем
+                    os.chmod(tmp_path, mode)
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+                raise
+            self._dirty = False
+            self._signature = self._file_signature()
+
+
+def _file_mode(path):
+    """Права существующего файла или None, если файла нет."""
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except OSError:
+        return None
+
+
+def _create_temp_file(directory):
+    """Создаёт новый временный файл в `directory`.
+
+    В отличие от `tempfile.mkstemp` (права 0600), файл создаётся с правами
+    0666 за вычетом umask процесса — как обычный новый файл; сам umask
+    при этом не меняется.
+
+    Возвращает:
+        tuple: (дескриптор, путь)
+    """
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL
+    while True:
+        path = os.path.join(
+            directory, f".favorites-{secrets.token_hex(6)}.tmp")
+        try:
+            return os.open(path, flags, 0o666), path
+        except FileExistsError:
+            continue
+
+
+class SqliteFavoritesStore:
+    """Избранное в базе SQLite.
+
+    Каждый фильм хранится одной строкой: `film_id` (уникальный индекс) и
+    все поля записи в JSON. Порядок добавления сохраняется.
+
+    Параметры:
+        path: Путь к файлу базы
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._lock = threading.Lock()
+        try:
+            self._conn = sqlite3.connect(
+                self.path, timeout=5.0, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            with self._conn:
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS favorites ("
+                    " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                    " film_id INTEGER NOT NULL UNIQUE,"
+                    " data TEXT NOT NULL)"
+                )
+        except sqlite3.Error as exc:
+            raise IOError(f"Не удалось открыть базу избранного: {exc}") from exc
+        atexit.register(self.close)
+
+    def _execute(self, sql, params=()):
+        """Выполняет запрос; ошибки SQLite превращаются в IOError."""
+        try:
+            with self._lock:
+                return self._conn.execute(sql, params).fetchall()
+        except sqlite3.Error as exc:
+            raise IOError(f"Ошибка базы избранного: {exc}") from exc
+
+    def _write(self, sql, params=()):
+        """Выполняет изменяющий запрос в транзакции.
+
+        Возвращает:
+            int: Число затронутых строк
+        """
+        try:
+            with self._lock, self._conn:
+                return self._conn.execute(sql, params).rowcount
+        except sqlite3.Error as exc:
+            raise IOError(f"Ошибка базы избранного: {exc}") from exc
+
+    def contains(self, film_id):
+        """Проверяет, есть ли фильм в избранном."""
+        rows = self._execute(
+            "SELECT 1 FROM favorites WHERE film_id = ?", (film_id,))
+        return bool(rows)
+
+    def ids_among(self, film_ids):
+        """Возвращает множество тех `film_ids`, что есть в избранном."""
+        film_ids = list(dict.fromkeys(film_ids))
+        if not film_ids:
+            return set()
+        placeholders = ", ".join("?" * len(film_ids))
+        rows = self._execute(
+            f"SELECT film_id FROM favorites WHERE film_id IN ({placeholders})",
+            film_ids)
+        return {film_id for film_id, in rows}
+
+    def films(self):
+        """Возвращает список избранных фильмов в порядке добавления."""
+        rows = self._execute("SELECT data FROM favorites ORDER BY id")
+        return [json.loads(data) for data, in rows]
+
+    def count(self):
+        """Возвращает число избранных фильмов."""
+        return self._execute("SELECT COUNT(*) FROM favorites")[0][0]
+
+    def page(self, offset, limit):
+        """Возвращает `limit` фильмов, начиная с `offset`, в порядке
+        добавления.
+        """
+        rows = self._execute(
+            "SELECT data FROM favorites ORDER BY id LIMIT ? OFFSET ?",
+            (limit, offset))
+        return [json.loads(data) for data, in rows]
+
+    def add(self, film_data):
+        """Добавляет фильм (словарь с ключом `film_id`).
+
+        Возвращает:
+            bool: False если фильм уже в избранном
+        Исключения:
+            IOError: если запись в базу не удалась
+        """
+        return self._write(
+            "INSERT OR IGNORE INTO favorites (film_id, data) VALUES (?, ?)",
+            (film_data['film_id'], json.dumps(film_data, ensure_ascii=False)),
+        ) > 0
+
+    def clear(self):
+        """Удаляет все фильмы из избранного.
+
+        Возвращает:
+            int: Число удалённых фильмов
+        """
+        return self._write("DELETE FROM favorites")
+
+    def import_films(self, films):
+        """Добавляет фильмы, которых ещё нет в избранном (порядок
+        сохраняется).
+
+        Возвращает:
+            int: Число добавленных фильмов
+        """
+        rows = [
+            (film['film_id'], json.dumps(film, ensure_ascii=False))
+            for film in films
+        ]
+        try:
+            with self._lock, self._conn:
+                before = self._conn.total_changes
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO favorites (film_id, data) "
+                    "VALUES (?, ?)", rows)
+                return self._conn.total_changes - before
+        except sqlite3.Error as exc:
+            raise IOError(f"Ошибка базы избранного: {exc}") from exc
+
+    def flush(self):
+        """Изменения записываются сразу — метод для совместимости."""
+
+    def close(self):
+        """Закрывает соединение с базой."""
+        with self._lock:
+            self._conn.close()
+
+
+def migrate_json_to_sqlite(json_path, db_path):
+    """Переносит избранное из JSON-файла в базу SQLite.
+
+    Фильмы, уже имеющиеся в базе, пропускаются, поэтому повторный запуск
+    безопасен. JSON-файл не изменяется.
+
+    Возвращает:
+        int: Число перенесённых фильмов
+    """
+    films = JsonFavoritesStore(json_path).films()
+    store = SqliteFavoritesStore(db_path)
+    try:
+        return store.import_films(films)
+    finally:
+        store.close()
+
+
+def create_store(backend, json_path, db_path, write_delay=0.0):
+    """Создаёт хранилище избранного по имени.
+
+    При первом создании базы SQLite в неё переносится избранное из
+    JSON-файла, если он есть.
+
+    Параметры:
+        backend: Одно из `FAVORITES_BACKENDS`
+        json_path: Путь к JSON-файлу избранного
+        db_path: Путь к базе SQLite
+        write_delay: Задержка отложенной записи для JSON-хранилища (сек)
+    """
+    if backend == "json":
+        return JsonFavoritesStore(json_path, write_delay=write_delay)
+    if backend == "sqlite":
+        is_new = not os.path.exists(db_path)
+        store = SqliteFavoritesStore(db_path)
+        if is_new and os.path.exists(json_path):
+            store.import_films(JsonFavoritesStore(json_path).films())
+        return store
+    raise ValueError(
+        f"Неизвестное хранилище избранного: {backend!r} "
+        f"(допустимо: {', '.join(FAVORITES_BACKENDS)})"
+    )
@@ -1,90 +1,135 @@
 """
 Здесь собраны функции вывода результатов поиска, списков жанров,
 диапазонов лет и статистики.
+
+Функции `render_*` собирают весь экран в одну строку, а `print_*`
+выводят её одной записью в stdout — вместо десятков отдельных `print`,
+каждый из которых медленно проходит через терминал, SSH или конвейер.
 """
 
+import sys
+from datetime import datetime
+
 from config import AGE_RATING_DESCRIPTIONS
-from favorites import is_favorite
+from favorites import favorite_ids_among
 
 # Визуальный разделитель, печатаемый после блока результатов
 SEPARATOR = "*" * 100
 SEPARATOR_MINUS = "-" * 100
 SEPARATOR_EQUAL = "=" * 70
 
+# Шаблоны строк, подготовленные заранее
+_FILM_TITLE = "\n  {0}.   {1} ({2}){3}".format
+_FILM_PRICES = "   Аренда: ${0} | Покупка: ${1} | Возрастной рейтинг: {2}".format
+_FILM_DESCRIPTION = "       {0}".format
+_FAV_MARKER = " " * 10 + "❤"
+_ACTOR_LINE = "  {0:2d}. {1} {2}".format
+_GENRE_LINE = "  {0:2d}. {1}".format
 
-def print_movies_table(films, offset=0, total=None, show_header=True):
+# Читаемые названия типов поиска
+_SEARCH_TYPE_NAMES = {
+    "keyword": "Поиск по ключевому слову",
+    "genre_year": "Поиск по жанру и годам"
+}
+
+# Максимальная длина описания фильма в таблице
+_DESCRIPTION_LIMIT = 200
+
+
+def _write(text):
+    """Выводит подготовленный экран одной записью."""
+    sys.stdout.write(text)
+    sys.stdout.flush()
+
+
+def _format_price(raw):
+    """Форматирует цену до двух знаков после запятой."""
+    if raw is None:
+        return "N/A"
+    try:
+        return f"{float(raw):.2f}"
+    except Exception:
+        return str(raw)
+
+
+def render_movies_table(films, offset=0, total=None, show_header=True):
     """
-    Выводит список фильмов в табличном формате.
+    Возвращает список фильмов в табличном формате одной строкой.
     """
     if not films:
-        print("\n   Фильмы не найдены\n")
-        return
+        return "\n   Фильмы не найдены\n\n"
 
+    lines = []
     if show_header:
-        # print("\n" + "=" * 100)
         if total is not None:
             start = offset + 1
             end = offset + len(films)
-            print(f"{f' РЕЗУЛЬТАТЫ ПОИСКА (Показаны {start}–{end} из {total})':^100}")
+            lines.append(f"{f' РЕЗУЛЬТАТЫ ПОИСКА (Показаны {start}–{end} из {total})':^100}")
         else:
-            # Центрирование 
-            print(f"{' РЕЗУЛЬТАТЫ ПОИСКА':^100}")
-        # print("=" * 100)
+            # Центрирование
+            lines.append(f"{' РЕЗУЛЬТАТЫ ПОИСКА':^100}")
 
-    for i, film in enumerate(films, start=offset + 1):
-        title = film.get("title", "Без названия")
-        year = film.get("release_year", "N/A")
-        ren_raw = film.get("rental_rate")
-        rep_raw = film.get("replacement_cost")
-
-        try:
-            # Форматируем цены до двух знаков после запятой
-            # если_истина if условие else если_ложь
-            ren = f"{float(ren_raw):.2f}" if ren_raw is not None else "N/A" 
-        except Exception:
-            ren = str(ren_raw) if ren_raw is not None else "N/A"
-        try:
-            rep = f"{float(rep_raw):.2f}" if rep_raw is not None else "N/A"
-        except Exception:
-            rep = str(rep_raw) if rep_raw is not None else "N/A"
-        rating = film.get("rating", "N/A")
-
-        # Подставляем описание возрастной категории из конфига; если описания нет —
-        # оставляем код
-        rating_desc = AGE_RATING_DESCRIPTIONS.get(rating, rating)
-        desc = film.get("description") or ""
-
-        # Проверяем, находится ли фильм в избранном
-        film_id = film.get("film_id")
-        fav_marker = " " * 10 + "❤" if film_id and is_favorite(film_id) else ""  # favorites.py
-
-        # Форматируем вывод с разделителем между фильмами
-        print(f"\n  {i}.   {title} ({year}){fav_marker}")
-        print(f"   Аренда: ${ren} | Покупка: ${rep} | Возрастной рейтинг: {rating_desc}")
+    # Отметки избранного для всей страницы — одним запросом
+    favorite_ids = favorite_ids_among(  # favorites.py
+        film["film_id"] for film in films if film.get("film_id"))
+    # Описание возрастной категории из конфига; если описания нет —
+    # оставляем код
+    rating_description = AGE_RATING_DESCRIPTIONS.get
+    append = lines.append
 
+    for i, film in enumerate(films, start=offset + 1):
+        get = film.get
+        rating = get("rating", "N/A")
+        fav_marker = _FAV_MARKER if get("film_id") in favorite_ids else ""
+
+        append(_FILM_TITLE(
+            i, get("title", "Без названия"), get("release_year", "N/A"),
+            fav_marker))
+        append(_FILM_PRICES(
+            _format_price(get("rental_rate")),
+            _format_price(get("replacement_cost")),
+            rating_description(rating, rating)))
+
+        desc = get("description")
         if desc:
             # Ограничиваем длину описания для лучшей читаемости
-            desc_lines = desc[:200] + "..." if len(desc) > 200 else desc
-            print(f"       {desc_lines}")
+            if len(desc) > _DESCRIPTION_LIMIT:
+                desc = desc[:_DESCRIPTION_LIMIT] + "..."
+            append(_FILM_DESCRIPTION(desc))
 
+    lines.append("")
+    return "\n".join(lines)
 
-def print_genres(genres):
+
+def print_movies_table(films, offset=0, total=None, show_header=True):
     """
-    Выводит список жанров с индексами для выбора пользователем.
+    Выводит список фильмов в табличном формате.
+    """
+    _write(render_movies_table(films, offset, total, show_header))
+
+
+def render_genres(genres):
+    """
+    Возвращает список жанров с индексами для выбора пользователем.
     """
     if not genres:
-        print("\n    Жанры не найдены в базе.\n")
-        return
+        return "\n    Жанры не найдены в базе.\n\n"
 
-    # print("\n" + "=" * 60)
-    print(f"{' ДОСТУПНЫЕ ЖАНРЫ':^60}")
-    # print("=" * 60)
+    lines = [f"{' ДОСТУПНЫЕ ЖАНРЫ':^60}"]
+    lines.extend(
+        _GENRE_LINE(idx, g.get('name', 'Неизвестно'))
+        for idx, g in enumerate(genres, start=1)
+    )
+    lines.append(SEPARATOR_EQUAL + "\n")
+    lines.append("")
+    return "\n".join(lines)
 
-    # Выводим жанры для выбора пользователем
-    for idx, g in enumerate(genres, start=1):
-        name = g.get('name', 'Неизвестно')
-        print(f"  {idx:2d}. {name}")
-    print(SEPARATOR_EQUAL + "\n")
+
+def print_genres(genres):
+    """
+    Выводит список жанров с индексами для выбора пользователем.
+    """
+    _write(render_genres(genres))
 
 
 def _format_search_params(params):
@@ -107,78 +152,86 @@ def _format_search_params(params):
     return ", ".join(parts) if parts else str(params)
 
 
-def print_stats(top_queries, last_queries):
+def _format_timestamp(value):
     """
-    Выводит статистику популярных и последних запросов из MongoDB.
+    Форматирует отметку времени лога (дата или строка старого формата).
+    """
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%dT%H:%M:%S")
+    return value
+
+
+def render_stats(top_queries, last_queries):
+    """
+    Возвращает статистику популярных и последних запросов одной строкой.
     """
-    # print("\n" + "=" * 80)
-    print(f"\n{' ПОПУЛЯРНЫЕ ЗАПРОСЫ':^80}")
-    # print("=" * 80)
+    lines = [f"\n{' ПОПУЛЯРНЫЕ ЗАПРОСЫ':^80}"]
+    append = lines.append
 
     if not top_queries:
-        print("  Статистика недоступна (нет сохранённых запросов).\n")
+        append("  Статистика недоступна (нет сохранённых запросов).\n")
     else:
         for idx, item in enumerate(top_queries, 1):
             _id = item.get("_id", {})
-            count = item.get("count", 0)
-            last = item.get("last", "неизвестно")
             search_type = _id.get("type", "неизвестный тип")
-            params = _id.get("params", {})
+            append(f"\n  {idx}. {_SEARCH_TYPE_NAMES.get(search_type, search_type)}")
+            append(f"     Параметры: {_format_search_params(_id.get('params', {}))}")
+            append(f"     Количество запросов: {item.get('count', 0)}")
+            append(f"     Последний запрос: {_format_timestamp(item.get('last', 'неизвестно'))}")
 
-            # Преобразуем тип поиска в читаемый формат
-            type_name = {
-                "keyword": "Поиск по ключевому слову",
-                "genre_year": "Поиск по жанру и годам"
-            }.get(search_type, search_type)
-
-            print(f"\n  {idx}. {type_name}")
-            print(f"     Параметры: {_format_search_params(params)}")
-            print(f"     Количество запросов: {count}")
-            print(f"     Последний запрос: {last}")
-
-    # print("\n" + "=" * 80)
-    print(f"\n{' НЕДАВНИЕ ЗАПРОСЫ':^80}")
-    # print("=" * 80)
+    append(f"\n{' НЕДАВНИЕ ЗАПРОСЫ':^80}")
 
     if not last_queries:
-        print("  Недавних запросов нет.\n")
+        append("  Недавних запросов нет.\n")
     else:
         for idx, q in enumerate(last_queries, 1):
-            timestamp = q.get("timestamp", "неизвестно")
+            timestamp = _format_timestamp(q.get("timestamp", "неизвестно"))
             search_type = q.get("search_type", "неизвестный тип")
-            params = q.get("params", {})
-            results_count = q.get("results_count", 0)
+            append(f"\n  {idx}. [{timestamp}] {_SEARCH_TYPE_NAMES.get(search_type, search_type)}")
+            append(f"     Параметры: {_format_search_params(q.get('params', {}))}")
+            append(f"     Найдено результатов: {q.get('results_count', 0)}")
 
-            # Преобразуем тип поиска в читаемый формат
-            type_name = {
-                "keyword": "Поиск по ключевому слову",
-                "genre_year": "Поиск по жанру и годам"
-            }.get(search_type, search_type)
+    append(SEPARATOR_EQUAL + "\n")
+    append("")
+    return "\n".join(lines)
 
-            print(f"\n  {idx}. [{timestamp}] {type_name}")
-            print(f"     Параметры: {_format_search_params(params)}")
-            print(f"     Найдено результатов: {results_count}")
 
-    print(SEPARATOR_EQUAL + "\n")
+def print_stats(top_queries, last_queries):
+    """
+    Выводит статистику популярных и последних запросов из MongoDB.
+    """
+    _write(render_stats(top_queries, last_queries))
 
 
-def print_actors(actors, film_title=None):
+def render_actors(actors, film_title=None):
     """
-    Выводит список актёров для выбранного фильма.
+    Возвращает список актёров для выбранного фильма одной строкой.
     """
-    print("\n" + SEPARATOR_EQUAL)
+    lines = ["\n" + SEPARATOR_EQUAL]
     if film_title:
-        print(f"{f' АКТЁРЫ ФИЛЬМА: {film_title}':^70}")
+        lines.append(f"{f' АКТЁРЫ ФИЛЬМА: {film_title}':^70}")
     else:
-        print(f"{' СПИСОК АКТЁРОВ':^70}")
-    print(SEPARATOR_EQUAL)
+        lines.append(f"{' СПИСОК АКТЁРОВ':^70}")
+    lines.append(SEPARATOR_EQUAL)
 
     if not actors:
-        print("\n    Актёры не найдены.\n")
+        lines.append("\n    Актёры не найдены.\n")
     else:
-        for idx, a in enumerate(actors, 1):
-            fn = (a.get('first_name') or '').strip().title()
-            ln = (a.get('last_name') or '').strip().title()
-            print(f"  {idx:2d}. {fn} {ln}")
+        lines.extend(
+            _ACTOR_LINE(
+                idx,
+                (a.get('first_name') or '').strip().title(),
+                (a.get('last_name') or '').strip().title())
+            for idx, a in enumerate(actors, 1)
+        )
+
+    lines.append(SEPARATOR_EQUAL + "\n")
+    lines.append("")
+    return "\n".join(lines)
 
-    print(SEPARATOR_EQUAL + "\n")
+
+def print_actors(actors, film_title=None):
+    """
+    Выводит список актёров для выбранного фильма.
+    """
+    _write(render_actors(actors, film_title))
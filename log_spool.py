@@ -0,0 +1,186 @@
+"""Локальный журнал (spool) логов поиска на время недоступности MongoDB.
+
+Документы дописываются в файл JSON Lines. Когда MongoDB снова доступна,
+`replay` выгружает журнал пакетами через `insert_many`. У каждого
+документа есть собственный `_id` (id события), поэтому повторная
+выгрузка того же журнала не создаёт дубликатов. Строковые отметки
+времени (журналы, записанные до перехода на BSON-даты) при выгрузке
+переводятся в даты.
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from pymongo.errors import BulkWriteError
+
+
+# Код ошибки MongoDB «дубликат ключа»
+DUPLICATE_KEY = 11000
+
+# Пояс, в котором записаны строковые отметки времени старых логов (был
+# зашит в код и не зависит от текущего TIMEZONE)
+LEGACY_TIMEZONE = "Europe/Berlin"
+
+
+class LogSpool:
+    """Append-only журнал документов в файле JSON Lines.
+
+    Параметры:
+        path: Путь к файлу журнала
+        chunk_size: Размер пакета при выгрузке в MongoDB
+    """
+
+    def __init__(self, path, chunk_size=500):
+        self.path = str(path)
+        self.chunk_size = max(1, chunk_size)
+        # Файл, выгрузка которого уже началась: новые записи идут в
+        # основной файл и не мешают выгрузке
+        self.replay_path = self.path + ".replaying"
+        self._lock = threading.Lock()
+        self._replay_lock = threading.Lock()
+        self._spooled = 0
+        self._replayed = 0
+
+    def append(self, docs):
+        """Дописывает документы в конец журнала."""
+        lines = "".join(
+            json.dumps(doc, ensure_ascii=False, default=_encode_value) + "\n"
+            for doc in docs
+        )
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(lines)
+                f.flush()
+                os.fsync(f.fileno())
+            self._spooled += len(docs)
+
+    def has_pending(self):
+        """Есть ли в журнале документы, ещё не выгруженные в MongoDB."""
+        return os.path.exists(self.replay_path) or (
+            os.path.exists(self.path) and os.path.getsize(self.path) > 0)
+
+    def replay(self, coll, on_inserted=None):
+        """Выгружает журнал в коллекцию пакетами по `chunk_size`.
+
+        Журнал сначала переименовывается, затем выгружается и удаляется.
+        Если выгрузка прервалась, файл остаётся и будет дочитан при
+        следующем вызове; уже записанные документы отбрасываются как
+        дубликаты по `_id`. `on_inserted(docs)` вызывается для каждого
+        пакета с документами, которые действительно были вставлены.
+
+        Возвращает:
+            int: Число документов, записанных в коллекцию
+        """
+        if coll is None:
+            return 0
+        with self._replay_lock:
+            if not os.path.exists(self.replay_path):
+                with self._lock:
+                    if not os.path.exists(self.path):
+                        return 0
+                    os.replace(self.path, self.replay_path)
+
+            inserted = 0
+            chunk = []
+            with open(self.replay_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        chunk.append(_decode_doc(line))
+                    except json.JSONDecodeError:
+                        # Недописанная строка (например, после сбоя)
+                        continue
+                    if len(chunk) >= self.chunk_size:
+                        inserted += _insert_chunk(coll, chunk, on_inserted)
+                        chunk = []
+            if chunk:
+                inserted += _insert_chunk(coll, chunk, on_inserted)
+
+            os.remove(self.replay_path)
+            self._replayed += inserted
+            return inserted
+
+    def stats(self):
+        """Возвращает счётчики: spooled (записано в журнал), replayed
+        (выгружено в MongoDB), pending (есть невыгруженные документы).
+        """
+        return {
+            "spooled": self._spooled,
+            "replayed": self._replayed,
+            "pending": self.has_pending(),
+        }
+
+
+def _encode_value(value):
+    """Сериализует значения, которых нет в JSON (даты — как {"$date": iso})."""
+    if isinstance(value, datetime):
+        return {"$date": value.isoformat()}
+    return str(value)
+
+
+def _decode_value(obj):
+    """Восстанавливает даты, сохранённые `_encode_value`."""
+    if len(obj) == 1 and "$date" in obj:
+        return datetime.fromisoformat(obj["$date"])
+    return obj
+
+
+def as_datetime(value):
+    """Приводит отметку времени лога к дате с часовым поясом.
+
+    Строки ISO (логи, записанные до перехода на BSON-даты) разбираются,
+    даты без пояса считаются временем `LEGACY_TIMEZONE`; прочие значения
+    возвращаются как есть.
+    """
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return value
+    if isinstance(value, datetime) and value.tzinfo is None:
+        value = value.replace(tzinfo=ZoneInfo(LEGACY_TIMEZONE))
+    return value
+
+
+def _decode_doc(line):
+    """Читает документ из строки журнала (см. `_decode_value`) и
+    переводит строковый `timestamp` в дату.
+    """
+    doc = json.loads(line, object_hook=_decode_value)
+    if "timestamp" in doc:
+        doc["timestamp"] = as_datetime(doc["timestamp"])
+    return doc
+
+
+def _insert_chunk(coll, docs, on_inserted=None):
+    """Вставляет пакет и передаёт вставленные документы в `on_inserted`.
+
+    Возвращает:
+        int: Число реально вставленных документов
+    """
+    inserted = _insert_ignoring_duplicates(coll, docs)
+    if on_inserted is not None and inserted:
+        on_inserted(inserted)
+    return len(inserted)
+
+
+def _insert_ignoring_duplicates(coll, docs):
+    """`insert_many` без остановки на дубликатах `_id`.
+
+    Возвращает:
+        list: Документы, которые действительно были вставлены
+    """
+    try:
+        coll.insert_many(docs, ordered=False)
+        return docs
+    except BulkWriteError as exc:
+        errors = exc.details.get("writeErrors", [])
+        if any(e.get("code") != DUPLICATE_KEY for e in errors):
+            raise
+        duplicates = {e.get("index") for e in errors}
+        return [d for i, d in enumerate(docs) if i not in duplicates]
@@ -2,17 +2,152 @@
 Содержит функции для записи логов и получения статистики.
 """
 
+import hashlib
+import json
+import threading
+import uuid
 from datetime import datetime
 from zoneinfo import ZoneInfo
-from mongo_client import coll
+from pymongo import ReplaceOne, UpdateOne
+import mongo_client
+from mongo_client import get_collection, get_rollup_collection
+from config import (
+    LOG_QUEUE_SIZE,
+    LOG_BATCH_SIZE,
+    LOG_FLUSH_INTERVAL,
+    LOG_QUEUE_POLICY,
+    LOG_SPOOL_FILE,
+    LOG_SPOOL_CHUNK,
+    TIMEZONE,
+)
+from log_writer import SearchLogWriter
+from log_spool import LEGACY_TIMEZONE, LogSpool, as_datetime
 
-def log_search(search_type, params, results_count):
-    """Записывает информацию о поисковом запросе в MongoDB.
-    Параметры:
-        search_type: Тип поиска ('keyword', 'genre_year')
-        params: Параметры поиска (dict)
-        results_count: Количество найденных результатов
+
+# Логи, которые не удалось записать в MongoDB, сохраняются локально
+_spool = LogSpool(LOG_SPOOL_FILE, chunk_size=LOG_SPOOL_CHUNK)
+
+
+def _query_key(search_type, params):
+    """Ключ запроса в коллекции агрегатов: хэш типа поиска и параметров
+    (порядок ключей в `params` не важен).
+    """
+    raw = json.dumps([search_type, params], sort_keys=True,
+                     ensure_ascii=False, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _rollup_ops(docs):
+    """Операции обновления агрегатов для пакета логов.
+
+    Для каждого запроса (`search_type`, `params`) хранится один документ:
+    число запросов, время последнего и число результатов последнего.
+    Пакет сначала сворачивается: по одной операции на запрос. Строковые
+    отметки времени старых логов приводятся к датам (`as_datetime`);
+    документы без корректной отметки учитываются в `count`, но не
+    считаются последними.
+    """
+    totals = {}
+    for doc in docs:
+        key = doc.get("params_hash") or _query_key(
+            doc.get("search_type"), doc.get("params"))
+        ts = _log_time(doc.get("timestamp"))
+        item = totals.get(key)
+        if item is None:
+            item = totals[key] = {"doc": doc, "last": ts, "count": 0}
+        elif _is_later(ts, item["last"]):
+            item["doc"], item["last"] = doc, ts
+        item["count"] += 1
+
+    ops = []
+    for key, item in totals.items():
+        update = {
+            "$inc": {"count": item["count"]},
+            "$set": {
+                "search_type": item["doc"].get("search_type"),
+                "params": item["doc"].get("params"),
+            },
+        }
+        if item["last"] is not None:
+            update["$max"] = {"last": item["last"]}
+            update["$set"]["last_results_count"] = item["doc"].get(
+                "results_count")
+        ops.append(UpdateOne({"_id": key}, update, upsert=True))
+    return ops
+
+
+def _log_time(value):
+    """Отметка времени лога как дата с поясом или None, если её нет или
+    её не удалось разобрать.
+    """
+    value = as_datetime(value)
+    return value if isinstance(value, datetime) else None
+
+
+def _is_later(ts, last):
+    """Новее ли `ts`, чем `last` (None — отметки нет, она старше любой)."""
+    return ts is not None and (last is None or ts >= last)
+
+
+def _update_rollup(docs):
+    """Обновляет агрегаты по пакету записанных логов (см. `_rollup_ops`)."""
+    rollup_coll = get_rollup_collection()
+    if rollup_coll is None or not docs:
+        return
+    rollup_coll.bulk_write(_rollup_ops(docs), ordered=False)
+
+
+def _after_write(collection, docs):
+    """Вызывается после записи пакета логов: обновляет агрегаты и
+    выгружает локальный журнал, если в нём что-то накопилось.
+    """
+    _update_rollup(docs)
+    _replay_spool_if_pending(collection)
+
+
+def _replay_spool_if_pending(collection):
+    """Выгружает локальный журнал, если в нём что-то накопилось."""
+    if _spool.has_pending():
+        _spool.replay(collection, on_inserted=_update_rollup)
+
+
+def _on_write_failure(docs, error):
+    """Документы не записаны в MongoDB (весь пакет или, при частичной
+    ошибке, только не записанные): сохраняем их в локальный журнал.
+    Ошибка записи включает паузу перед следующими попытками.
     """
+    if error is not None:
+        mongo_client.report_failure()
+    _spool.append(docs)
+
+
+def _on_connect():
+    """После подключения к MongoDB выгружаем в фоне записи прошлых
+    сеансов, накопившиеся в локальном журнале.
+    """
+    if _spool.has_pending():
+        threading.Thread(
+            target=replay_spool, name="search-log-replay", daemon=True,
+        ).start()
+
+
+mongo_client.add_connect_listener(_on_connect)
+
+
+# Записи в MongoDB уходят пакетами из фонового потока
+_writer = SearchLogWriter(
+    get_collection,
+    max_queue=LOG_QUEUE_SIZE,
+    batch_size=LOG_BATCH_SIZE,
+    flush_interval=LOG_FLUSH_INTERVAL,
+    policy=LOG_QUEUE_POLICY,
+    on_failure=_on_write_failure,
+    after_write=_after_write,
+)
+
+
+def _make_log_doc(search_type, params, results_count):
+    """Строит документ лога поискового запроса."""
     try:
         if isinstance(params, dict):
             params_clean = dict(params)
@@ -22,72 +157,289 @@ def log_search(search_type, params, results_count):
     except Exception:
         params_clean = params
 
-    ts = datetime.now(ZoneInfo("Europe/Berlin")).replace(microsecond=0)
-    ts_str = ts.strftime("%Y-%m-%dT%H:%M:%S")
+    # Время хранится как BSON-дата (нужно для сортировки и TTL-индекса)
+    ts = datetime.now(ZoneInfo(TIMEZONE)).replace(microsecond=0)
 
-    doc = {
-        "timestamp": ts_str,
+    return {
+        # id события: по нему отбрасываются дубликаты при выгрузке журнала
+        "_id": uuid.uuid4().hex,
+        "timestamp": ts,
         "search_type": search_type,
         "params": params_clean,
+        "params_hash": _query_key(search_type, params_clean),
         "results_count": results_count,
     }
+
+
+def log_search(search_type, params, results_count):
+    """Ставит информацию о поисковом запросе в очередь записи в MongoDB.
+    Сама запись выполняется в фоне (см. `log_writer.py`).
+    Параметры:
+        search_type: Тип поиска ('keyword', 'genre_year')
+        params: Параметры поиска (dict)
+        results_count: Количество найденных результатов
+    """
+    doc = _make_log_doc(search_type, params, results_count)
     
-    if coll is None:
-        print("Инфо: MongoDB недоступна — пропускаю логирование.")
+    if not mongo_client.is_configured():
         return
 
-    coll.insert_one(doc)
+    # Если MongoDB недоступна, документ попадёт в локальный журнал
+    _writer.submit(doc)
+
+
+def log_searches(entries):
+    """Записывает логи нескольких запросов сразу, одним `insert_many`
+    (без фоновой очереди) — для пакетного выполнения запросов.
+    Параметры:
+        entries: Кортежи (search_type, params, results_count)
+    Возвращает:
+        int: Число документов, записанных в MongoDB (0 — если MongoDB
+             недоступна и логи сохранены в локальный журнал)
+    """
+    if not mongo_client.is_configured():
+        return 0
+    docs = [_make_log_doc(*entry) for entry in entries]
+    if not docs:
+        return 0
+
+    coll = get_collection()
+    if coll is None:
+        _on_write_failure(docs, None)
+        return 0
+    try:
+        coll.insert_many(docs, ordered=False)
+    except Exception as exc:
+        _on_write_failure(docs, exc)
+        return 0
+    try:
+        _after_write(coll, docs)
+    except Exception:
+        # Агрегаты можно пересобрать (maintenance.py backfill-rollup)
+        pass
+    return len(docs)
+
+
+def replay_spool():
+    """Выгружает локальный журнал логов в MongoDB.
+
+    Возвращает:
+        int: Число выгруженных документов, или None если MongoDB недоступна
+    """
+    coll = get_collection()
+    if coll is None:
+        return None
+    return _spool.replay(coll, on_inserted=_update_rollup)
+
+
+def get_spool_stats():
+    """Возвращает счётчики локального журнала (spooled/replayed/pending)."""
+    return _spool.stats()
+
+
+def flush_logs(timeout=5.0):
+    """Дожидается записи всех логов из очереди в MongoDB."""
+    return _writer.flush(timeout)
+
+
+def get_log_writer_stats():
+    """Возвращает счётчики фоновой записи логов (queued/flushed/dropped)."""
+    return _writer.stats()
 
 
 def get_top_queries(limit=5):
     """Возвращает топ самых популярных запросов.
+    Читает готовые агрегаты (см. `_update_rollup`), а не весь журнал; логи,
+    ещё не записанные из очереди (не больше пакета), в них пока не видны.
     Параметры:
         limit: Максимальное количество запросов
     Возвращает:
         list: Список словарей с агрегированной статистикой
     """
-    if coll is None:
+    rollup_coll = get_rollup_collection()
+    if rollup_coll is None:
         return []
 
-    pipeline = [
-        {
-            "$group": {
-                "_id": {"type": "$search_type", "params": "$params"},
-                "count": {"$sum": 1},
-                "last": {"$max": "$timestamp"},
-            }
+    cursor = (
+        rollup_coll.find()
+        .sort([("count", -1), ("last", -1)])
+        .limit(limit)
+    )
+    return [_top_query_item(r) for r in cursor]
+
+
+def _top_query_item(rollup_doc):
+    """Агрегат запроса в формате `get_top_queries`."""
+    return {
+        "_id": {
+            "type": rollup_doc.get("search_type"),
+            "params": rollup_doc.get("params"),
         },
-        {"$sort": {"count": -1, "last": -1}},
-        {"$limit": limit},
-    ]
-    return list(coll.aggregate(pipeline))
+        "count": rollup_doc.get("count", 0),
+        "last": rollup_doc.get("last"),
+    }
 
 
 def get_last_queries(limit=5):
-    """Возвращает последние уникальные выполненные запросы.
+    """Возвращает последние уникальные выполненные запросы (по агрегатам,
+    как `get_top_queries`).
     Параметры:
         limit: Максимальное количество запросов
     Возвращает:
         list: Список последних уникальных запросов, отсортированных по времени
     """
-    if coll is None:
+    rollup_coll = get_rollup_collection()
+    if rollup_coll is None:
         return []
-    
+
+    cursor = rollup_coll.find().sort("last", -1).limit(limit)
+    return [_last_query_item(r) for r in cursor]
+
+
+def _last_query_item(rollup_doc):
+    """Агрегат запроса в формате `get_last_queries`."""
+    return {
+        "timestamp": rollup_doc.get("last"),
+        "search_type": rollup_doc.get("search_type"),
+        "params": rollup_doc.get("params"),
+        "results_count": rollup_doc.get("last_results_count", 0),
+    }
+
+
+def backfill_rollup(batch_size=1000):
+    """Пересобирает коллекцию агрегатов по всему журналу логов.
+
+    Нужна один раз для логов, записанных до появления агрегатов, или
+    после ручных правок журнала. Запросы, залогированные во время
+    пересборки, могут не попасть в результат — запускать при
+    остановленном приложении.
+
+    Возвращает:
+        int: Число записанных агрегатов, или None если MongoDB недоступна
+    """
+    coll = get_collection()
+    rollup_coll = get_rollup_collection()
+    if coll is None or rollup_coll is None:
+        return None
+
+    flush_logs()
+    # Непереведённые логи хранят время строкой (migrate_timestamps): для
+    # сортировки и $max время приводится к дате на стороне сервера,
+    # нераспознанное — к null (такие логи не считаются последними)
+    ts_type = {"$type": "$timestamp"}
+    log_time = {
+        "$switch": {
+            "branches": [
+                {"case": {"$eq": [ts_type, "date"]}, "then": "$timestamp"},
+                {"case": {"$eq": [ts_type, "string"]}, "then": {
+                    "$dateFromString": {
+                        "dateString": "$timestamp",
+                        "timezone": LEGACY_TIMEZONE,
+                        "onError": None,
+                    }}},
+            ],
+            "default": None,
+        }
+    }
     pipeline = [
-        {"$sort": {"timestamp": -1}},
+        {"$addFields": {"_log_time": log_time}},
+        {"$sort": {"_log_time": 1}},
         {
             "$group": {
                 "_id": {"type": "$search_type", "params": "$params"},
-                "timestamp": {"$first": "$timestamp"},
-                "search_type": {"$first": "$search_type"},
-                "params": {"$first": "$params"},
-                "results_count": {"$first": "$results_count"},
+                "count": {"$sum": 1},
+                "last": {"$max": "$_log_time"},
+                "last_results_count": {"$last": "$results_count"},
             }
         },
-        {"$sort": {"timestamp": -1}},
-        {"$limit": limit},
     ]
-    return list(coll.aggregate(pipeline))
+    # Запросы, различающиеся лишь порядком ключей params, сливаются
+    merged = {}
+    for row in coll.aggregate(pipeline, allowDiskUse=True):
+        search_type = row["_id"].get("type")
+        params = row["_id"].get("params")
+        key = _query_key(search_type, params)
+        last = _log_time(row["last"])
+        item = merged.get(key)
+        if item is None:
+            merged[key] = {
+                "_id": key,
+                "search_type": search_type,
+                "params": params,
+                "count": row["count"],
+                "last": last,
+                "last_results_count": row["last_results_count"],
+            }
+            continue
+        item["count"] += row["count"]
+        if _is_later(last, item["last"]):
+            item["last"] = last
+            item["last_results_count"] = row["last_results_count"]
+
+    rollup_coll.delete_many({})
+    ops = [ReplaceOne({"_id": k}, v, upsert=True) for k, v in merged.items()]
+    for i in range(0, len(ops), batch_size):
+        rollup_coll.bulk_write(ops[i:i + batch_size], ordered=False)
+    return len(ops)
+
+
+def migrate_timestamps(batch_size=1000):
+    """Переводит логи, записанные до появления BSON-дат, в новый формат.
+
+    Строковые `timestamp` (и `last` в агрегатах) преобразуются в даты
+    на стороне сервера одним `update_many` — в поясе `LEGACY_TIMEZONE`,
+    в котором их записывала прежняя версия; недостающий `params_hash`
+    дописывается пакетами.
+
+    Возвращает:
+        dict: Число изменённых документов по видам, или None если MongoDB
+              недоступна
+    """
+    coll = get_collection()
+    rollup_coll = get_rollup_collection()
+    if coll is None:
+        return None
+
+    flush_logs()
+    to_date = {
+        "$dateFromString": {"dateString": "$timestamp",
+                            "timezone": LEGACY_TIMEZONE}
+    }
+    converted = coll.update_many(
+        {"timestamp": {"$type": "string"}},
+        [{"$set": {"timestamp": to_date}}],
+    ).modified_count
+
+    rollup_converted = 0
+    if rollup_coll is not None:
+        rollup_converted = rollup_coll.update_many(
+            {"last": {"$type": "string"}},
+            [{"$set": {"last": {
+                "$dateFromString": {"dateString": "$last",
+                                    "timezone": LEGACY_TIMEZONE}}}}],
+        ).modified_count
+
+    hashed = 0
+    ops = []
+    cursor = coll.find(
+        {"params_hash": {"$exists": False}},
+        {"search_type": 1, "params": 1},
+    )
+    for doc in cursor:
+        key = _query_key(doc.get("search_type"), doc.get("params"))
+        ops.append(UpdateOne({"_id": doc["_id"]},
+                             {"$set": {"params_hash": key}}))
+        if len(ops) >= batch_size:
+            hashed += coll.bulk_write(ops, ordered=False).modified_count
+            ops = []
+    if ops:
+        hashed += coll.bulk_write(ops, ordered=False).modified_count
+
+    return {
+        "timestamps": converted,
+        "rollup_timestamps": rollup_converted,
+        "params_hash": hashed,
+    }
 
 
 def clear_logs():
@@ -96,13 +448,19 @@ def clear_logs():
     Возвращает:
         int: Число удалённых документов, или None если произошла ошибка
     """
+    coll = get_collection()
+    rollup_coll = get_rollup_collection()
     if coll is None:
         print("\n MongoDB недоступна. Нечего очищать.\n")
         return None
     
     try:
+        flush_logs()
         result = coll.delete_many({})
+        if rollup_coll is not None:
+            rollup_coll.delete_many({})
         return result.deleted_count
     except Exception as exc:
         print(f"\n Не удалось очистить логи: {exc}\n")
         return None
+
@@ -0,0 +1,229 @@
+"""Фоновая пакетная запись логов поиска в MongoDB.
+
+Документы складываются в ограниченную очередь и записываются отдельным
+потоком через `insert_many` — при накоплении пакета, по таймеру,
+по явному `flush()` и при завершении программы.
+"""
+
+import atexit
+import threading
+import time
+from collections import deque
+
+from pymongo.errors import BulkWriteError
+
+
+QUEUE_POLICIES = ("block", "drop_oldest")
+
+
+class SearchLogWriter:
+    """Буферизованный асинхронный писатель документов в коллекцию.
+
+    Параметры:
+        get_collection: Функция, возвращающая коллекцию (или None)
+        max_queue: Максимальная длина очереди
+        batch_size: Сколько документов записывать за один `insert_many`
+        flush_interval: Максимальное время (сек) ожидания неполного пакета
+        policy: Что делать при переполнении очереди: "block" — ждать
+                места (не дольше `block_timeout`), "drop_oldest" —
+                выбросить самый старый документ
+        block_timeout: Предельное ожидание места в очереди для "block"
+        on_failure: Вызывается с документами, которые не удалось записать, и
+                    исключением (None, если коллекция недоступна)
+        after_write: Вызывается с коллекцией и записанными документами
+                     пакета (при частичной ошибке — только с записанными)
+    """
+
+    def __init__(self, get_collection, max_queue=1000, batch_size=50,
+                 flush_interval=2.0, policy="drop_oldest", block_timeout=1.0,
+                 on_failure=None, after_write=None):
+        if policy not in QUEUE_POLICIES:
+            raise ValueError(
+                f"Неизвестная политика очереди: {policy!r} "
+                f"(допустимо: {', '.join(QUEUE_POLICIES)})"
+            )
+        self._get_collection = get_collection
+        self.max_queue = max(1, max_queue)
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self._on_failure = on_failure
+        self._after_write = after_write
+
+        self._buffer = deque()
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._flush_waiters = 0
+        self._closing = False
+        self._thread = None
+
+        self._submitted = 0
+        self._flushed = 0
+        self._dropped = 0
+        self._failed = 0
+        self._batches = 0
+
+    def _ensure_thread(self):
+        """Запускает поток записи при первом документе. Под блокировкой."""
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="search-log-writer", daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+
+    def submit(self, doc):
+        """Ставит документ в очередь на запись.
+
+        Возвращает:
+            bool: False если документ (или вытесненный им) был отброшен
+        """
+        with self._cond:
+            if self._closing:
+                self._dropped += 1
+                return False
+            self._ensure_thread()
+            accepted = True
+            if len(self._buffer) >= self.max_queue:
+                if self.policy == "block":
+                    has_room = self._cond.wait_for(
+                        lambda: len(self._buffer) < self.max_queue,
+                        self.block_timeout)
+                    if not has_room:
+                        self._dropped += 1
+                        return False
+                else:
+                    self._buffer.popleft()
+                    self._dropped += 1
+                    accepted = False
+            self._buffer.append(doc)
+            self._submitted += 1
+            self._cond.notify_all()
+            return accepted
+
+    def _next_batch(self):
+        """Ждёт, пока пакет будет готов к записи, и забирает его.
+
+        Возвращает:
+            list или None, если писатель закрыт и очередь пуста
+        """
+        with self._cond:
+            deadline = None
+            while True:
+                if self._buffer and (
+                        len(self._buffer) >= self.batch_size
+                        or self._flush_waiters or self._closing):
+                    break
+                if not self._buffer:
+                    if self._closing:
+                        return None
+                    deadline = None
+                    self._cond.wait()
+                    continue
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            count = min(self.batch_size, len(self._buffer))
+            batch = [self._buffer.popleft() for _ in range(count)]
+            self._in_flight = count
+            self._cond.notify_all()
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            written = self._write(batch)
+            with self._cond:
+                self._in_flight = 0
+                self._batches += 1
+                self._flushed += written
+                self._failed += len(batch) - written
+                self._cond.notify_all()
+
+    def _write(self, batch):
+        """Записывает пакет. Возвращает число записанных документов."""
+        error = None
+        coll = self._get_collection()
+        if coll is not None:
+            try:
+                coll.insert_many(batch, ordered=False)
+            except BulkWriteError as exc:
+                # ordered=False: документы без ошибки записаны, повторно
+                # отдаём только те, что перечислены в writeErrors
+                failed = {
+                    e.get("index") for e in exc.details.get("writeErrors", [])}
+                written = [d for i, d in enumerate(batch) if i not in failed]
+                if written:
+                    _call_quietly(self._after_write, coll, written)
+                if len(written) < len(batch):
+                    _call_quietly(
+                        self._on_failure,
+                        [d for i, d in enumerate(batch) if i in failed], exc)
+                return len(written)
+            except Exception as exc:
+                error = exc
+            else:
+                _call_quietly(self._after_write, coll, batch)
+                return len(batch)
+        _call_quietly(self._on_failure, batch, error)
+        return 0
+
+    def flush(self, timeout=5.0):
+        """Ждёт, пока все документы из очереди будут записаны.
+
+        Возвращает:
+            bool: True если очередь опустела за отведённое время
+        """
+        with self._cond:
+            if self._thread is None:
+                return True
+            self._flush_waiters += 1
+            self._cond.notify_all()
+            try:
+                return self._cond.wait_for(
+                    lambda: not self._buffer and not self._in_flight,
+                    timeout)
+            finally:
+                self._flush_waiters -= 1
+
+    def close(self, timeout=5.0):
+        """Записывает оставшиеся документы и останавливает поток."""
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def stats(self):
+        """Возвращает счётчики: queued (в очереди), submitted, flushed
+        (записано), dropped (отброшено при переполнении), failed
+        (не записано в MongoDB и передано в `on_failure`), batches.
+        """
+        with self._cond:
+            return {
+                "queued": len(self._buffer) + self._in_flight,
+                "submitted": self._submitted,
+                "flushed": self._flushed,
+                "dropped": self._dropped,
+                "failed": self._failed,
+                "batches": self._batches,
+            }
+
+
+def _call_quietly(callback, *args):
+    """Вызывает необязательный обработчик; его ошибки не должны
+    останавливать поток записи.
+    """
+    if callback is None:
+        return
+    try:
+        callback(*args)
+    except Exception:
+        pass
@@ -10,11 +10,18 @@ from formatter import print_stats, SEPARATOR, SEPARATOR_EQUAL
 from searches import search_by_keyword_interactive, search_by_genre_interactive
 from favorites import view_favorites, clear_favorites
 from input_utils import process_yes_no_input, process_input
+from reference_data import warm_up
+from mongo_client import connect_in_background
 
 
 def main():
     """Главное меню приложения с интерактивным управлением."""
 
+    # Справочники (жанры, категории, годы) и подключение к MongoDB —
+    # в фоне, меню появляется сразу
+    warm_up()  # reference_data.py
+    connect_in_background()  # mongo_client.py
+
     print(f"\n{'ДОБРО ПОЖАЛОВАТЬ В СИСТЕМУ ПОИСКА ФИЛЬМОВ':^60}")
     print(f"{'База данных: Sakila':^60}\n")
 
@@ -0,0 +1,98 @@
+"""Служебные команды обслуживания данных приложения.
+
+Запуск:
+    python maintenance.py backfill-rollup     # пересобрать агрегаты статистики
+    python maintenance.py migrate-timestamps  # строковые даты логов -> BSON
+    python maintenance.py ensure-indexes      # создать индексы MongoDB
+    python maintenance.py migrate-favorites   # favorites.json -> SQLite
+"""
+
+import argparse
+
+
+def _backfill_rollup(args):
+    from log_stats import backfill_rollup
+
+    written = backfill_rollup()
+    if written is None:
+        print("MongoDB недоступна — агрегаты не пересобраны.")
+        return 1
+    print(f"Агрегатов записано: {written}")
+    return 0
+
+
+def _migrate_timestamps(args):
+    from log_stats import migrate_timestamps
+
+    result = migrate_timestamps()
+    if result is None:
+        print("MongoDB недоступна — миграция не выполнена.")
+        return 1
+    print(f"Логов с датами в новом формате: {result['timestamps']}")
+    print(f"Агрегатов с датами в новом формате: {result['rollup_timestamps']}")
+    print(f"Логов с добавленным params_hash: {result['params_hash']}")
+    return 0
+
+
+def _ensure_indexes(args):
+    import mongo_client
+
+    if not mongo_client.ensure_indexes():
+        print("MongoDB недоступна — индексы не созданы.")
+        return 1
+    print("Индексы MongoDB созданы.")
+    return 0
+
+
+def _migrate_favorites(args):
+    from config import FAVORITES_DB
+    from favorites import FAVORITES_FILE
+    from favorites_store import migrate_json_to_sqlite
+
+    json_path = args.source or FAVORITES_FILE
+    db_path = args.target or FAVORITES_DB
+    try:
+        moved = migrate_json_to_sqlite(json_path, db_path)
+    except IOError as e:
+        print(f"Ошибка переноса избранного: {e}")
+        return 1
+    print(f"Фильмов перенесено в {db_path}: {moved}")
+    print("Чтобы использовать базу, задайте FAVORITES_BACKEND=sqlite.")
+    return 0
+
+
+def main(argv=None):
+    """Разбирает аргументы командной строки и выполняет команду."""
+    parser = argparse.ArgumentParser(
+        description="Служебные команды обслуживания данных")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    backfill = commands.add_parser(
+        "backfill-rollup",
+        help="пересобрать агрегаты статистики запросов по журналу логов")
+    backfill.set_defaults(handler=_backfill_rollup)
+
+    migrate = commands.add_parser(
+        "migrate-timestamps",
+        help="перевести строковые отметки времени логов в BSON-даты")
+    migrate.set_defaults(handler=_migrate_timestamps)
+
+    indexes = commands.add_parser(
+        "ensure-indexes", help="создать индексы коллекций MongoDB")
+    indexes.set_defaults(handler=_ensure_indexes)
+
+    favorites = commands.add_parser(
+        "migrate-favorites",
+        help="перенести избранное из JSON-файла в базу SQLite")
+    favorites.add_argument(
+        "--source", help="JSON-файл избранного (по умолчанию favorites.json)")
+    favorites.add_argument(
+        "--target", help="база SQLite (по умолчанию FAVORITES_DB)")
+    favorites.set_defaults(handler=_migrate_favorites)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
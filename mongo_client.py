@@ -1,8 +1,17 @@
 """
-Собирает URI и проверяет соединение при инициализации.
+Ленивое подключение к MongoDB.
+
+Соединение устанавливается при первом обращении к коллекции (или заранее
+в фоновом потоке через `connect_in_background`), а не при импорте, поэтому
+запуск приложения не ждёт MongoDB. После неудачной попытки подключения
+(или ошибки записи) повторные попытки не делаются в течение
+`MONGO_RETRY_COOLDOWN` секунд — коллекции в это время считаются
+недоступными.
 """
 
-import os
+import threading
+import time
+from zoneinfo import ZoneInfo
 from pymongo import MongoClient, errors
 from config import (
     MONGO_URI_PREFIX,
@@ -11,26 +20,162 @@ from config import (
     MONGO_PASS,
     MONGO_DB,
     MONGO_COLL,
+    MONGO_ROLLUP_COLL,
+    MONGO_RETRY_COOLDOWN,
+    LOG_RETENTION_DAYS,
+    TIMEZONE,
 )
 
 
-_uri = f"{MONGO_URI_PREFIX}{MONGO_USER}:{MONGO_PASS}{MONGO_URI_SUFFIX}"
+_uri = (
+    f"{MONGO_URI_PREFIX}{MONGO_USER}:{MONGO_PASS}{MONGO_URI_SUFFIX}"
+    if MONGO_URI_PREFIX else None
+)
 client = None
 db = None
-coll = None
+_coll = None
+_rollup_coll = None
+
+_lock = threading.Lock()
+# Автомат-предохранитель: до этого момента (time.monotonic) не подключаться
+_retry_at = 0.0
+_failures = 0
+_connect_listeners = []
+
+
+def _ensure_timestamp_index(collection, retention_days):
+    """Создаёт индекс по `timestamp`; при `retention_days` > 0 — TTL-индекс.
+
+    Если индекс уже есть с другим сроком хранения, срок меняется через
+    `collMod`, а при включении/выключении TTL индекс пересоздаётся.
+    """
+    name = "timestamp_1"
+    expire = int(retention_days * 86400) if retention_days > 0 else None
+    info = collection.index_information().get(name)
+    if info is not None and info.get("expireAfterSeconds") != expire:
+        if expire is not None and "expireAfterSeconds" in info:
+            collection.database.command(
+                "collMod", collection.name,
+                index={"keyPattern": {"timestamp": 1},
+                       "expireAfterSeconds": expire})
+            return
+        collection.drop_index(name)
+    options = {"expireAfterSeconds": expire} if expire is not None else {}
+    collection.create_index([("timestamp", 1)], name=name, **options)
+
+
+def _create_indexes():
+    """Создаёт индексы коллекции логов и коллекции агрегатов."""
+    _ensure_timestamp_index(_coll, LOG_RETENTION_DAYS)
+    _coll.create_index([("search_type", 1), ("params_hash", 1)])
+    # Индексы для чтения статистики из агрегатов
+    _rollup_coll.create_index([("count", -1), ("last", -1)])
+    _rollup_coll.create_index([("last", -1)])
 
-if _uri:
+
+def ensure_indexes():
+    """Создаёт индексы коллекций (повторный вызов безопасен).
+
+    Возвращает:
+        bool: False если MongoDB недоступна
+    """
+    if get_collection() is None:
+        return False
+    _create_indexes()
+    return True
+
+
+def _connect():
+    """Подключается к MongoDB. Вызывается под `_lock`.
+
+    Возвращает:
+        bool: True при успешном подключении
+    """
+    global client, db, _coll, _rollup_coll, _retry_at, _failures
+    new_client = None
     try:
-        client = MongoClient(_uri, serverSelectionTimeoutMS=3000)
+        new_client = MongoClient(
+            _uri,
+            serverSelectionTimeoutMS=3000,
+            tz_aware=True,
+            tzinfo=ZoneInfo(TIMEZONE),
+        )
         # Проверяем соединение
-        client.server_info()
-        db = client[MONGO_DB]
-        coll = db[MONGO_COLL]
+        new_client.server_info()
     except Exception as exc:
-        print(
-            f"Внимание: не удалось подключиться к MongoDB ({exc}). Логирование отключено.")
-        client = None
-        coll = None
-else:
-    print("Инфо: MongoDB URI не задан. Логирование отключено.")
-    coll = None
+        if new_client is not None:
+            new_client.close()
+        _failures += 1
+        _retry_at = time.monotonic() + MONGO_RETRY_COOLDOWN
+        if _failures == 1:
+            print(
+                f"Внимание: не удалось подключиться к MongoDB ({exc}). "
+                "Логи сохраняются локально.")
+        return False
+
+    client = new_client
+    db = client[MONGO_DB]
+    _coll = db[MONGO_COLL]
+    _rollup_coll = db[MONGO_ROLLUP_COLL]
+    _failures = 0
+    try:
+        _create_indexes()
+    except errors.PyMongoError as exc:
+        print(f"Внимание: не удалось создать индексы MongoDB ({exc}).")
+    return True
+
+
+def _available():
+    """Подключено ли (или удалось ли подключиться) — с учётом паузы."""
+    if _uri is None or time.monotonic() < _retry_at:
+        return False
+    if _coll is not None:
+        return True
+    connected = False
+    with _lock:
+        if _coll is None and time.monotonic() >= _retry_at:
+            connected = _connect()
+    if connected:
+        for listener in list(_connect_listeners):
+            try:
+                listener()
+            except Exception:
+                pass
+    return _coll is not None and time.monotonic() >= _retry_at
+
+
+def is_configured():
+    """Заданы ли параметры подключения к MongoDB."""
+    return _uri is not None
+
+
+def get_collection():
+    """Возвращает коллекцию логов или None, если MongoDB недоступна."""
+    return _coll if _available() else None
+
+
+def get_rollup_collection():
+    """Возвращает коллекцию агрегатов или None, если MongoDB недоступна."""
+    return _rollup_coll if _available() else None
+
+
+def report_failure():
+    """Сообщает об ошибке работы с MongoDB: следующие
+    `MONGO_RETRY_COOLDOWN` секунд коллекции считаются недоступными.
+    """
+    global _retry_at
+    _retry_at = time.monotonic() + MONGO_RETRY_COOLDOWN
+
+
+def add_connect_listener(listener):
+    """Регистрирует функцию, вызываемую после успешного подключения."""
+    _connect_listeners.append(listener)
+
+
+def connect_in_background():
+    """Начинает подключение в фоновом потоке, не задерживая вызывающий код."""
+    if _uri is None:
+        print("Инфо: MongoDB URI не задан. Логирование отключено.")
+        return
+    threading.Thread(
+        target=_available, name="mongo-connect", daemon=True).start()
@@ -1,16 +1,60 @@
 """Подключение к MySQL и выполнения запросов.
-Все функции возвращают списки словарей (DictCursor) для удобства.
+Все функции возвращают списки словарей (DictCursor) для удобства;
+функции `iter_*` отдают строки по одной из небуферизованного курсора
+(SSDictCursor) — для выгрузки больших результатов без загрузки в память.
+Соединения берутся из общего пула (см. `mysql_pool.py`).
 """
 
+import atexit
+import base64
+import json
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
 import pymysql
 from config import (
     MYSQL_HOST,
     MYSQL_USER,
     MYSQL_PASS,
     MYSQL_DB,
+    MYSQL_POOL_SIZE,
+    MYSQL_POOL_MAX_IDLE,
+    MYSQL_POOL_TIMEOUT,
+    SEARCH_CACHE_SIZE,
+    SEARCH_CACHE_TTL,
+    SEARCH_BACKEND,
+    REFERENCE_REFRESH_INTERVAL,
+    FIRST_PAGE_STRATEGY,
+    CATALOG_MODE,
     LIMIT,
     AGE_RATING_ORDER
 )
+from mysql_pool import ConnectionPool
+from query_builder import FilterSpec, ratings_up_to
+from query_cache import TTLCache
+from search_backends import create_backend
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# Способ получения «страница + общее число» за один запрос; определяется
+# по версии сервера при первом обращении ("window" или "found_rows").
+_total_strategy = None
+
+# Потоки для счётчиков, выполняемых одновременно с запросом страницы
+# (FIRST_PAGE_STRATEGY = "parallel"); создаются при первом обращении.
+_count_executor = None
+
+# Кэш страниц и счётчиков поиска. Ключ — кортеж
+# (search_type, вид, sql_join, where_sql, params, позиция, limit).
+_search_cache = TTLCache(SEARCH_CACHE_SIZE, SEARCH_CACHE_TTL)
+
+# Движок поиска по ключевому слову (см. `search_backends.py`)
+_search_backend = None
+_backend_lock = threading.Lock()
 
 
 def get_age_ratings_lesser_or_equal(age_rating):
@@ -19,19 +63,12 @@ def get_age_ratings_lesser_or_equal(age_rating):
     Например, если age_rating="PG-13", вернёт ["G","PG","PG-13"].
     Если категория не найдена — вернёт список из самого значения.
     """
-    if not age_rating:
-        return []
-    try:
-        idx = AGE_RATING_ORDER.index(age_rating)
-    except ValueError:
-        return [age_rating]
-    # вернуть все категории до и включая выбранную
-    return AGE_RATING_ORDER[: idx + 1]
+    # Списки вычислены заранее (query_builder.py)
+    return list(ratings_up_to(age_rating))
 
 
-def get_connection():
-    """Возвращает новое подключение PyMySQL с использованием DictCursor.
-    """
+def _open_connection():
+    """Открывает новое подключение PyMySQL с использованием DictCursor."""
     try:
         return pymysql.connect(
             host=MYSQL_HOST,
@@ -50,8 +87,73 @@ def get_connection():
         raise RuntimeError(msg) from exc
 
 
+def _get_pool():
+    """Возвращает общий пул соединений, создавая его при первом вызове."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    _open_connection,
+                    max_size=MYSQL_POOL_SIZE,
+                    max_idle=MYSQL_POOL_MAX_IDLE,
+                    timeout=MYSQL_POOL_TIMEOUT,
+                )
+                atexit.register(_pool.close)
+    return _pool
+
+
+def get_connection():
+    """Возвращает соединение из пула в виде контекстного менеджера.
+
+    Использование: `with get_connection() as conn: ...` — по выходу из
+    блока соединение возвращается в пул, а не закрывается.
+    """
+    return _get_pool().connection()
+
+
+def get_pool_stats():
+    """Возвращает метрики пула соединений (hits/misses/waits и др.)."""
+    return _get_pool().stats()
+
+
+def get_search_backend():
+    """Возвращает движок поиска по ключевому слову, выбранный в конфиге."""
+    global _search_backend
+    if _search_backend is None:
+        # Под блокировкой: при параллельных запросах движок (и его
+        # индекс) строится один раз
+        with _backend_lock:
+            if _search_backend is None:
+                _search_backend = create_backend(
+                    SEARCH_BACKEND, get_connection,
+                    REFERENCE_REFRESH_INTERVAL)
+    return _search_backend
+
+
+def set_search_backend(name):
+    """Переключает движок поиска ('like', 'fulltext', 'trigram').
+
+    Кэш результатов по ключевому слову при этом сбрасывается.
+    Возвращает:
+        Имя фактически выбранного движка
+    """
+    global _search_backend
+    previous = _search_backend
+    _search_backend = create_backend(
+        name, get_connection, REFERENCE_REFRESH_INTERVAL)
+    if hasattr(previous, "stop"):
+        # Фоновое перестроение индекса прежнего движка больше не нужно
+        previous.stop()
+    invalidate_search_cache("keyword")
+    return _search_backend.name
+
+
 def get_genres():
     """Возвращает список жанров (category_id, name)."""
+    snapshot = _catalog()
+    if snapshot is not None:
+        return snapshot.reference_data()["genres"]
 
     query = "SELECT category_id, name FROM category ORDER BY name"
 
@@ -63,6 +165,9 @@ def get_genres():
 
 def get_age_ratings():
     """Возвращает список доступных возрастных категорий из таблицы `film`."""
+    snapshot = _catalog()
+    if snapshot is not None:
+        return snapshot.reference_data()["age_ratings"]
 
     query = "SELECT DISTINCT rating FROM film WHERE rating IS NOT NULL"
 
@@ -70,15 +175,21 @@ def get_age_ratings():
         with conn.cursor() as cursor:
             cursor.execute(query)
             rows = cursor.fetchall()
-            db_ratings = [r.get("rating") for r in rows]
+            return _order_ratings([r.get("rating") for r in rows])
 
-            ordered = [r for r in AGE_RATING_ORDER if r in db_ratings]
-            others = [r for r in db_ratings if r not in ordered]
-            return ordered + others
+
+def _order_ratings(db_ratings):
+    """Упорядочивает категории по `AGE_RATING_ORDER`, неизвестные — в конец."""
+    ordered = [r for r in AGE_RATING_ORDER if r in db_ratings]
+    others = [r for r in db_ratings if r not in ordered]
+    return ordered + others
 
 
 def get_year_bounds():
     """Возвращает кортеж `(min_year, max_year)` по данным таблицы `film`."""
+    snapshot = _catalog()
+    if snapshot is not None:
+        return snapshot.reference_data()["year_bounds"]
     query = (
         "SELECT MIN(release_year) AS min_year, "
         "MAX(release_year) AS max_year FROM film"
@@ -90,6 +201,56 @@ def get_year_bounds():
             return row.get("min_year"), row.get("max_year")
 
 
+def get_reference_data():
+    """Загружает жанры, возрастные категории и границы лет одним запросом.
+
+    Возвращает:
+        dict: {"genres": [...], "age_ratings": [...],
+               "year_bounds": (min_year, max_year)} — в том же виде, что
+              `get_genres`, `get_age_ratings` и `get_year_bounds`
+    """
+    snapshot = _catalog()
+    if snapshot is not None:
+        return snapshot.reference_data()
+    # Тип колонки UNION выводится по всем ветвям: без CAST годы (YEAR)
+    # в одной колонке с category_id (TINYINT) могли бы обрезаться
+    query = (
+        "SELECT 'genre' AS kind, CAST(category_id AS SIGNED) AS num1, "
+        "CAST(NULL AS SIGNED) AS num2, name AS value FROM category "
+        "UNION ALL "
+        "SELECT DISTINCT 'rating', CAST(NULL AS SIGNED), "
+        "CAST(NULL AS SIGNED), CAST(rating AS CHAR) "
+        "FROM film WHERE rating IS NOT NULL "
+        "UNION ALL "
+        "SELECT 'years', CAST(MIN(release_year) AS SIGNED), "
+        "CAST(MAX(release_year) AS SIGNED), NULL "
+        "FROM film "
+        "ORDER BY kind, value"
+    )
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(query)
+            rows = cursor.fetchall()
+
+    genres = []
+    db_ratings = []
+    year_bounds = (None, None)
+    for row in rows:
+        kind = row.get("kind")
+        if kind == "genre":
+            genres.append(
+                {"category_id": int(row["num1"]), "name": row.get("value")})
+        elif kind == "rating":
+            db_ratings.append(row.get("value"))
+        elif kind == "years":
+            year_bounds = (row.get("num1"), row.get("num2"))
+    return {
+        "genres": genres,
+        "age_ratings": _order_ratings(db_ratings),
+        "year_bounds": year_bounds,
+    }
+
+
 def _build_keyword_query_parts(
         keyword,
         genre_id=None,
@@ -102,67 +263,246 @@ def _build_keyword_query_parts(
     Возвращает:
         tuple: (sql_join, where_sql, params)
     """
-    params = []
-    where_uslovija = []
-    
-    # Добавляем фильтр по ключевому слову только если оно задано
-    if keyword:
-        where_uslovija.append("f.title LIKE %s")
-        params.append(f"%{keyword}%")
-
-    sql_join = ""
-    if genre_id is not None:
-        sql_join = "JOIN film_category fc ON f.film_id = fc.film_id"
-        where_uslovija.append("fc.category_id = %s")
-        params.append(int(genre_id))
-
-    if year_min is not None and year_max is not None:
-        where_uslovija.append("f.release_year BETWEEN %s AND %s")
-        params.append(int(year_min))
-        params.append(int(year_max))
-
-    if age_rating:
-        allowed = get_age_ratings_lesser_or_equal(age_rating)
-        if allowed:
-            placeholders = ",".join(["%s"] * len(allowed))
-            where_uslovija.append(f"f.rating IN ({placeholders})")
-            params.extend(allowed)
-
-    # Если условий нет, вернём "1=1" для валидного SQL
-    where_sql = " AND ".join(where_uslovija) if where_uslovija else "1=1"
-    return sql_join, where_sql, params
+    spec = FilterSpec(keyword, genre_id, year_min, year_max, age_rating)
+    # Условие по ключевому слову строит выбранный движок поиска
+    # (search_backends.py)
+    backend = get_search_backend() if spec.keyword else None
+    return spec.compile(backend)  # query_builder.py
 
 
-def search_by_keyword(
-        keyword,
+def _catalog():
+    """Снимок каталога в памяти (`CATALOG_MODE = "memory"`) или None."""
+    if CATALOG_MODE != "memory":
+        return None
+    import catalog  # catalog.py (сам импортирует этот модуль)
+    return catalog.get_catalog()
+
+
+# Движки, которые ищут ключевое слово так же, как каталог в памяти
+# (подстрока названия); `fulltext` ищет ещё и по описанию
+_CATALOG_KEYWORD_BACKENDS = ("like", "trigram")
+
+
+def _catalog_handles_keywords():
+    """Ищет ли выбранный движок ключевое слово так же, как каталог."""
+    backend = _search_backend
+    name = backend.name if backend is not None else SEARCH_BACKEND
+    return name in _CATALOG_KEYWORD_BACKENDS
+
+
+def _keyword_catalog():
+    """Снимок каталога для поиска по ключевому слову или None, если
+    каталог выключен или выбранный движок ищет иначе (тогда — MySQL).
+    """
+    if not _catalog_handles_keywords():
+        return None
+    return _catalog()
+
+
+def _catalog_page(snapshot, spec, offset, limit, page_token):
+    """Страница поиска из каталога в памяти (в обход кэша поиска)."""
+    after = _decode_page_token(page_token) if page_token else None
+    films = snapshot.films(spec, offset, limit, after)
+    return films, _next_page_token(films, limit)
+
+
+def _encode_page_token(title, film_id):
+    """Упаковывает позицию `(title, film_id)` в непрозрачный токен страницы."""
+    raw = json.dumps([title, int(film_id)], ensure_ascii=False)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def _decode_page_token(page_token):
+    """Распаковывает токен страницы в кортеж `(title, film_id)`.
+
+    Исключения:
+        ValueError: если токен повреждён
+    """
+    try:
+        raw = base64.urlsafe_b64decode(page_token.encode("ascii"))
+        title, film_id = json.loads(raw.decode("utf-8"))
+        return str(title), int(film_id)
+    except (ValueError, TypeError, UnicodeError) as exc:
+        raise ValueError(f"Некорректный токен страницы: {page_token!r}") from exc
+
+
+def _cache_key(search_type, kind, sql_join, where_sql, params,
+               position=None, limit=None):
+    """Строит ключ кэша по частям запроса.
+
+    Строковые параметры приводятся к нижнему регистру: сравнение строк
+    в каталоге регистронезависимое, и 'Love' и 'love' дают одну выдачу.
+    """
+    norm = tuple(p.casefold() if isinstance(p, str) else p for p in params)
+    return (search_type, kind, sql_join, where_sql, norm, position, limit)
+
+
+def _copy_result(value):
+    """Копирует списки строк из кэша, чтобы вызывающий код не мог
+    изменить сохранённые данные.
+    """
+    if isinstance(value, tuple):
+        return tuple(_copy_result(v) for v in value)
+    if isinstance(value, list):
+        return [dict(r) if isinstance(r, dict) else r for r in value]
+    return value
+
+
+def invalidate_search_cache(search_type=None):
+    """Сбрасывает кэш результатов поиска.
+
+    Параметры:
+        search_type: 'keyword' или 'genre_year'; None — сбросить всё
+    Возвращает:
+        int: Число удалённых записей
+    """
+    if search_type is None:
+        return _search_cache.invalidate()
+    return _search_cache.invalidate(lambda key: key[0] == search_type)
+
+
+def get_search_cache_stats():
+    """Возвращает статистику кэша поиска (hits, misses, hit_rate и др.)."""
+    return _search_cache.stats()
+
+
+def _fetch_films_page(
+        search_type,
+        sql_join,
+        where_sql,
+        params,
         offset=0,
         limit=LIMIT,
-        genre_id=None,
-        year_min=None,
-        year_max=None,
-        age_rating=None):
-    """Поиск фильмов по ключевому слову с опциональными фильтрами.
-    Поддерживаются фильтры: `genre_id`, `year_min`/`year_max`, `age_rating`.
+        page_token=None):
+    """Выполняет выборку одной страницы фильмов по готовым частям запроса
+    (с учётом кэша).
+
+    Сортировка — по `(f.title, f.film_id)`. Если передан `page_token`,
+    страница начинается сразу после запомненной позиции (keyset-пагинация,
+    `offset` игнорируется); иначе используется `LIMIT ... OFFSET ...`.
+
+    Возвращает:
+        tuple: (films, next_token) — `next_token` равен None на последней
+               странице
     """
-    sql_join, where_sql, params = _build_keyword_query_parts(
-        keyword, genre_id, year_min, year_max, age_rating)
-    
-    query = (
+    position = ("token", page_token) if page_token else ("offset", int(offset))
+    key = _cache_key(search_type, "page", sql_join, where_sql, params,
+                     position, int(limit))
+    hit, cached = _search_cache.get(key)
+    if hit:
+        return _copy_result(cached)
+
+    result = _query_films_page(
+        sql_join, where_sql, params, offset, limit, page_token)
+    _search_cache.set(key, result)
+    return _copy_result(result)
+
+
+@lru_cache(maxsize=256)
+def _films_page_query(sql_join, where_sql, keyset):
+    """Текст запроса страницы фильмов (кэшируется по частям запроса)."""
+    if keyset:
+        where_sql = (
+            f"({where_sql}) AND "
+            "(f.title > %s OR (f.title = %s AND f.film_id > %s))"
+        )
+        limit_sql = "LIMIT %s"
+    else:
+        limit_sql = "LIMIT %s OFFSET %s"
+    return (
         "SELECT DISTINCT f.film_id, f.title, f.description, "
         "f.release_year, f.rating, f.rental_rate, "
         "f.replacement_cost "
         "FROM film f "
         f"{sql_join} "
         f"WHERE {where_sql} "
-        "ORDER BY f.title "
-        "LIMIT %s OFFSET %s"
+        "ORDER BY f.title, f.film_id "
+        f"{limit_sql}"
     )
-    params.extend([int(limit), int(offset)])
-    
+
+
+def _films_page_sql(sql_join, where_sql, params, offset, limit, page_token):
+    """Строит запрос страницы фильмов (общий для синхронного и
+    асинхронного доступа, см. `async_connector.py`).
+
+    Возвращает:
+        tuple: (query, params)
+    """
+    params = list(params)
+    if page_token:
+        last_title, last_id = _decode_page_token(page_token)
+        params.extend([last_title, last_title, last_id, int(limit)])
+    else:
+        params.extend([int(limit), int(offset)])
+    query = _films_page_query(sql_join, where_sql, bool(page_token))
+    return query, tuple(params)
+
+
+def _next_page_token(films, limit):
+    """Токен следующей страницы или None, если страница последняя."""
+    if films and len(films) >= int(limit):
+        last = films[-1]
+        return _encode_page_token(last["title"], last["film_id"])
+    return None
+
+
+def _query_films_page(sql_join, where_sql, params, offset, limit, page_token):
+    """Выполняет запрос страницы фильмов в MySQL без обращения к кэшу."""
+    query, params = _films_page_sql(
+        sql_join, where_sql, params, offset, limit, page_token)
+
     with get_connection() as conn:
         with conn.cursor() as cursor:
-            cursor.execute(query, tuple(params))
-            return cursor.fetchall()
+            cursor.execute(query, params)
+            films = cursor.fetchall()
+
+    return films, _next_page_token(films, limit)
+
+
+def search_by_keyword(
+        keyword,
+        offset=0,
+        limit=LIMIT,
+        genre_id=None,
+        year_min=None,
+        year_max=None,
+        age_rating=None,
+        page_token=None):
+    """Поиск фильмов по ключевому слову с опциональными фильтрами.
+    Поддерживаются фильтры: `genre_id`, `year_min`/`year_max`, `age_rating`.
+    Страница задаётся `offset` либо токеном `page_token`
+    (см. `search_by_keyword_page`).
+    """
+    films, _ = search_by_keyword_page(
+        keyword, offset, limit, genre_id, year_min, year_max, age_rating,
+        page_token)
+    return films
+
+
+def search_by_keyword_page(
+        keyword,
+        offset=0,
+        limit=LIMIT,
+        genre_id=None,
+        year_min=None,
+        year_max=None,
+        age_rating=None,
+        page_token=None):
+    """То же, что `search_by_keyword`, но дополнительно возвращает токен
+    следующей страницы.
+
+    Возвращает:
+        tuple: (films, next_token) — `next_token` передаётся в следующий
+               вызов как `page_token`; None — страниц больше нет
+    """
+    snapshot = _keyword_catalog()
+    if snapshot is not None:
+        spec = FilterSpec(keyword, genre_id, year_min, year_max, age_rating)
+        return _catalog_page(snapshot, spec, offset, limit, page_token)
+    sql_join, where_sql, params = _build_keyword_query_parts(
+        keyword, genre_id, year_min, year_max, age_rating)
+    return _fetch_films_page(
+        "keyword", sql_join, where_sql, params, offset, limit, page_token)
 
 
 def _build_genre_year_query_parts(
@@ -176,29 +516,8 @@ def _build_genre_year_query_parts(
     Возвращает:
         tuple: (sql_join, where_sql, params)
     """
-    params = []
-    where_parts = []
-    sql_join = ""
-    
-    if genre_id is not None:
-        sql_join = "JOIN film_category fc ON f.film_id = fc.film_id"
-        where_parts.append("fc.category_id = %s")
-        params.append(int(genre_id))
-    
-    if year_min is not None and year_max is not None:
-        where_parts.append("f.release_year BETWEEN %s AND %s")
-        params.append(int(year_min))
-        params.append(int(year_max))
-    
-    if age_rating:
-        allowed = get_age_ratings_lesser_or_equal(age_rating)
-        if allowed:
-            placeholders = ",".join(["%s"] * len(allowed))
-            where_parts.append(f"f.rating IN ({placeholders})")
-            params.extend(allowed)
-    
-    where_sql = " AND ".join(where_parts) if where_parts else "1=1"
-    return sql_join, where_sql, params
+    spec = FilterSpec(None, genre_id, year_min, year_max, age_rating)
+    return spec.compile()  # query_builder.py
 
 
 def search_by_genre_and_year(
@@ -207,69 +526,300 @@ def search_by_genre_and_year(
         year_max=None,
         offset=0,
         limit=LIMIT,
-        age_rating=None):
+        age_rating=None,
+        page_token=None):
     """Поиск фильмов по жанру и/или диапазону лет с
     опциональным фильтром `age_rating`.
+    Страница задаётся `offset` либо токеном `page_token`
+    (см. `search_by_genre_and_year_page`).
+    """
+    films, _ = search_by_genre_and_year_page(
+        genre_id, year_min, year_max, offset, limit, age_rating, page_token)
+    return films
+
+
+def search_by_genre_and_year_page(
+        genre_id=None,
+        year_min=None,
+        year_max=None,
+        offset=0,
+        limit=LIMIT,
+        age_rating=None,
+        page_token=None):
+    """То же, что `search_by_genre_and_year`, но дополнительно возвращает
+    токен следующей страницы.
+
+    Возвращает:
+        tuple: (films, next_token)
     """
+    snapshot = _catalog()
+    if snapshot is not None:
+        spec = FilterSpec(None, genre_id, year_min, year_max, age_rating)
+        return _catalog_page(snapshot, spec, offset, limit, page_token)
     sql_join, where_sql, params = _build_genre_year_query_parts(
         genre_id, year_min, year_max, age_rating
     )
-    
-    query = (
-        "SELECT DISTINCT f.film_id, f.title, f.description, "
+    return _fetch_films_page(
+        "genre_year", sql_join, where_sql, params, offset, limit, page_token)
+
+
+def _supports_window_functions(server_version):
+    """Проверяет по строке версии сервера, есть ли оконные функции
+    (MySQL 8.0+, MariaDB 10.2+).
+    """
+    versions = re.findall(r"\d+\.\d+", server_version or "")
+    if not versions:
+        return False
+    if "mariadb" in server_version.lower():
+        # Старые MariaDB сообщают версию вида "5.5.5-10.6.12-MariaDB"
+        major, minor = map(int, versions[-1].split("."))
+        return (major, minor) >= (10, 2)
+    major, minor = map(int, versions[0].split("."))
+    return (major, minor) >= (8, 0)
+
+
+def _get_total_strategy(conn):
+    """Возвращает стратегию подсчёта для соединения, определяя её один раз."""
+    global _total_strategy
+    if _total_strategy is None:
+        if _supports_window_functions(conn.get_server_info()):
+            _total_strategy = "window"
+        else:
+            _total_strategy = "found_rows"
+    return _total_strategy
+
+
+def _fetch_first_page_with_total(
+        search_type, sql_join, where_sql, params, limit=LIMIT):
+    """Возвращает первую страницу и общее число совпадений.
+
+    При `FIRST_PAGE_STRATEGY` = "parallel" — двумя одновременными запросами
+    (см. `_fetch_first_page_parallel`), иначе одним запросом.
+    На серверах с оконными функциями общее число берётся из
+    `COUNT(*) OVER()` по результату `SELECT DISTINCT`; на старых —
+    через `SQL_CALC_FOUND_ROWS` и `FOUND_ROWS()` на том же соединении.
+    Результат раскладывается в кэш как первая страница и как счётчик.
+
+    Возвращает:
+        tuple: (films, total, next_token)
+    """
+    page_key = _cache_key(search_type, "page", sql_join, where_sql, params,
+                          ("offset", 0), int(limit))
+    count_key = _cache_key(search_type, "count", sql_join, where_sql, params)
+    page_hit, page = _search_cache.get(page_key)
+    count_hit, total = _search_cache.get(count_key)
+    if page_hit and count_hit:
+        films, next_token = _copy_result(page)
+        return films, total, next_token
+
+    if FIRST_PAGE_STRATEGY == "parallel":
+        return _fetch_first_page_parallel(
+            search_type, sql_join, where_sql, params, limit)
+
+    films, total, next_token = _query_first_page_with_total(
+        sql_join, where_sql, params, limit)
+    _search_cache.set(page_key, (films, next_token))
+    _search_cache.set(count_key, total)
+    return _copy_result(films), total, next_token
+
+
+def _get_count_executor():
+    """Возвращает пул потоков для параллельных счётчиков."""
+    global _count_executor
+    if _count_executor is None:
+        with _pool_lock:
+            if _count_executor is None:
+                # Каждый счётчик занимает второе соединение поиска: не
+                # больше половины пула, чтобы страницам оставались
+                _count_executor = ThreadPoolExecutor(
+                    max(1, MYSQL_POOL_SIZE // 2), thread_name_prefix="count")
+                atexit.register(_count_executor.shutdown, wait=False)
+    return _count_executor
+
+
+def _fetch_first_page_parallel(search_type, sql_join, where_sql, params, limit):
+    """Первая страница и общее число — двумя запросами одновременно.
+
+    Счётчик выполняется в отдельном потоке на своём соединении из пула,
+    страница — в текущем, поэтому время ответа равно времени более
+    медленного из них, а не их сумме. Оба результата попадают в кэш
+    (см. `_fetch_films_page`, `_count_films`).
+
+    Возвращает:
+        tuple: (films, total, next_token)
+    """
+    count_future = _get_count_executor().submit(
+        _count_films, search_type, sql_join, where_sql, params)
+    try:
+        films, next_token = _fetch_films_page(
+            search_type, sql_join, where_sql, params, 0, limit)
+    except BaseException:
+        count_future.cancel()
+        raise
+    return films, count_future.result(), next_token
+
+
+def _query_first_page_with_total(sql_join, where_sql, params, limit):
+    """Выполняет совмещённый запрос «страница + total» без кэша."""
+    select_sql = (
+        "f.film_id, f.title, f.description, "
         "f.release_year, f.rating, f.rental_rate, "
         "f.replacement_cost "
         "FROM film f "
         f"{sql_join} "
-        f"WHERE {where_sql} "
-        "ORDER BY f.title LIMIT %s OFFSET %s"
+        f"WHERE {where_sql}"
     )
-    params.extend([int(limit), int(offset)])
-    
+    params = list(params) + [int(limit)]
+
     with get_connection() as conn:
         with conn.cursor() as cursor:
-            cursor.execute(query, tuple(params))
-            return cursor.fetchall()
-
-
-def get_keyword_count(
+            if _get_total_strategy(conn) == "window":
+                cursor.execute(
+                    "SELECT t.*, COUNT(*) OVER() AS total_count "
+                    f"FROM (SELECT DISTINCT {select_sql}) AS t "
+                    "ORDER BY t.title, t.film_id LIMIT %s",
+                    tuple(params))
+                films = cursor.fetchall()
+                total = int(films[0]["total_count"]) if films else 0
+                for film in films:
+                    film.pop("total_count", None)
+            else:
+                cursor.execute(
+                    f"SELECT SQL_CALC_FOUND_ROWS DISTINCT {select_sql} "
+                    "ORDER BY f.title, f.film_id LIMIT %s",
+                    tuple(params))
+                films = cursor.fetchall()
+                cursor.execute("SELECT FOUND_ROWS() AS cnt")
+                total = int(cursor.fetchone().get("cnt", 0))
+
+    return films, total, _next_page_token(films, limit)
+
+
+def search_by_keyword_with_total(
         keyword,
+        limit=LIMIT,
         genre_id=None,
         year_min=None,
         year_max=None,
         age_rating=None):
-    """Возвращает общее число фильмов, соответствующих ключу и фильтрам."""
+    """Первая страница поиска по ключевому слову вместе с общим числом
+    совпадений — заменяет пару `get_keyword_count` + `search_by_keyword`.
+
+    Возвращает:
+        tuple: (films, total, next_token)
+    """
+    snapshot = _keyword_catalog()
+    if snapshot is not None:
+        spec = FilterSpec(keyword, genre_id, year_min, year_max, age_rating)
+        films, next_token = _catalog_page(snapshot, spec, 0, limit, None)
+        return films, snapshot.count(spec), next_token
     sql_join, where_sql, params = _build_keyword_query_parts(
         keyword, genre_id, year_min, year_max, age_rating)
-    
-    query = (
-        f"SELECT COUNT(DISTINCT f.film_id) AS cnt "
-        f"FROM film f {sql_join} WHERE {where_sql}"
-    )
-    
-    with get_connection() as conn:
-        with conn.cursor() as cursor:
-            cursor.execute(query, tuple(params))
-            row = cursor.fetchone()
-            return int(row.get("cnt", 0))
+    return _fetch_first_page_with_total(
+        "keyword", sql_join, where_sql, params, limit)
 
 
-def get_genre_year_count(genre_id=None, year_min=None, year_max=None, age_rating=None):
-    """Вернуть количество фильмов для жанра и/или диапазона лет и опц. возрастной категории."""
-    sql_join, where_sql, params = _build_genre_year_query_parts(genre_id, year_min, year_max, age_rating)
-    
-    query = (
+def search_by_genre_and_year_with_total(
+        genre_id=None,
+        year_min=None,
+        year_max=None,
+        limit=LIMIT,
+        age_rating=None):
+    """Первая страница поиска по жанру и/или годам вместе с общим числом
+    совпадений.
+
+    Возвращает:
+        tuple: (films, total, next_token)
+    """
+    snapshot = _catalog()
+    if snapshot is not None:
+        spec = FilterSpec(None, genre_id, year_min, year_max, age_rating)
+        films, next_token = _catalog_page(snapshot, spec, 0, limit, None)
+        return films, snapshot.count(spec), next_token
+    sql_join, where_sql, params = _build_genre_year_query_parts(
+        genre_id, year_min, year_max, age_rating)
+    return _fetch_first_page_with_total(
+        "genre_year", sql_join, where_sql, params, limit)
+
+
+@lru_cache(maxsize=256)
+def _count_sql(sql_join, where_sql):
+    """Строит запрос числа фильмов по готовым частям запроса."""
+    return (
         "SELECT COUNT(DISTINCT f.film_id) AS cnt "
         "FROM film f "
         f"{sql_join} "
         f"WHERE {where_sql}"
     )
-    
+
+
+def _count_films(search_type, sql_join, where_sql, params):
+    """Возвращает число фильмов по готовым частям запроса (с учётом кэша)."""
+    key = _cache_key(search_type, "count", sql_join, where_sql, params)
+    hit, cached = _search_cache.get(key)
+    if hit:
+        return cached
+
+    query = _count_sql(sql_join, where_sql)
+
     with get_connection() as conn:
         with conn.cursor() as cursor:
             cursor.execute(query, tuple(params))
             row = cursor.fetchone()
-            return int(row.get("cnt", 0))
+            total = int(row.get("cnt", 0))
+    _search_cache.set(key, total)
+    return total
+
+
+def get_keyword_count(
+        keyword,
+        genre_id=None,
+        year_min=None,
+        year_max=None,
+        age_rating=None):
+    """Возвращает общее число фильмов, соответствующих ключу и фильтрам."""
+    snapshot = _keyword_catalog()
+    if snapshot is not None:
+        return snapshot.count(
+            FilterSpec(keyword, genre_id, year_min, year_max, age_rating))
+    sql_join, where_sql, params = _build_keyword_query_parts(
+        keyword, genre_id, year_min, year_max, age_rating)
+    return _count_films("keyword", sql_join, where_sql, params)
+
+
+def get_genre_year_count(genre_id=None, year_min=None, year_max=None, age_rating=None):
+    """Вернуть количество фильмов для жанра и/или диапазона лет и опц. возрастной категории."""
+    snapshot = _catalog()
+    if snapshot is not None:
+        return snapshot.count(
+            FilterSpec(None, genre_id, year_min, year_max, age_rating))
+    sql_join, where_sql, params = _build_genre_year_query_parts(genre_id, year_min, year_max, age_rating)
+    return _count_films("genre_year", sql_join, where_sql, params)
+
+
+# Запросы по актёрам (общие с async_connector.py)
+_ACTORS_BY_FILM_SQL = (
+    "SELECT a.actor_id, a.first_name, a.last_name "
+    "FROM actor a "
+    "JOIN film_actor fa ON a.actor_id = fa.actor_id "
+    "WHERE fa.film_id = %s "
+    "ORDER BY a.last_name, a.first_name"
+)
+_FILMS_BY_ACTOR_SQL = (
+    "SELECT DISTINCT f.film_id, f.title, f.description, f.release_year, "
+    "f.rating, f.rental_rate, f.replacement_cost "
+    "FROM film f "
+    "JOIN film_actor fa ON f.film_id = fa.film_id "
+    "WHERE fa.actor_id = %s "
+    "ORDER BY f.title "
+    "LIMIT %s OFFSET %s"
+)
+_FILMS_BY_ACTOR_COUNT_SQL = (
+    "SELECT COUNT(DISTINCT f.film_id) AS cnt "
+    "FROM film f "
+    "JOIN film_actor fa ON f.film_id = fa.film_id "
+    "WHERE fa.actor_id = %s"
+)
 
 
 def get_actors_by_film(film_id):
@@ -277,17 +827,51 @@ def get_actors_by_film(film_id):
 
     Результат — список словарей, упорядоченных по фамилии, затем по имени.
     """
+    snapshot = _catalog()
+    if snapshot is not None:
+        return snapshot.actors_by_film(int(film_id))
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(_ACTORS_BY_FILM_SQL, (int(film_id),))
+            return cursor.fetchall()
+
+
+def get_actors_by_films(film_ids):
+    """Возвращает актёров сразу для нескольких фильмов одним запросом.
+
+    Параметры:
+        film_ids: Итерируемое из `film_id`
+    Возвращает:
+        dict: {film_id: [актёры]} — для каждого запрошенного фильма (пустой
+              список, если актёров нет); актёры в том же виде и порядке,
+              что и в `get_actors_by_film`
+    """
+    ids = list(dict.fromkeys(int(i) for i in film_ids if i is not None))
+    cast = {film_id: [] for film_id in ids}
+    if not ids:
+        return cast
+
+    snapshot = _catalog()
+    if snapshot is not None:
+        return {film_id: snapshot.actors_by_film(film_id) for film_id in ids}
+
+    placeholders = ",".join(["%s"] * len(ids))
     query = (
-        "SELECT a.actor_id, a.first_name, a.last_name "
+        "SELECT fa.film_id, a.actor_id, a.first_name, a.last_name "
         "FROM actor a "
         "JOIN film_actor fa ON a.actor_id = fa.actor_id "
-        "WHERE fa.film_id = %s "
-        "ORDER BY a.last_name, a.first_name"
+        f"WHERE fa.film_id IN ({placeholders}) "
+        "ORDER BY fa.film_id, a.last_name, a.first_name"
     )
     with get_connection() as conn:
         with conn.cursor() as cursor:
-            cursor.execute(query, (int(film_id),))
-            return cursor.fetchall()
+            cursor.execute(query, tuple(ids))
+            rows = cursor.fetchall()
+
+    for row in rows:
+        film_id = row.pop("film_id")
+        cast[film_id].append(row)
+    return cast
 
 
 def get_films_by_actor(actor_id, offset=0, limit=LIMIT):
@@ -296,31 +880,100 @@ def get_films_by_actor(actor_id, offset=0, limit=LIMIT):
     Результат — список словарей с информацией о фильмах,
     упорядоченных по названию фильма.
     """
-    query = (
-        "SELECT DISTINCT f.film_id, f.title, f.description, f.release_year, "
-        "f.rating, f.rental_rate, f.replacement_cost "
-        "FROM film f "
-        "JOIN film_actor fa ON f.film_id = fa.film_id "
-        "WHERE fa.actor_id = %s "
-        "ORDER BY f.title "
-        "LIMIT %s OFFSET %s"
-    )
+    snapshot = _catalog()
+    if snapshot is not None:
+        return snapshot.films_by_actor(int(actor_id), int(offset), int(limit))
     with get_connection() as conn:
         with conn.cursor() as cursor:
-            cursor.execute(query, (int(actor_id), int(limit), int(offset)))
+            cursor.execute(
+                _FILMS_BY_ACTOR_SQL, (int(actor_id), int(limit), int(offset)))
             return cursor.fetchall()
 
 
 def get_films_by_actor_count(actor_id):
     """Возвращает количество фильмов с участием актёра."""
-    query = (
-        "SELECT COUNT(DISTINCT f.film_id) AS cnt "
-        "FROM film f "
-        "JOIN film_actor fa ON f.film_id = fa.film_id "
-        "WHERE fa.actor_id = %s"
-    )
+    snapshot = _catalog()
+    if snapshot is not None:
+        return snapshot.films_by_actor_count(int(actor_id))
     with get_connection() as conn:
         with conn.cursor() as cursor:
-            cursor.execute(query, (int(actor_id),))
+            cursor.execute(_FILMS_BY_ACTOR_COUNT_SQL, (int(actor_id),))
             row = cursor.fetchone()
             return int(row.get("cnt", 0))
+
+
+def _iter_rows(query, params):
+    """Выполняет запрос на небуферизованном курсоре и отдаёт строки по
+    мере получения от сервера.
+
+    Соединение занято, пока генератор не исчерпан или не закрыт.
+    """
+    with get_connection() as conn:
+        with conn.cursor(pymysql.cursors.SSDictCursor) as cursor:
+            cursor.execute(query, tuple(params))
+            yield from cursor
+
+
+def _iter_films(sql_join, where_sql, params):
+    """Отдаёт все фильмы, подходящие под условия, по одному."""
+    query = (
+        "SELECT DISTINCT f.film_id, f.title, f.description, "
+        "f.release_year, f.rating, f.rental_rate, "
+        "f.replacement_cost "
+        "FROM film f "
+        f"{sql_join} "
+        f"WHERE {where_sql} "
+        "ORDER BY f.title, f.film_id"
+    )
+    return _iter_rows(query, params)
+
+
+def iter_search_by_keyword(
+        keyword,
+        genre_id=None,
+        year_min=None,
+        year_max=None,
+        age_rating=None):
+    """Все результаты `search_by_keyword` без разбиения на страницы,
+    по одному фильму (без кэша, память не зависит от числа строк).
+    """
+    snapshot = _keyword_catalog()
+    if snapshot is not None:
+        return snapshot.iter_films(
+            FilterSpec(keyword, genre_id, year_min, year_max, age_rating))
+    sql_join, where_sql, params = _build_keyword_query_parts(
+        keyword, genre_id, year_min, year_max, age_rating)
+    return _iter_films(sql_join, where_sql, params)
+
+
+def iter_search_by_genre_and_year(
+        genre_id=None,
+        year_min=None,
+        year_max=None,
+        age_rating=None):
+    """Все результаты `search_by_genre_and_year` без разбиения на
+    страницы, по одному фильму.
+    """
+    snapshot = _catalog()
+    if snapshot is not None:
+        return snapshot.iter_films(
+            FilterSpec(None, genre_id, year_min, year_max, age_rating))
+    sql_join, where_sql, params = _build_genre_year_query_parts(
+        genre_id, year_min, year_max, age_rating)
+    return _iter_films(sql_join, where_sql, params)
+
+
+def iter_films_by_actor(actor_id):
+    """Все фильмы актёра (как `get_films_by_actor`), по одному."""
+    snapshot = _catalog()
+    if snapshot is not None:
+        return iter(snapshot.films_by_actor(int(actor_id)))
+    query = (
+        "SELECT DISTINCT f.film_id, f.title, f.description, f.release_year, "
+        "f.rating, f.rental_rate, f.replacement_cost "
+        "FROM film f "
+        "JOIN film_actor fa ON f.film_id = fa.film_id "
+        "WHERE fa.actor_id = %s "
+        "ORDER BY f.title"
+    )
+    return _iter_rows(query, (int(actor_id),))
@@ -0,0 +1,182 @@
+"""Ограниченный потокобезопасный пул соединений.
+
+Пул не зависит от конкретного драйвера: соединения создаются функцией
+`connect`, переданной при инициализации. От соединения требуются методы
+`ping(reconnect=False)` и `close()` и атрибут `open` (как у PyMySQL).
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+
+class PoolTimeoutError(RuntimeError):
+    """Не удалось получить соединение из пула за отведённое время."""
+
+
+class ConnectionPool:
+    """Пул соединений с проверкой при выдаче и вытеснением простаивающих.
+
+    Параметры:
+        connect: Функция без аргументов, открывающая новое соединение
+        max_size: Максимальное число одновременно открытых соединений
+        max_idle: Сколько секунд соединение может простаивать в пуле
+        timeout: Сколько секунд ждать свободного соединения
+    """
+
+    def __init__(self, connect, max_size=5, max_idle=300, timeout=10):
+        if max_size < 1:
+            raise ValueError("Размер пула должен быть не меньше 1")
+        self._connect = connect
+        self.max_size = max_size
+        self.max_idle = max_idle
+        self.timeout = timeout
+
+        self._cond = threading.Condition()
+        # Свободные соединения: список пар (conn, момент возврата).
+        # Выдаём с конца (LIFO), вытесняем с начала — там самые старые.
+        self._idle = []
+        self._size = 0
+        self._closed = False
+
+        self._hits = 0
+        self._misses = 0
+        self._waits = 0
+        self._wait_time = 0.0
+        self._timeouts = 0
+        self._evicted = 0
+        self._ping_failures = 0
+
+    def _evict_expired(self, now):
+        """Закрывает соединения, простаивающие дольше `max_idle`.
+        Вызывается под блокировкой.
+        """
+        while self._idle and now - self._idle[0][1] > self.max_idle:
+            conn, _ = self._idle.pop(0)
+            self._size -= 1
+            self._evicted += 1
+            _close_quietly(conn)
+
+    def acquire(self):
+        """Выдаёт соединение из пула, при необходимости открывая новое.
+
+        Возвращает:
+            Соединение, прошедшее проверку `ping`
+        Исключения:
+            PoolTimeoutError: если свободного соединения не дождались
+        """
+        start = time.monotonic()
+        waited = False
+        conn = None
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Пул соединений закрыт")
+                self._evict_expired(time.monotonic())
+                if self._idle:
+                    conn, _ = self._idle.pop()
+                    self._hits += 1
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    self._misses += 1
+                    break
+                remaining = self.timeout - (time.monotonic() - start)
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeoutError(
+                        f"Нет свободных соединений MySQL за {self.timeout} с "
+                        f"(размер пула {self.max_size})"
+                    )
+                waited = True
+                self._cond.wait(remaining)
+            if waited:
+                self._waits += 1
+                self._wait_time += time.monotonic() - start
+
+        if conn is not None:
+            # Проверяем «живость» соединения; мёртвое заменяем новым
+            try:
+                conn.ping(reconnect=False)
+                return conn
+            except Exception:
+                with self._cond:
+                    self._ping_failures += 1
+                _close_quietly(conn)
+
+        try:
+            return self._connect()
+        except BaseException:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+    def release(self, conn, discard=False):
+        """Возвращает соединение в пул.
+
+        Параметры:
+            conn: Ранее выданное соединение
+            discard: Закрыть соединение вместо возврата в пул
+        """
+        if not getattr(conn, "open", True):
+            discard = True
+        with self._cond:
+            if discard or self._closed:
+                self._size -= 1
+                _close_quietly(conn)
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        """Контекстный менеджер: выдаёт соединение и возвращает его в пул."""
+        conn = self.acquire()
+        try:
+            yield conn
+        except BaseException:
+            # Оборванное соединение (conn.open == False) release закроет сам
+            self.release(conn)
+            raise
+        self.release(conn)
+
+    def stats(self):
+        """Возвращает метрики пула.
+
+        Возвращает:
+            dict: hits/misses (выдача из пула / новое подключение),
+                  waits и wait_time (ожидание свободного соединения),
+                  timeouts, evicted, ping_failures, size, idle
+        """
+        with self._cond:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "max_size": self.max_size,
+                "hits": self._hits,
+                "misses": self._misses,
+                "waits": self._waits,
+                "wait_time": round(self._wait_time, 6),
+                "timeouts": self._timeouts,
+                "evicted": self._evicted,
+                "ping_failures": self._ping_failures,
+            }
+
+    def close(self):
+        """Закрывает все свободные соединения и запрещает выдачу новых."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for conn, _ in idle:
+            _close_quietly(conn)
+
+
+def _close_quietly(conn):
+    """Закрывает соединение, игнорируя ошибки (оно могло уже оборваться)."""
+    try:
+        conn.close()
+    except Exception:
+        pass
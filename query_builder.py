@@ -0,0 +1,130 @@
+"""Построение условий поиска фильмов по набору фильтров.
+
+`FilterSpec` описывает фильтры запроса (ключевое слово, жанр, годы,
+возрастная категория) и собирает из них части SQL: `sql_join`,
+`where_sql` и параметры. Текст условий зависит только от того, какие
+фильтры заданы («форма» запроса), поэтому он строится один раз на форму
+и дальше берётся из кэша; при каждом вызове собираются только параметры.
+Условие по ключевому слову строит движок поиска (`search_backends.py`).
+
+Списки допустимых возрастных категорий («выбранная и более мягкие»)
+вычисляются один раз из `AGE_RATING_ORDER`.
+"""
+
+from functools import lru_cache
+
+from config import AGE_RATING_ORDER
+
+
+# Категория -> она и все более мягкие, в порядке AGE_RATING_ORDER
+RATINGS_UP_TO = {
+    rating: tuple(AGE_RATING_ORDER[: idx + 1])
+    for idx, rating in enumerate(AGE_RATING_ORDER)
+}
+
+
+def ratings_up_to(age_rating):
+    """Возвращает кортеж категорий: `age_rating` и все более мягкие.
+
+    Если категории нет в `AGE_RATING_ORDER` — кортеж из неё самой;
+    пустая категория — пустой кортеж.
+    """
+    if not age_rating:
+        return ()
+    return RATINGS_UP_TO.get(age_rating, (age_rating,))
+
+
+@lru_cache(maxsize=None)
+def _compile_shape(has_genre, has_years, ratings_count):
+    """Строит текст условий для формы запроса (без ключевого слова).
+
+    Возвращает:
+        tuple: (sql_join, условия через AND или "")
+    """
+    sql_join = ""
+    conditions = []
+    if has_genre:
+        sql_join = "JOIN film_category fc ON f.film_id = fc.film_id"
+        conditions.append("fc.category_id = %s")
+    if has_years:
+        conditions.append("f.release_year BETWEEN %s AND %s")
+    if ratings_count:
+        placeholders = ",".join(["%s"] * ratings_count)
+        conditions.append(f"f.rating IN ({placeholders})")
+    return sql_join, " AND ".join(conditions)
+
+
+class FilterSpec:
+    """Фильтры поиска фильмов.
+
+    Параметры:
+        keyword: Ключевое слово (пустое — без фильтра)
+        genre_id: ID жанра
+        year_min, year_max: Диапазон годов (учитывается, только если заданы
+                            обе границы)
+        age_rating: Возрастная категория (включая более мягкие)
+    """
+
+    __slots__ = ("keyword", "genre_id", "year_min", "year_max", "age_rating")
+
+    def __init__(self, keyword=None, genre_id=None, year_min=None,
+                 year_max=None, age_rating=None):
+        self.keyword = keyword or None
+        self.genre_id = int(genre_id) if genre_id is not None else None
+        if year_min is not None and year_max is not None:
+            self.year_min, self.year_max = int(year_min), int(year_max)
+        else:
+            self.year_min = self.year_max = None
+        self.age_rating = age_rating or None
+
+    def __repr__(self):
+        fields = ", ".join(
+            f"{name}={getattr(self, name)!r}" for name in self.__slots__
+            if getattr(self, name) is not None)
+        return f"FilterSpec({fields})"
+
+    @property
+    def ratings(self):
+        """Допустимые возрастные категории (пустой кортеж — любые)."""
+        return ratings_up_to(self.age_rating)
+
+    @property
+    def shape(self):
+        """Форма запроса без ключевого слова: какие фильтры заданы."""
+        return (
+            self.genre_id is not None,
+            self.year_min is not None,
+            len(self.ratings),
+        )
+
+    def compile(self, backend=None):
+        """Собирает части SQL-запроса.
+
+        Параметры:
+            backend: Движок поиска по ключевому слову; обязателен, если
+                     задано ключевое слово
+        Возвращает:
+            tuple: (sql_join, where_sql, params)
+        """
+        sql_join, filters_sql = _compile_shape(*self.shape)
+
+        params = []
+        conditions = []
+        if self.keyword:
+            if backend is None:
+                raise ValueError("Для поиска по ключевому слову нужен движок поиска")
+            condition, keyword_params = backend.keyword_condition(self.keyword)
+            conditions.append(condition)
+            params.extend(keyword_params)
+        if self.genre_id is not None:
+            params.append(self.genre_id)
+        if self.year_min is not None:
+            params.append(self.year_min)
+            params.append(self.year_max)
+        params.extend(self.ratings)
+
+        if filters_sql:
+            conditions.append(filters_sql)
+        # Если условий нет, вернём "1=1" для валидного SQL
+        where_sql = " AND ".join(conditions) if conditions else "1=1"
+        return sql_join, where_sql, params
@@ -0,0 +1,87 @@
+"""Потокобезопасный кэш в памяти с ограничением размера (LRU) и TTL."""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """LRU-кэш с временем жизни записей.
+
+    Параметры:
+        max_size: Максимальное число записей; 0 — кэш отключён
+        ttl: Время жизни записи в секундах
+    """
+
+    def __init__(self, max_size=256, ttl=300):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def get(self, key):
+        """Ищет запись по ключу.
+
+        Возвращает:
+            tuple: (True, значение) при попадании, (False, None) иначе
+        """
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self._misses += 1
+                return False, None
+            value, expires = item
+            if expires < time.monotonic():
+                del self._data[key]
+                self._expirations += 1
+                self._misses += 1
+                return False, None
+            self._data.move_to_end(key)
+            self._hits += 1
+            return True, value
+
+    def set(self, key, value):
+        """Сохраняет значение, вытесняя самые давно использованные записи."""
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self, predicate=None):
+        """Удаляет записи, для ключей которых `predicate(key)` истинно;
+        без предиката очищает кэш целиком.
+
+        Возвращает:
+            int: Число удалённых записей
+        """
+        with self._lock:
+            if predicate is None:
+                removed = len(self._data)
+                self._data.clear()
+                return removed
+            keys = [k for k in self._data if predicate(k)]
+            for k in keys:
+                del self._data[k]
+            return len(keys)
+
+    def stats(self):
+        """Возвращает счётчики попаданий/промахов и долю попаданий."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+            }
@@ -0,0 +1,125 @@
+"""Справочные данные каталога: жанры, возрастные категории и границы лет.
+
+Данные загружаются из MySQL одним запросом при первом обращении
+(или заранее через `warm_up`), хранятся в памяти и периодически
+обновляются в фоновом потоке.
+"""
+
+import threading
+
+from config import REFERENCE_REFRESH_INTERVAL
+from mysql_connector import get_reference_data
+
+
+class ReferenceDataCache:
+    """Хранит справочники в памяти и обновляет их по расписанию.
+
+    Параметры:
+        loader: Функция, возвращающая словарь справочников
+        refresh_interval: Период обновления в секундах (0 — без обновления)
+    """
+
+    def __init__(self, loader, refresh_interval=3600):
+        self._loader = loader
+        self.refresh_interval = refresh_interval
+        self._data = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def get(self):
+        """Возвращает справочники, загружая их при первом обращении."""
+        data = self._data
+        if data is None:
+            with self._lock:
+                if self._data is None:
+                    self._data = self._loader()
+                data = self._data
+            self._start_refresher()
+        return data
+
+    def peek(self):
+        """Возвращает уже загруженные данные или None, ничего не загружая."""
+        return self._data
+
+    def refresh(self):
+        """Перечитывает справочники из базы.
+        При ошибке остаются прежние данные.
+
+        Возвращает:
+            bool: True если данные обновлены
+        """
+        try:
+            data = self._loader()
+        except Exception:
+            return False
+        with self._lock:
+            self._data = data
+        return True
+
+    def _start_refresher(self):
+        """Запускает фоновый поток обновления (один раз)."""
+        if self.refresh_interval <= 0:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(
+                target=self._refresh_loop,
+                name="reference-data-refresh",
+                daemon=True,
+            )
+            self._thread.start()
+
+    def _refresh_loop(self):
+        while not self._stop.wait(self.refresh_interval):
+            self.refresh()
+
+    def stop(self):
+        """Останавливает фоновое обновление."""
+        self._stop.set()
+
+
+_cache = ReferenceDataCache(get_reference_data, REFERENCE_REFRESH_INTERVAL)
+
+
+def warm_up(background=True):
+    """Заранее загружает справочники (вызывается при старте приложения).
+
+    Параметры:
+        background: Загрузить в отдельном потоке, не задерживая запуск.
+                    Ошибка загрузки в фоне не считается фатальной — данные
+                    будут запрошены повторно при первом обращении.
+    """
+    if not background:
+        _cache.get()
+        return
+
+    def _load():
+        try:
+            _cache.get()
+        except Exception:
+            pass
+
+    threading.Thread(target=_load, name="reference-data-warmup",
+                     daemon=True).start()
+
+
+def refresh():
+    """Принудительно обновляет справочники."""
+    return _cache.refresh()
+
+
+def get_genres():
+    """Возвращает список жанров (category_id, name)."""
+    return [dict(g) for g in _cache.get()["genres"]]
+
+
+def get_age_ratings():
+    """Возвращает упорядоченный список доступных возрастных категорий."""
+    return list(_cache.get()["age_ratings"])
+
+
+def get_year_bounds():
+    """Возвращает кортеж `(min_year, max_year)`."""
+    return _cache.get()["year_bounds"]
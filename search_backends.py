@@ -0,0 +1,202 @@
+"""Движки поиска по ключевому слову.
+
+Движок превращает ключевое слово в условие WHERE для запроса к `film f`;
+сортировка и остальные фильтры остаются общими (см. `mysql_connector`).
+
+- `like` — `f.title LIKE '%kw%'` (полный просмотр таблицы `film`);
+  `%` и `_` в ключевом слове ищутся как обычные символы;
+- `fulltext` — индекс FULLTEXT таблицы `film_text` (название и описание,
+  совпадение по началу слов);
+- `trigram` — триграммный индекс названий в памяти процесса: подстрока
+  названия без учёта регистра, но без правил сопоставления (collation)
+  MySQL — например, `like` в `utf8mb4_0900_ai_ci` не различает `e` и `é`,
+  а `trigram` различает. Индекс перестраивается по расписанию
+  справочников (`REFERENCE_REFRESH_INTERVAL`).
+"""
+
+import re
+from collections import defaultdict
+
+
+SEARCH_BACKENDS = ("like", "fulltext", "trigram")
+
+# Минимальная длина слова, индексируемого InnoDB FULLTEXT по умолчанию
+FULLTEXT_MIN_TOKEN = 3
+
+# Если по триграммному индексу нашлось больше фильмов, условие строится
+# через LIKE, а не списком из тысяч film_id в IN (...)
+TRIGRAM_MAX_IDS = 1000
+
+
+def escape_like(value):
+    """Экранирует `\\`, `%` и `_`, чтобы LIKE искал их как обычные символы."""
+    return re.sub(r"([\\%_])", r"\\\1", value)
+
+
+class LikeBackend:
+    """Поиск подстроки в названии через `LIKE`."""
+
+    name = "like"
+
+    def keyword_condition(self, keyword):
+        """Возвращает кортеж (sql_условие, params) для ключевого слова."""
+        return "f.title LIKE %s", [f"%{escape_like(keyword)}%"]
+
+
+class FulltextBackend:
+    """Поиск по FULLTEXT-индексу `film_text(title, description)`.
+
+    Слова короче `FULLTEXT_MIN_TOKEN` индекс не содержит, поэтому такие
+    запросы ищут подстроку через LIKE — тоже в названии и описании, чтобы
+    область поиска не зависела от длины слова.
+    """
+
+    name = "fulltext"
+
+    @staticmethod
+    def is_available(get_connection):
+        """Проверяет, есть ли у `film_text` FULLTEXT-индекс."""
+        query = (
+            "SELECT COUNT(*) AS cnt FROM information_schema.STATISTICS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'film_text' "
+            "AND INDEX_TYPE = 'FULLTEXT'"
+        )
+        try:
+            with get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(query)
+                    return int(cursor.fetchone().get("cnt", 0)) > 0
+        except Exception:
+            return False
+
+    def keyword_condition(self, keyword):
+        # Убираем операторы булева режима, каждое слово — обязательный префикс
+        words = re.findall(r"\w+", keyword)
+        if not words or any(len(w) < FULLTEXT_MIN_TOKEN for w in words):
+            pattern = f"%{escape_like(keyword)}%"
+            return "(f.title LIKE %s OR f.description LIKE %s)", [pattern, pattern]
+        against = " ".join(f"+{w}*" for w in words)
+        return (
+            "f.film_id IN (SELECT ft.film_id FROM film_text ft "
+            "WHERE MATCH(ft.title, ft.description) "
+            "AGAINST (%s IN BOOLEAN MODE))",
+            [against],
+        )
+
+
+class TrigramIndex:
+    """Триграммный индекс строк для поиска подстроки без учёта регистра.
+
+    Параметры:
+        docs: Итерируемое из пар (doc_id, text)
+    """
+
+    def __init__(self, docs):
+        self._texts = {}
+        self._postings = defaultdict(set)
+        for doc_id, text in docs:
+            folded = (text or "").casefold()
+            self._texts[doc_id] = folded
+            for gram in _trigrams(folded):
+                self._postings[gram].add(doc_id)
+
+    def __len__(self):
+        return len(self._texts)
+
+    def search(self, substring):
+        """Возвращает отсортированный список id строк, содержащих подстроку."""
+        needle = substring.casefold()
+        grams = _trigrams(needle)
+        if grams:
+            postings = sorted(
+                (self._postings.get(g, ()) for g in grams), key=len)
+            candidates = set(postings[0])
+            for posting in postings[1:]:
+                if not candidates:
+                    break
+                candidates &= posting
+        else:
+            # Слишком короткая строка — проверяем все документы
+            candidates = self._texts.keys()
+        return sorted(i for i in candidates if needle in self._texts[i])
+
+
+def _trigrams(text):
+    """Множество триграмм строки (пустое для строк короче трёх символов)."""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TrigramBackend:
+    """Поиск подстроки в названиях по триграммному индексу в памяти.
+
+    Индекс строится при первом поиске одним запросом к `film` и
+    перестраивается в фоне каждые `refresh_interval` секунд (0 — не
+    обновлять); `rebuild()` перечитывает названия сразу. Если совпадений
+    больше `TRIGRAM_MAX_IDS`, условие строится через LIKE.
+
+    Параметры:
+        get_connection: Функция, возвращающая соединение MySQL
+        refresh_interval: Период перестроения индекса в секундах
+    """
+
+    name = "trigram"
+
+    def __init__(self, get_connection, refresh_interval=0):
+        # reference_data.py импортирует mysql_connector, а тот — этот модуль
+        from reference_data import ReferenceDataCache
+
+        self._get_connection = get_connection
+        self._index = ReferenceDataCache(self._load_index, refresh_interval)
+        self._like = LikeBackend()
+
+    def _load_index(self):
+        with self._get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT film_id, title FROM film")
+                rows = cursor.fetchall()
+        return TrigramIndex((r["film_id"], r["title"]) for r in rows)
+
+    def rebuild(self):
+        """Перестраивает индекс по текущему содержимому `film`.
+
+        Возвращает:
+            bool: True если индекс обновлён (при ошибке остаётся прежний)
+        """
+        return self._index.refresh()
+
+    def stop(self):
+        """Останавливает фоновое перестроение индекса."""
+        self._index.stop()
+
+    def keyword_condition(self, keyword):
+        film_ids = self._index.get().search(keyword)
+        if not film_ids:
+            return "1=0", []
+        if len(film_ids) > TRIGRAM_MAX_IDS:
+            return self._like.keyword_condition(keyword)
+        placeholders = ",".join(["%s"] * len(film_ids))
+        return f"f.film_id IN ({placeholders})", film_ids
+
+
+def create_backend(name, get_connection, refresh_interval=0):
+    """Создаёт движок поиска по имени.
+
+    `fulltext` без FULLTEXT-индекса в базе заменяется на `trigram`.
+
+    Параметры:
+        name: Одно из `SEARCH_BACKENDS`
+        get_connection: Функция, возвращающая соединение MySQL
+        refresh_interval: Период перестроения индекса `trigram` (сек)
+    """
+    if name == "like":
+        return LikeBackend()
+    if name == "trigram":
+        return TrigramBackend(get_connection, refresh_interval)
+    if name == "fulltext":
+        if FulltextBackend.is_available(get_connection):
+            return FulltextBackend()
+        return TrigramBackend(get_connection, refresh_interval)
+    raise ValueError(
+        f"Неизвестный движок поиска: {name!r} "
+        f"(допустимо: {', '.join(SEARCH_BACKENDS)})"
+    )
@@ -4,18 +4,19 @@
 а также для просмотра фильмов актёра с поддержкой пагинации.
 """
 
+from concurrent.futures import ThreadPoolExecutor
+
 from mysql_connector import (
-    search_by_keyword,
-    search_by_genre_and_year,
-    get_genres,
-    get_year_bounds,
-    get_keyword_count,
-    get_genre_year_count,
+    search_by_keyword_page,
+    search_by_genre_and_year_page,
+    search_by_keyword_with_total,
+    search_by_genre_and_year_with_total,
     get_actors_by_film,
+    get_actors_by_films,
     get_films_by_actor,
     get_films_by_actor_count,
-    get_age_ratings,
 )
+from reference_data import get_genres, get_year_bounds, get_age_ratings
 from log_stats import log_search
 from formatter import (
     print_movies_table,
@@ -25,7 +26,7 @@ from formatter import (
     SEPARATOR_MINUS,
     SEPARATOR_EQUAL
 )
-from config import LIMIT, AGE_RATING_DESCRIPTIONS
+from config import LIMIT, AGE_RATING_DESCRIPTIONS, PREFETCH_WORKERS
 from input_utils import (
     process_yes_no_input,
     process_input,
@@ -34,6 +35,39 @@ from input_utils import (
 from favorites import add_to_favorites
 
 
+# Пул фоновых потоков для упреждающей загрузки данных
+_prefetch_executor = ThreadPoolExecutor(
+    max_workers=PREFETCH_WORKERS, thread_name_prefix="prefetch")
+
+
+def prefetch_cast(films):
+    """Запускает в фоне загрузку актёров для всех фильмов страницы.
+
+    Параметры:
+        films: Список фильмов (словари с `film_id`)
+    Возвращает:
+        Future со словарём {film_id: [актёры]}
+    """
+    film_ids = [f.get("film_id") for f in films]
+    return _prefetch_executor.submit(get_actors_by_films, film_ids)  # mysql_connector.py
+
+
+def get_cast(film_id, cast_future=None):
+    """Возвращает актёров фильма из результата `prefetch_cast`.
+
+    Если упреждающая загрузка не запускалась или завершилась ошибкой,
+    актёры запрашиваются напрямую.
+    """
+    if cast_future is not None:
+        try:
+            cast = cast_future.result()
+            if film_id in cast:
+                return cast[film_id]
+        except Exception:
+            pass
+    return get_actors_by_film(film_id)  # mysql_connector.py
+
+
 def _get_year_input(prompt, min_year, max_year, allow_empty=True):
     """Запрашивает ввод года с валидацией.
     
@@ -116,40 +150,111 @@ def _add_film_to_favorites(choice, films, offset=0):
         return False
 
 
-def _paginate_keyword_results(
-        total, keyword, genre_id, year_min, year_max, age_rating):
-    """Постраничный вывод результатов поиска по ключевому слову."""
+class PagePrefetcher:
+    """Упреждающая загрузка страниц результатов в фоновом потоке.
+
+    Параметры:
+        fetch_page: Функция `fetch_page(position)`, возвращающая страницу;
+                    `position` — токен страницы или offset
+    """
+
+    def __init__(self, fetch_page):
+        self._fetch_page = fetch_page
+        self._pending = {}
+
+    def prefetch(self, position):
+        """Запускает загрузку страницы `position`, если она ещё не начата."""
+        if position is None or position in self._pending:
+            return
+        self._pending[position] = _prefetch_executor.submit(
+            self._fetch_page, position)
+
+    def get(self, position):
+        """Возвращает страницу: готовую из фона или загруженную сейчас."""
+        future = self._pending.pop(position, None)
+        if future is not None and not future.cancelled():
+            try:
+                return future.result()
+            except Exception:
+                pass
+        return self._fetch_page(position)
+
+    def cancel(self):
+        """Отменяет ещё не начатые загрузки (например, при выходе из
+        пагинации); уже выполняющиеся запросы просто отбрасываются.
+        """
+        for future in self._pending.values():
+            future.cancel()
+        self._pending.clear()
+
+
+def _paginate_pages(total, fetch_page, first_page=None):
+    """Постраничный вывод результатов с упреждающей загрузкой.
+
+    Следующая страница запрашивается по токену последней показанной
+    позиции (keyset), `offset` нужен только для нумерации. Пока
+    пользователь читает страницу N, страница N+1 загружается в фоне.
+
+    Параметры:
+        total: Общее число результатов (или None)
+        fetch_page: Функция `fetch_page(page_token)` -> (films, next_token)
+        first_page: Уже полученная пара (films, next_token) для первой
+                    страницы
+    """
+    prefetcher = PagePrefetcher(fetch_page)
     offset = 0
-    while True:
-        films = search_by_keyword(  # mysql_connector.py
+    page_token = None
+    try:
+        while True:
+            if first_page is not None:
+                films, next_token = first_page
+                first_page = None
+            else:
+                films, next_token = prefetcher.get(page_token)
+            prefetcher.prefetch(next_token)
+            offset = _show_films_page(films, offset, total)
+            if offset is None or next_token is None:
+                break
+            page_token = next_token
+    finally:
+        prefetcher.cancel()
+
+
+def _paginate_keyword_results(
+        total, keyword, genre_id, year_min, year_max, age_rating,
+        first_page=None):
+    """Постраничный вывод результатов поиска по ключевому слову.
+    `first_page` — уже полученная пара (films, next_token) для первой
+    страницы.
+    """
+    def fetch_page(page_token):
+        return search_by_keyword_page(  # mysql_connector.py
             keyword=keyword,
-            offset=offset,
             limit=LIMIT,
             genre_id=genre_id,
             year_min=year_min,
             year_max=year_max,
-            age_rating=age_rating
+            age_rating=age_rating,
+            page_token=page_token
         )
-        offset = _show_films_page(films, offset, total)
-        if offset is None:
-            break
+
+    _paginate_pages(total, fetch_page, first_page)  # searches.py
 
 
-def _paginate_genre_results(total, genre_id, year_min, year_max, age_rating):
+def _paginate_genre_results(
+        total, genre_id, year_min, year_max, age_rating, first_page=None):
     """Постраничный вывод результатов поиска по жанру и годам."""
-    offset = 0
-    while True:
-        films = search_by_genre_and_year(  # mysql_connector.py
+    def fetch_page(page_token):
+        return search_by_genre_and_year_page(  # mysql_connector.py
             genre_id=genre_id,
             year_min=year_min,
             year_max=year_max,
-            offset=offset,
             limit=LIMIT,
-            age_rating=age_rating
+            age_rating=age_rating,
+            page_token=page_token
         )
-        offset = _show_films_page(films, offset, total)
-        if offset is None:
-            break
+
+    _paginate_pages(total, fetch_page, first_page)  # searches.py
 
 
 def _show_films_page(films, offset, total):
@@ -163,6 +268,9 @@ def _show_films_page(films, offset, total):
     if not films and offset == 0:
         print("\n   Фильмы не найдены\n")
         return None
+
+    # Пока пользователь читает страницу, загружаем актёров всех её фильмов
+    cast_future = prefetch_cast(films)  # searches.py
     
     if total is not None:
         start = offset + 1
@@ -205,7 +313,7 @@ def _show_films_page(films, offset, total):
             idx = int(choice)
             if idx >= offset + 1 and idx <= offset + len(films):
                 film = films[idx - offset - 1]
-                actors = get_actors_by_film(film.get("film_id"))  # mysql_connector.py
+                actors = get_cast(film.get("film_id"), cast_future)  # searches.py
                 print_actors(actors, film_title=film.get("title"))  # formatter.py
 
                 # Выбор актёра для просмотра его фильмов
@@ -278,45 +386,51 @@ def show_actor_films(actor_id, actor_name):
     except Exception:
         total = None
 
+    prefetcher = PagePrefetcher(
+        lambda page_offset: get_films_by_actor(  # mysql_connector.py
+            actor_id, offset=page_offset, limit=LIMIT))
     offset = 0
-    while True:
-        films = get_films_by_actor(actor_id, offset=offset, limit=LIMIT)  # mysql_connector.py
-
-        if not films:
-            print("\n   Фильмы не найдены\n")
-            break
-
-        if total is not None:
-            start = offset + 1
-            end = offset + len(films)
-            print(f"{SEPARATOR_MINUS}\n")
-
-        print_movies_table(  # formatter.py
-            films,
-            offset=offset,
-            total=total,
-            show_header=False)
-        print(SEPARATOR)
-
-        # Если это последняя страница, выходим
-        if len(films) < LIMIT:
-            break
-
-        if total is not None:
-            prompt = f"\n {start}–{end} из {total}. Нажмите Enter для продолжения, 'f<номер>' для добавления в избранное или 'q' для выхода: "
-        else:
-            prompt = "\n Нажмите Enter для продолжения, 'f<номер>' для добавления в избранное или 'q' для выхода: "
-        choice = process_input(prompt).lower()  # input_utils.py
-        if choice == 'q':
-            break
-        
-        # Обработка команды добавления в избранное
-        if choice.startswith('f'):
-            _add_film_to_favorites(choice, films, offset=offset)  # searches.py
-            continue
-
-        offset += LIMIT
+    try:
+        while True:
+            films = prefetcher.get(offset)  # searches.py
+
+            if not films:
+                print("\n   Фильмы не найдены\n")
+                break
+
+            if total is not None:
+                start = offset + 1
+                end = offset + len(films)
+                print(f"{SEPARATOR_MINUS}\n")
+
+            print_movies_table(  # formatter.py
+                films,
+                offset=offset,
+                total=total,
+                show_header=False)
+            print(SEPARATOR)
+
+            # Если это последняя страница, выходим
+            if len(films) < LIMIT:
+                break
+            prefetcher.prefetch(offset + LIMIT)
+
+            if total is not None:
+                prompt = f"\n {start}–{end} из {total}. Нажмите Enter для продолжения, 'f<номер>' для добавления в избранное или 'q' для выхода: "
+            else:
+                prompt = "\n Нажмите Enter для продолжения, 'f<номер>' для добавления в избранное или 'q' для выхода: "
+            choice = process_input(prompt).lower()  # input_utils.py
+            if choice == 'q':
+                break
+
+            # Обработка команды добавления в избранное
+            if choice.startswith('f'):
+                _add_film_to_favorites(choice, films, offset=offset)  # searches.py
+                continue
 
+            offset += LIMIT
+    finally:
+        prefetcher.cancel()
     print()
 
 
@@ -357,7 +471,7 @@ def search_by_keyword_interactive():
     
     if use_filters:
         # Выбор жанра (сразу показываем список)
-        genres = get_genres()  # mysql_connector.py
+        genres = get_genres()  # reference_data.py
         if not genres:
             print("\n  Список жанров пуст, фильтр по жанру пропущен.\n")
         else:
@@ -382,7 +496,7 @@ def search_by_keyword_interactive():
 
         # Опциональные года
         try:
-            min_year, max_year = get_year_bounds()  # mysql_connector.py
+            min_year, max_year = get_year_bounds()  # reference_data.py
             print(f"\n Доступные годы: {min_year} — {max_year}")
             
             # Ввод нижнего года с валидацией (по умолчанию min_year)
@@ -404,7 +518,7 @@ def search_by_keyword_interactive():
 
         # Опциональная возрастная категория
         try:
-            ratings = get_age_ratings()  # mysql_connector.py  # mysql_connector.py
+            ratings = get_age_ratings()  # reference_data.py
             if ratings:
                 print("Доступные возрастные категории:")
                 for i, r in enumerate(ratings, 1):
@@ -421,14 +535,18 @@ def search_by_keyword_interactive():
         except Exception:
             age_rating = None
 
-    # Подсчёт общего числа совпадений по сформированному запросу
+    # Первая страница и общее число совпадений — одним обращением (см.
+    # FIRST_PAGE_STRATEGY); запись в лог только ставится в очередь
+    first_page = None
     try:
-        total = get_keyword_count(  # mysql_connector.py
+        films, total, next_token = search_by_keyword_with_total(  # mysql_connector.py
             keyword,
+            limit=LIMIT,
             genre_id=genre_id,
             year_min=year_min,
             year_max=year_max,
             age_rating=age_rating)
+        first_page = (films, next_token)
         print(f"\n\n Найдено всего: {total} фильм(ов)\n")
     except Exception:
         total = None
@@ -446,7 +564,8 @@ def search_by_keyword_interactive():
 
     # Постраничный вывод результатов
     _paginate_keyword_results(  # searches.py
-        total, keyword, genre_id, year_min, year_max, age_rating
+        total, keyword, genre_id, year_min, year_max, age_rating,
+        first_page=first_page
     )
 
 
@@ -463,7 +582,7 @@ def search_by_genre_interactive():
     # Опциональный жанр
     genre_id = None
     genre_name = None
-    genres = get_genres()  # mysql_connector.py
+    genres = get_genres()  # reference_data.py
     if not genres:
         print("  Список жанров пуст.\n")
     else:
@@ -487,7 +606,7 @@ def search_by_genre_interactive():
     # Опциональные года
     y1 = y2 = None
     try:
-        min_year, max_year = get_year_bounds()  # mysql_connector.py
+        min_year, max_year = get_year_bounds()  # reference_data.py
         print(f" Доступные годы: {min_year} — {max_year}")
         
         # Ввод нижнего года с валидацией (можно пропустить)
@@ -520,7 +639,7 @@ def search_by_genre_interactive():
     # Опциональная возрастная категория
     age_rating = None
     try:
-        ratings = get_age_ratings()  # mysql_connector.py
+        ratings = get_age_ratings()  # reference_data.py
         if ratings:
             print("Доступные возрастные категории:")
             for i, r in enumerate(ratings, 1):
@@ -537,10 +656,14 @@ def search_by_genre_interactive():
     except Exception:
         age_rating = None
 
-    # Показать общее количество совпадений перед пагинацией
+    # Первая страница и общее количество совпадений — одним обращением (см.
+    # FIRST_PAGE_STRATEGY); запись в лог только ставится в очередь
+    first_page = None
     try:
-        total = get_genre_year_count(  # mysql_connector.py
-            genre_id=genre_id, year_min=y1, year_max=y2, age_rating=age_rating)
+        films, total, next_token = search_by_genre_and_year_with_total(  # mysql_connector.py
+            genre_id=genre_id, year_min=y1, year_max=y2, limit=LIMIT,
+            age_rating=age_rating)
+        first_page = (films, next_token)
         print(f"\n\n Найдено всего: {total} фильм(ов)\n")
     except Exception:
         total = None
@@ -558,5 +681,5 @@ def search_by_genre_interactive():
 
     # Постраничный вывод результатов
     _paginate_genre_results(  # searches.py
-        total, genre_id, y1, y2, age_rating
+        total, genre_id, y1, y2, age_rating, first_page=first_page
     )